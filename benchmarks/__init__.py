@@ -0,0 +1 @@
+"""Benchmarks for Algorand node installer components."""
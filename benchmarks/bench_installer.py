@@ -0,0 +1,212 @@
+"""
+Benchmark installer orchestration end to end against a simulated host.
+
+Commands (apt, dpkg, systemd, goal, diagcfg) and algod's REST API are
+answered by benchmarks.simulation with scripted latencies, so runs are
+repeatable and need neither root nor a network:
+
+    python -m benchmarks.bench_installer --iterations 10 --time-scale 0.01
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.simulation import SimulatedBackend, simulated_system
+from main import PREREQUISITE_PACKAGES, AlgorandInstaller
+from utils import tracing
+from utils.participation_manager import ParticipationManager, PartKeyRequest
+
+# A scenario runs on a fresh simulated host; setup and teardown of the
+# host are not timed
+Scenario = Callable[[SimulatedBackend, Path], None]
+
+TEST_ADDRESS_PREFIX = 'SIMULATED'
+
+
+def _installer(root: Path, data_dir: Path, **overrides) -> AlgorandInstaller:
+    key_file = root / 'key.pub'
+    key_file.write_bytes(b'-----BEGIN PGP PUBLIC KEY BLOCK-----\n')
+    config = {
+        'data_dir': str(data_dir),
+        'installer_home': root / 'installer',
+        'report_dir': root / 'installer' / 'reports',
+        'repository_key_url': key_file.as_uri(),
+        'repository_key_file': root / 'etc' / 'apt' / 'trusted.gpg.d' / 'algorand.asc',
+        'sources_file': root / 'etc' / 'apt' / 'sources.list.d' / 'algorand.list',
+        'python_environment': False,
+        'storage_benchmark': False,
+        'tune_config': False,
+        'readiness_deadline': 30.0,
+    }
+    config.update(overrides)
+    return AlgorandInstaller(config)
+
+
+def _addresses(count: int) -> List[str]:
+    return [f"{TEST_ADDRESS_PREFIX}{i:049d}" for i in range(count)]
+
+
+def run_full_install(backend: SimulatedBackend, root: Path) -> None:
+    """A fresh install: repository, packages, config, service start and readiness."""
+    installer = _installer(root, backend.node.data_dir)
+    if not installer.run_installation():
+        raise Exception("Simulated installation failed")
+
+
+def run_reinstall(backend: SimulatedBackend, root: Path) -> None:
+    """An install over a host that already has every package."""
+    backend.node.install(PREREQUISITE_PACKAGES + ['algorand-devtools'])
+    installer = _installer(root, backend.node.data_dir)
+    if not installer.run_installation():
+        raise Exception("Simulated reinstallation failed")
+
+
+def run_offline_install(backend: SimulatedBackend, root: Path) -> None:
+    """Filling the artifact cache, then installing from it with apt cut off."""
+    cache_dir = root / 'debs'
+    _installer(root, backend.node.data_dir, artifact_cache_dir=cache_dir).fill_artifact_cache()
+    for program in ('apt-get', 'apt-cache'):
+        backend.script(program, lambda args, input: (100, '', "E: no network on this host\n"))
+    installer = _installer(root, backend.node.data_dir,
+                           offline_install=True, artifact_cache_dir=cache_dir)
+    if not installer.run_installation():
+        raise Exception("Simulated offline installation failed")
+    missing = [p for p in PREREQUISITE_PACKAGES + ['algorand-devtools']
+               if p not in backend.node.packages]
+    if missing:
+        raise Exception(f"Offline installation left out {', '.join(missing)}")
+
+
+def run_telemetry(backend: SimulatedBackend, root: Path) -> None:
+    """Staging and applying the telemetry configuration."""
+    installer = _installer(root, backend.node.data_dir)
+    installer._stage_telemetry_config()
+    installer._configure_telemetry()
+
+
+def run_participation(backend: SimulatedBackend, root: Path, accounts: int = 8) -> None:
+    """Batch key generation, listing, online registration and status checks."""
+    node = backend.node
+    node.set_service('algorand', 'active')
+    while not node.algod_ready():
+        time.sleep(0.01)
+    manager = ParticipationManager(node.data_dir)
+    first = node.current_round()
+    addresses = _addresses(accounts)
+    summary = manager.generate_participation_keys(
+        [PartKeyRequest(address, first, first + 3_000_000) for address in addresses],
+        max_workers=accounts
+    )
+    if summary['failed']:
+        raise Exception(f"Simulated key generation failed: {summary['failed']}")
+    keys = manager.list_participation_keys()
+    if len(keys) != accounts:
+        raise Exception(f"Expected {accounts} keys, found {len(keys)}")
+    for address in addresses:
+        manager.register_online(address, node.data_dir / f"online-{address}.txn")
+    manager.check_participation_statuses(addresses)
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    'install': run_full_install,
+    'reinstall': run_reinstall,
+    'offline_install': run_offline_install,
+    'telemetry': run_telemetry,
+    'participation': run_participation,
+}
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Timing distribution in milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'min_ms': ordered[0],
+        'median_ms': statistics.median(ordered),
+        'mean_ms': statistics.mean(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max_ms': ordered[-1],
+        'stdev_ms': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+
+
+def benchmark(name: str, iterations: int, time_scale: float, seed: int) -> Dict[str, object]:
+    """
+    Run a scenario repeatedly, each time on a fresh simulated host.
+
+    Returns:
+        Dict with wall time and command time distributions, and the mean
+        ratio of command time to wall time (above 1 when commands overlap)
+    """
+    scenario = SCENARIOS[name]
+    wall, command = [], []
+    home = os.environ.get('HOME')
+    for i in range(iterations):
+        with tempfile.TemporaryDirectory(prefix=f'bench-{name}-') as root:
+            # Files the installer keeps under ~ land in the sandbox
+            os.environ['HOME'] = root
+            tracing.get_tracer().reset()
+            try:
+                with simulated_system(Path(root), time_scale=time_scale, seed=seed + i) as backend:
+                    started = time.perf_counter()
+                    scenario(backend, Path(root))
+                    wall.append((time.perf_counter() - started) * 1000)
+                    command.append(backend.command_time() * 1000)
+            finally:
+                if home is None:
+                    os.environ.pop('HOME', None)
+                else:
+                    os.environ['HOME'] = home
+    return {
+        'iterations': iterations,
+        'time_scale': time_scale,
+        'wall': summarize(wall),
+        'commands': summarize(command),
+        'overlap': statistics.mean(c / w for c, w in zip(command, wall) if w),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*',
+                        help=f"Scenarios to run: {', '.join(sorted(SCENARIOS))} (default: all)")
+    parser.add_argument('-n', '--iterations', type=int, default=10)
+    parser.add_argument('--time-scale', type=float, default=0.01,
+                        help="Multiplier for scripted latencies")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Show installer logs")
+    args = parser.parse_args(argv)
+    unknown = sorted(set(args.scenarios) - set(SCENARIOS))
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+
+    if not args.verbose:
+        logging.disable(logging.WARNING)
+
+    results = {}
+    for name in args.scenarios or sorted(SCENARIOS):
+        results[name] = benchmark(name, args.iterations, args.time_scale, args.seed)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+
+    print(f"{'scenario':15} {'median':>10} {'p95':>10} {'max':>10} {'stdev':>9} "
+          f"{'commands':>10} {'overlap':>8}")
+    for name, result in results.items():
+        wall = result['wall']
+        print(f"{name:15} {wall['median_ms']:8.1f}ms {wall['p95_ms']:8.1f}ms "
+              f"{wall['max_ms']:8.1f}ms {wall['stdev_ms']:7.1f}ms "
+              f"{result['commands']['median_ms']:8.1f}ms {result['overlap']:7.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
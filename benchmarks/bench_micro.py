@@ -0,0 +1,689 @@
+"""
+Micro-benchmark the installer's pure-Python hot paths on large fixtures.
+
+Fixtures (thousands of participation keys, a full-size genesis file, a
+complete config.json and multi-hundred-MB algod logs) are generated once
+into a cache directory. Timings are also expressed relative to a fixed
+calibration workload, timed alongside each case, so a baseline recorded
+on one machine can be checked on another:
+
+    python -m benchmarks.bench_micro --save-baseline
+    python -m benchmarks.bench_micro --check --threshold 1.3
+"""
+import gc
+import os
+import sys
+import json
+import time
+import base64
+import random
+import logging
+import argparse
+import platform
+import statistics
+import tempfile
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.config_manager import AlgorandConfig
+from utils.config_store import CONFIG_FILE
+from utils.config_tuner import recommend_profile
+from utils.log_query import LogFilter, SparseTimeIndex, log_files, parse_time, query
+from utils.log_tailer import LogTailer
+from utils.network_manager import NetworkManager
+from utils.participation_manager import ParticipationManager
+from utils.partkey_registry import ParticipationKeyRegistry
+from utils.system_checks import _get_total_ram, _get_ubuntu_version
+
+DEFAULT_FIXTURE_DIR = Path.home() / '.cache' / 'algorand-installer' / 'bench-fixtures'
+DEFAULT_BASELINE = Path(__file__).with_name('micro_baseline.json')
+DEFAULT_THRESHOLD = 1.3  # Allowed slowdown relative to the baseline
+DEFAULT_REPEAT = 7
+DEFAULT_RETRIES = 2  # Reruns of a regressed case before it counts
+
+DEFAULT_PARAMS = {
+    'partkeys': 5000,
+    'keys_per_account': 4,
+    'genesis_accounts': 10000,
+    'log_mb': 256,
+    'seed': 1,
+}
+
+MONITOR_LOG_LINES = 2000  # gui.monitor_gui.MAX_LOG_LINES
+ARCHIVE_FRACTION = 0.75  # Share of the log that has already been rotated
+LOG_START = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+LINES_PER_SECOND = 200
+
+_BASE32 = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ234567'
+
+# (weight, level, function, msg); msg may use {round}
+LOG_TEMPLATES = [
+    (40, 'info', 'agreement.(*service).demuxLoop', 'agreement: vote verified for round {round}'),
+    (20, 'info', 'ledger.(*Ledger).AddValidatedBlock', 'added block {round} to ledger'),
+    (12, 'info', 'network.(*wsNetwork).sendPeerConnectionsTelemetryStatus', 'peer connections updated'),
+    (10, 'info', 'catchup.(*Service).periodicSync', 'periodic sync at round {round}'),
+    (8, 'debug', 'data.(*TxHandler).processIncomingTxn', 'txn pool accepted 112 transactions'),
+    (5, 'info', 'node.(*AlgorandFullNode).oldKeyDeletionThread', 'deleted expired participation keys'),
+    (3, 'warning', 'network.(*wsPeer).readLoop', 'peer closed connection: "read tcp: i/o timeout"'),
+    (1, 'warning', 'catchup.(*Service).fetchAndWrite', 'failed to fetch block {round}, retrying'),
+    (1, 'error', 'ledger.(*trackerRegistry).commitRound', 'commitRound: database is locked at round {round}'),
+]
+
+OS_RELEASE = """PRETTY_NAME="Ubuntu 22.04.4 LTS"
+NAME="Ubuntu"
+VERSION_ID="22.04"
+VERSION="22.04.4 LTS (Jammy Jellyfish)"
+VERSION_CODENAME=jammy
+ID=ubuntu
+ID_LIKE=debian
+HOME_URL="https://www.ubuntu.com/"
+SUPPORT_URL="https://help.ubuntu.com/"
+BUG_REPORT_URL="https://bugs.launchpad.net/ubuntu/"
+PRIVACY_POLICY_URL="https://www.ubuntu.com/legal/terms-and-policies/privacy-policy"
+UBUNTU_CODENAME=jammy
+"""
+
+MEMINFO_FIELDS = [
+    'MemTotal', 'MemFree', 'MemAvailable', 'Buffers', 'Cached', 'SwapCached', 'Active',
+    'Inactive', 'Active(anon)', 'Inactive(anon)', 'Active(file)', 'Inactive(file)',
+    'Unevictable', 'Mlocked', 'SwapTotal', 'SwapFree', 'Zswap', 'Zswapped', 'Dirty',
+    'Writeback', 'AnonPages', 'Mapped', 'Shmem', 'KReclaimable', 'Slab', 'SReclaimable',
+    'SUnreclaim', 'KernelStack', 'PageTables', 'SecPageTables', 'NFS_Unstable', 'Bounce',
+    'WritebackTmp', 'CommitLimit', 'Committed_AS', 'VmallocTotal', 'VmallocUsed',
+    'VmallocChunk', 'Percpu', 'HardwareCorrupted', 'AnonHugePages', 'ShmemHugePages',
+    'ShmemPmdMapped', 'FileHugePages', 'FilePmdMapped', 'Unaccepted', 'HugePages_Total',
+    'HugePages_Free', 'HugePages_Rsvd', 'HugePages_Surp', 'Hugepagesize', 'Hugetlb',
+    'DirectMap4k', 'DirectMap2M', 'DirectMap1G',
+]
+
+# algod settings a full config.json carries besides the ones the installer manages
+ALGOD_SETTINGS = [
+    'AccountUpdatesStatsInterval', 'AccountsRebuildSynchronousMode',
+    'AgreementIncomingBundlesQueueLength', 'AgreementIncomingProposalsQueueLength',
+    'AgreementIncomingVotesQueueLength', 'AnnounceParticipationKey',
+    'BlockServiceCustomFallbackEndpoints', 'BroadcastConnectionsLimit', 'CadaverDirectory',
+    'CadaverSizeTarget', 'CatchpointFileHistoryLength', 'CatchpointInterval',
+    'CatchpointTracking', 'CatchupBlockDownloadRetryAttempts', 'CatchupFailurePeerRefreshRate',
+    'CatchupGossipBlockFetchTimeoutSec', 'CatchupHTTPBlockFetchTimeoutSec',
+    'CatchupLedgerDownloadRetryAttempts', 'ConnectionsRateLimitingCount',
+    'ConnectionsRateLimitingWindowSeconds', 'DNSSecurityFlags',
+    'DisableLocalhostConnectionRateLimit', 'DisableNetworking',
+    'DisableOutgoingConnectionThrottling', 'EnableAccountUpdatesStats',
+    'EnableAgreementReporting', 'EnableAgreementTimeMetrics', 'EnableAssembleStats',
+    'EnableCatchupFromArchiveServers', 'EnableExperimentalAPI', 'EnableFollowMode',
+    'EnableIncomingMessageFilter', 'EnableOutgoingNetworkMessageFiltering',
+    'EnablePingHandler', 'EnableProcessBlockStats', 'EnableRequestLogger',
+    'EnableRuntimeMetrics', 'EnableTopAccountsReporting', 'EnableTxBacklogRateLimiting',
+    'EnableTxnEvalTracer', 'EnableUsageLog', 'EnableVerbosedTransactionSyncLogging',
+    'FallbackDNSResolverAddress', 'ForceFetchTransactions', 'ForceRelayMessages',
+    'HeartbeatUpdateInterval', 'IncomingMessageFilterBucketCount',
+    'IncomingMessageFilterBucketSize', 'LedgerSynchronousMode', 'LogArchiveMaxAge',
+    'LogArchiveName', 'LogSizeLimit', 'MaxAPIResourcesPerAccount', 'MaxAcctLookback',
+    'MaxCatchpointDownloadDuration', 'MaxConnectionsPerIP',
+    'MinCatchpointFileDownloadBytesPerSecond', 'NetworkMessageTraceServer',
+    'NetworkProtocolVersion', 'OptimizeAccountsDatabaseOnStartup',
+    'OutgoingMessageFilterBucketCount', 'OutgoingMessageFilterBucketSize',
+    'ParticipationKeysRefreshInterval', 'PeerConnectionsUpdateInterval',
+    'PeerPingPeriodSeconds', 'PriorityPeers', 'ProposalAssemblyTime', 'PublicAddress',
+    'ReconnectTime', 'ReservedFDs', 'RestConnectionsHardLimit', 'RestConnectionsSoftLimit',
+    'TLSCertFile', 'TLSKeyFile', 'TelemetryToLog', 'TransactionSyncDataExchangeRate',
+    'TransactionSyncSignificantMessageThreshold', 'TxBacklogReservedCapacityPerPeer',
+    'TxBacklogServiceRateWindowSeconds', 'TxBacklogSize', 'TxIncomingFilterMaxSize',
+    'TxIncomingFilteringFlags', 'TxPoolExponentialIncreaseFactor', 'TxSyncIntervalSeconds',
+    'TxSyncServeResponseSize', 'TxSyncTimeoutSeconds', 'UseXForwardedForAddressField',
+    'VerifiedTranscationsCacheSize',
+]
+
+HOST_FACTS = {
+    'cpu_count': 16,
+    'total_ram_gb': 64.0,
+    'is_ssd': True,
+    'disk_iops': 45000.0,
+    'fd_limit': 65536,
+    'nic_speed_mbps': 10000,
+}
+
+
+class Fixtures:
+    """
+    Fixture files for one set of sizes.
+
+    Files are generated on first use and reused while the manifest written
+    after generation matches the requested sizes.
+    """
+
+    def __init__(self, root: Path, params: Dict[str, int]):
+        self.params = dict(params)
+        key = '-'.join(f"{name}{self.params[name]}" for name in sorted(self.params))
+        self.dir = Path(root) / key
+        self.data_dir = self.dir / 'data'
+        self.partkeys_file = self.dir / 'participation.json'
+        self.accounts_file = self.dir / 'accounts.json'
+        self.os_release = self.dir / 'os-release'
+        self.meminfo = self.dir / 'meminfo'
+        self.manifest = self.dir / 'manifest.json'
+
+    def prepare(self) -> None:
+        """Generate any fixtures that are missing."""
+        try:
+            with open(self.manifest, 'r') as f:
+                if json.load(f) == self.params:
+                    return
+        except (FileNotFoundError, ValueError):
+            pass
+
+        rng = random.Random(self.params['seed'])
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.os_release.write_text(OS_RELEASE)
+        self.meminfo.write_text(''.join(
+            f"{name + ':':<16}{rng.randrange(1, 1 << 26):>10} kB\n" for name in MEMINFO_FIELDS
+        ))
+        self._write_partkeys(rng)
+        self._write_genesis(rng)
+        self._write_config(rng)
+        self._write_logs(rng)
+        with open(self.manifest, 'w') as f:
+            json.dump(self.params, f)
+
+    def _write_partkeys(self, rng: random.Random) -> None:
+        # A /v2/participation listing and the matching /v2/accounts responses
+        per_account = self.params['keys_per_account']
+        keys, accounts = [], {}
+        address = None
+        for i in range(self.params['partkeys']):
+            if i % per_account == 0:
+                address = _address(rng)
+            first = 30_000_000 + (i % per_account) * 3_000_000
+            keys.append({
+                'id': _address(rng)[:52],
+                'address': address,
+                'effective-first-valid': first + 320,
+                'effective-last-valid': first + 3_000_000,
+                'last-vote': first + rng.randrange(1, 1000),
+                'last-block-proposal': first + rng.randrange(1, 1000),
+                'key': {
+                    'selection-participation-key': _key(rng, 32),
+                    'vote-participation-key': _key(rng, 32),
+                    'state-proof-key': _key(rng, 64),
+                    'vote-first-valid': first,
+                    'vote-last-valid': first + 3_000_000,
+                    'vote-key-dilution': 1733,
+                },
+            })
+            if i % per_account == 0 and rng.random() < 0.5:
+                accounts[address] = {
+                    'address': address,
+                    'amount': rng.randrange(10 ** 9),
+                    'status': 'Online',
+                    'participation': {
+                        'vote-participation-key': keys[-1]['key']['vote-participation-key'],
+                        'selection-participation-key': keys[-1]['key']['selection-participation-key'],
+                        'vote-first-valid': first,
+                        'vote-last-valid': first + 3_000_000,
+                        'vote-key-dilution': 1733,
+                    },
+                }
+            elif i % per_account == 0:
+                accounts[address] = {'address': address, 'amount': rng.randrange(10 ** 9),
+                                     'status': 'Offline'}
+        with open(self.partkeys_file, 'w') as f:
+            json.dump(keys, f)
+        with open(self.accounts_file, 'w') as f:
+            json.dump(accounts, f)
+
+    def _write_genesis(self, rng: random.Random) -> None:
+        alloc = []
+        for i in range(self.params['genesis_accounts']):
+            alloc.append({
+                'addr': _address(rng),
+                'comment': f"Account {i}",
+                'state': {
+                    'algo': rng.randrange(10 ** 12),
+                    'onl': 1,
+                    'sel': _key(rng, 32),
+                    'vote': _key(rng, 32),
+                    'stprf': _key(rng, 64),
+                    'voteKD': 10000,
+                    'voteLst': 3_000_000,
+                },
+            })
+        genesis = {
+            'alloc': alloc,
+            'fees': _address(rng),
+            'id': 'v1.0',
+            'network': 'mainnet',
+            'proto': 'https://github.com/algorandfoundation/specs/tree/5615adc36bad610c7f165fa2967f4ecfa75125f0',
+            'rwd': _address(rng),
+            'timestamp': 1560211200,
+        }
+        with open(self.data_dir / 'genesis.json', 'w') as f:
+            json.dump(genesis, f, indent='\t')
+
+    def _write_config(self, rng: random.Random) -> None:
+        config = AlgorandConfig.DEFAULT_CONFIG.copy()
+        for name in ALGOD_SETTINGS:
+            if name.startswith(('Enable', 'Disable', 'Force', 'Optimize', 'Use')):
+                config[name] = rng.random() < 0.2
+            elif name.endswith(('Address', 'Directory', 'File', 'Name', 'Server', 'Peers',
+                                'Endpoints', 'Version')):
+                config[name] = ''
+            else:
+                config[name] = rng.randrange(1, 100_000)
+        with open(self.data_dir / CONFIG_FILE, 'w') as f:
+            json.dump(config, f, indent=2, sort_keys=True)
+
+    def _write_logs(self, rng: random.Random) -> None:
+        total = self.params['log_mb'] * 1024 * 1024
+        archive = self.data_dir / 'node.archive.log'
+        current = self.data_dir / 'node.log'
+        lines = _log_lines(rng)
+        _write_log(archive, lines, int(total * ARCHIVE_FRACTION))
+        _write_log(current, lines, total - int(total * ARCHIVE_FRACTION))
+        # log_files orders archives by mtime
+        rotated = os.stat(current).st_mtime - 3600
+        os.utime(archive, (rotated, rotated))
+
+
+def _address(rng: random.Random) -> str:
+    return ''.join(rng.choice(_BASE32) for _ in range(58))
+
+
+def _key(rng: random.Random, size: int) -> str:
+    return base64.b64encode(rng.randbytes(size)).decode()
+
+
+def _log_lines(rng: random.Random):
+    """Endless algod JSON log lines, LINES_PER_SECOND of them per logged second."""
+    weights = [template[0] for template in LOG_TEMPLATES]
+    second, stamp = None, ''
+    for n in range(sys.maxsize):
+        now = LOG_START + n / LINES_PER_SECOND
+        if int(now) != second:
+            second = int(now)
+            stamp = datetime.fromtimestamp(second, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        _, level, function, msg = rng.choices(LOG_TEMPLATES, weights)[0]
+        msg = json.dumps(msg.format(round=30_000_000 + n // 600))
+        yield (f'{{"Context":"Agreement","file":"{function.split(".")[0]}.go",'
+               f'"function":"github.com/algorand/go-algorand/{function}",'
+               f'"level":"{level}","line":{rng.randrange(40, 900)},"msg":{msg},"name":"",'
+               f'"time":"{stamp}.{int(now * 1e6) % 1_000_000:06d}Z"}}\n')
+
+
+def _write_log(path: Path, lines, size: int) -> None:
+    written = 0
+    with open(path, 'w') as f:
+        while written < size:
+            chunk = ''.join(next(lines) for _ in range(4096))
+            f.write(chunk)
+            written += len(chunk)
+
+
+class FixtureClient:
+    """
+    Serves recorded algod responses in place of AlgodClient.
+
+    Responses are kept encoded and decoded on every call, as the uncached
+    REST client does, so parsing is part of what is measured.
+    """
+
+    def __init__(self, fixtures: Fixtures):
+        self._participation = fixtures.partkeys_file.read_bytes()
+        with open(fixtures.accounts_file, 'r') as f:
+            self._accounts = {address: json.dumps(account).encode()
+                              for address, account in json.load(f).items()}
+
+    def participation_keys(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        return json.loads(self._participation)
+
+    def account(self, address: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        return json.loads(self._accounts[address])
+
+
+class Case:
+    """A timed call; prepare builds it from the fixtures, untimed."""
+
+    def __init__(self,
+                 name: str,
+                 description: str,
+                 prepare: Callable[[Fixtures, Path], Callable[[], Any]],
+                 number: int = 1,
+                 repeat: int = DEFAULT_REPEAT):
+        self.name = name
+        self.description = description
+        self.prepare = prepare
+        self.number = number  # Calls per sample
+        self.repeat = repeat  # Samples
+
+
+def _partkeys_parse(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    raw = fixtures.partkeys_file.read_bytes()
+    return lambda: ParticipationKeyRegistry().apply(json.loads(raw))
+
+
+def _partkeys_list(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    manager = ParticipationManager(fixtures.data_dir, client=FixtureClient(fixtures))
+    manager.list_participation_keys()  # Later calls refresh a populated registry
+    return manager.list_participation_keys
+
+
+def _genesis_network(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    return NetworkManager(fixtures.data_dir).get_current_network
+
+
+def _config_dir(fixtures: Fixtures, workdir: Path) -> Path:
+    data_dir = workdir / 'config'
+    data_dir.mkdir(exist_ok=True)
+    (data_dir / CONFIG_FILE).write_bytes((fixtures.data_dir / CONFIG_FILE).read_bytes())
+    return data_dir
+
+
+def _config_load(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    data_dir = _config_dir(fixtures, workdir)
+    return lambda: AlgorandConfig(data_dir, is_relay=True).load_existing_config()
+
+
+def _config_merge(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    config = AlgorandConfig(_config_dir(fixtures, workdir), is_relay=True)
+    config.load_existing_config()
+    profile = recommend_profile('relay', HOST_FACTS)
+
+    def merge():
+        config.update_config(profile.settings)
+        config.update_config({'EnableTelemetry': True})
+        config.store.stage(CONFIG_FILE, config.config)
+        return config.store.diff(include_noop=True)
+    return merge
+
+
+def _config_save(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    config = AlgorandConfig(_config_dir(fixtures, workdir), is_relay=True)
+    config.load_existing_config()
+    fanout = iter(range(sys.maxsize))
+
+    def save():
+        # A changed value each time, so every save rewrites the file
+        config.update_config({'GossipFanout': 5 + next(fanout) % 2})
+        return config.save_config()
+    return save
+
+
+def _config_save_unchanged(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    config = AlgorandConfig(_config_dir(fixtures, workdir), is_relay=True)
+    config.load_existing_config()
+    config.save_config()
+    return config.save_config
+
+
+def _ubuntu_version(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    path = str(fixtures.os_release)
+    return lambda: _get_ubuntu_version(path)
+
+
+def _total_ram(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+    path = str(fixtures.meminfo)
+    return lambda: _get_total_ram(path)
+
+
+def _monitor_poll(log_filter: Optional[LogFilter]) -> Callable[[Fixtures, Path], Callable[[], Any]]:
+    def prepare(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+        node_log = fixtures.data_dir / 'node.log'
+        log_lines = deque(maxlen=MONITOR_LOG_LINES)
+
+        def poll():
+            # One full poll as the monitor does it: a read of up to
+            # max_read_bytes, then the lines it would append to the view
+            tailer = LogTailer(node_log, initial_bytes=None)
+            try:
+                new_lines = tailer.poll()
+            finally:
+                tailer.close()
+            log_lines.extend(new_lines)
+            if log_filter is not None:
+                new_lines = [record for record in map(log_filter.match, new_lines) if record]
+                new_lines = [record['msg'] for record in new_lines]
+            return "\n".join(new_lines[-MONITOR_LOG_LINES:])
+        return poll
+    return prepare
+
+
+def _monitor_search(**options) -> Callable[[Fixtures, Path], Callable[[], Any]]:
+    def prepare(fixtures: Fixtures, workdir: Path) -> Callable[[], Any]:
+        filter_args = dict(options)
+        paths = log_files(fixtures.data_dir)
+        index_dir = workdir / 'logindex'
+        if filter_args.get('since') == 'tail':
+            # The last tenth of node.log, found through a prebuilt index
+            since = parse_time(_last_time(paths[-1]))
+            filter_args['since'] = since - (since - LOG_START) * (1 - ARCHIVE_FRACTION) / 10
+            for path in paths:
+                SparseTimeIndex(path, index_dir).update()
+        log_filter = LogFilter(**filter_args)
+        return lambda: sum(1 for _ in query(paths, log_filter, index_dir=index_dir))
+    return prepare
+
+
+def _last_time(path: Path) -> str:
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(path) - 4096))
+        last = f.read().rstrip(b'\n').rsplit(b'\n', 1)[-1]
+    return json.loads(last)['time']
+
+
+CASES = [
+    Case('partkeys.parse', "Decode a /v2/participation listing into a new registry",
+         _partkeys_parse, repeat=9),
+    Case('partkeys.list', "list_participation_keys against a populated registry",
+         _partkeys_list, repeat=9),
+    Case('genesis.network', "NetworkManager.get_current_network on a full genesis.json",
+         _genesis_network, repeat=9),
+    Case('config.load', "AlgorandConfig load of a full config.json", _config_load, number=200),
+    Case('config.merge', "Apply a tuning profile and diff against disk", _config_merge, number=100),
+    Case('config.save', "save_config with a changed value (fsync included)", _config_save,
+         number=10),
+    Case('config.save_unchanged', "save_config with nothing to write", _config_save_unchanged,
+         number=100),
+    Case('system.ubuntu_version', "_get_ubuntu_version from os-release", _ubuntu_version,
+         number=2000),
+    Case('system.total_ram', "_get_total_ram from meminfo", _total_ram, number=2000),
+    Case('monitor.poll', "Monitor poll of a 4MB log chunk", _monitor_poll(None)),
+    Case('monitor.poll_filtered', "Monitor poll of a 4MB log chunk with a level filter",
+         _monitor_poll(LogFilter(min_level='warning'))),
+    Case('monitor.search_level', "Search all logs for warnings and errors",
+         _monitor_search(min_level='warning'), repeat=3),
+    Case('monitor.search_pattern', "Search all logs for a message pattern",
+         _monitor_search(pattern='database is locked'), repeat=3),
+    Case('monitor.search_since', "Search the newest records through the time index",
+         _monitor_search(since='tail'), repeat=5),
+]
+
+
+def calibrate(repeat: int = 25) -> float:
+    """Fastest time of a fixed pure-Python workload, in milliseconds."""
+    payload = json.dumps([
+        {'round': i, 'key': f"{(i * 2654435761) % 2 ** 64:016x}", 'valid': [i, i + 1000]}
+        for i in range(5000)
+    ])
+
+    def workload():
+        records = json.loads(payload)
+        records.sort(key=lambda record: record['key'])
+        return {record['key']: record['valid'][1] - record['valid'][0] for record in records}
+    return min(_sample(workload, 1) for _ in range(repeat))
+
+
+def _sample(call: Callable[[], Any], number: int) -> float:
+    """Milliseconds per call over `number` calls, with the collector paused as timeit does."""
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        for _ in range(number):
+            call()
+        return (time.perf_counter() - started) * 1000 / number
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def run_case(case: Case, fixtures: Fixtures) -> Dict[str, float]:
+    with tempfile.TemporaryDirectory(prefix=f'bench-{case.name}-') as workdir:
+        call = case.prepare(fixtures, Path(workdir))
+        call()  # Warm up caches and lazily built state
+        # Calibrating around the samples tracks frequency scaling and
+        # neighbouring load on shared CI hosts
+        calibration_ms = calibrate()
+        samples = [_sample(call, case.number) for _ in range(case.repeat)]
+        calibration_ms = min(calibration_ms, calibrate())
+    # The fastest sample is the least disturbed by other load; it is
+    # what baselines compare
+    return {
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'stdev_ms': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'calibration_ms': calibration_ms,
+        'relative': min(samples) / calibration_ms,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Annotate results with their slowdown against a baseline.
+
+    Returns:
+        Names of cases slower than threshold times their baseline
+    """
+    regressions = []
+    for name, result in results['cases'].items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        result['ratio'] = result['relative'] / base['relative']
+        if result['ratio'] > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def select(patterns: List[str]) -> List[Case]:
+    """Cases named by exact name or by prefix, e.g. 'config'."""
+    if not patterns:
+        return list(CASES)
+    return [case for case in CASES
+            if any(case.name == p or case.name.startswith(p.rstrip('.') + '.') for p in patterns)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('cases', nargs='*',
+                        help="Cases or case groups to run, e.g. partkeys config.load (default: all)")
+    parser.add_argument('--fixtures', type=Path, default=DEFAULT_FIXTURE_DIR,
+                        help="Where generated fixtures are cached")
+    for name, default in DEFAULT_PARAMS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, dest=name,
+                            help=f"Fixture size (default: {default}; with --check, the baseline's)")
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Record these results as the baseline")
+    parser.add_argument('--check', action='store_true',
+                        help="Compare with the baseline and exit 1 if any case regressed")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Slowdown against the baseline that counts as a regression")
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help="Reruns of a regressed case, keeping its fastest run")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    cases = select(args.cases)
+    if not cases:
+        parser.error(f"no cases match: {', '.join(args.cases)}")
+
+    baseline = None
+    if args.check or args.baseline.exists():
+        try:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            if args.check:
+                parser.error(f"cannot read baseline {args.baseline}: {str(e)}")
+
+    params = dict(DEFAULT_PARAMS)
+    if args.check:
+        overridden = [name for name in params if getattr(args, name) is not None]
+        if overridden:
+            parser.error("fixture sizes come from the baseline with --check")
+        params.update(baseline['params'])
+    else:
+        params.update({name: getattr(args, name) for name in params
+                       if getattr(args, name) is not None})
+    if baseline is not None and baseline.get('params') != params:
+        if args.check:
+            parser.error(f"baseline {args.baseline} was recorded without all fixture sizes")
+        # Timings on different fixtures are not comparable
+        baseline = None
+
+    logging.disable(logging.WARNING)
+    fixtures = Fixtures(args.fixtures, params)
+    generate_started = time.perf_counter()
+    fixtures.prepare()
+    generate_time = time.perf_counter() - generate_started
+    if generate_time > 1 and not args.json:
+        print(f"Generated fixtures in {fixtures.dir} ({generate_time:.1f}s)", file=sys.stderr)
+
+    results = {
+        'params': params,
+        'python': platform.python_version(),
+        'cases': {case.name: run_case(case, fixtures) for case in cases},
+    }
+    regressions = compare(results, baseline, args.threshold) if baseline else []
+    for _ in range(args.retries):
+        if not regressions:
+            break
+        # A slowdown that does not repeat was noise on the host
+        for case in cases:
+            if case.name in regressions:
+                rerun = run_case(case, fixtures)
+                if rerun['relative'] < results['cases'][case.name]['relative']:
+                    results['cases'][case.name] = rerun
+        regressions = compare(results, baseline, args.threshold)
+
+    if args.save_baseline:
+        # Cases that were not run keep their recorded values
+        saved = {
+            'params': params,
+            'python': results['python'],
+            'cases': dict(baseline['cases']) if baseline else {},
+        }
+        for name, result in results['cases'].items():
+            saved['cases'][name] = {key: round(value, 6) for key, value in result.items()
+                                    if key in ('min_ms', 'calibration_ms', 'relative')}
+        with open(args.baseline, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+    if args.json:
+        print(json.dumps({**results, 'regressions': regressions}, indent=2))
+    else:
+        print(f"{'case':24} {'median':>11} {'min':>11} {'stdev':>10} {'calibration':>12} "
+              f"{'vs baseline':>12}")
+        for name, result in results['cases'].items():
+            ratio = f"{result['ratio']:.2f}x" if 'ratio' in result else '-'
+            flag = '  REGRESSED' if name in regressions else ''
+            print(f"{name:24} {result['median_ms']:9.3f}ms {result['min_ms']:9.3f}ms "
+                  f"{result['stdev_ms']:8.3f}ms {result['calibration_ms']:10.3f}ms "
+                  f"{ratio:>12}{flag}")
+
+    if args.check:
+        missing = [case.name for case in cases if case.name not in baseline.get('cases', {})]
+        if missing:
+            print(f"No baseline for: {', '.join(missing)}", file=sys.stderr)
+        if regressions:
+            print(f"{len(regressions)} cases slower than {args.threshold:.2f}x their baseline: "
+                  f"{', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
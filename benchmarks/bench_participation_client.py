@@ -0,0 +1,78 @@
+"""
+Compare per-call latency of goal subprocesses with the pooled REST client.
+
+Runs against a live node:
+
+    python -m benchmarks.bench_participation_client -d /var/lib/algorand \
+        --address <ACCOUNT>
+"""
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from utils.algod_client import AlgodClient
+
+
+def measure(call: Callable[[], object], iterations: int) -> List[float]:
+    """Time repeated calls, returning per-call latency in milliseconds."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        'median_ms': statistics.median(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max_ms': ordered[-1],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('-d', '--data-dir', type=Path, default=Path('/var/lib/algorand'))
+    parser.add_argument('--address', help="Account to use for the status benchmark")
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    data_dir = str(args.data_dir)
+    # Uncached, so every REST call is a real round trip on a pooled connection
+    client = AlgodClient.from_data_dir(args.data_dir, read_ttl=0)
+    cached_client = AlgodClient.from_data_dir(args.data_dir)
+
+    def goal(*cmd: str) -> Callable[[], object]:
+        return lambda: subprocess.run(
+            ['goal'] + list(cmd) + ['-d', data_dir],
+            capture_output=True, text=True, check=True
+        )
+
+    cases = {
+        'list keys (goal)': goal('account', 'listpartkeys'),
+        'list keys (REST)': client.participation_keys,
+        'list keys (REST, cached)': cached_client.participation_keys,
+        'node status (goal)': goal('node', 'status'),
+        'node status (REST)': client.status,
+    }
+    if args.address:
+        cases['account status (goal)'] = goal('account', 'dump', '-a', args.address)
+        cases['account status (REST)'] = lambda: client.account(args.address)
+
+    print(f"{'case':28} {'median':>10} {'p95':>10} {'max':>10}")
+    for name, call in cases.items():
+        call()  # Warm up connections and caches
+        stats = summarize(measure(call, args.iterations))
+        print(f"{name:28} {stats['median_ms']:9.2f}ms {stats['p95_ms']:9.2f}ms "
+              f"{stats['max_ms']:9.2f}ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
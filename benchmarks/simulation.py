@@ -0,0 +1,603 @@
+import os
+import json
+import time
+import random
+import secrets
+import logging
+import threading
+import subprocess
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import unquote
+
+from utils.apt_planner import get_apt_planner
+from utils.command_backend import CommandBackend, CommandResult, use_backend
+from utils.dpkg_index import get_dpkg_index
+from utils.genesis_provider import GENESIS_HASHES, get_genesis_provider
+
+logger = logging.getLogger(__name__)
+
+# Scripted latencies as (mean, standard deviation) in seconds, looked up by
+# "program subcommand" and then by program
+DEFAULT_LATENCIES: Dict[str, Tuple[float, float]] = {
+    'apt-get update': (6.0, 1.5),
+    'apt-get install': (3.0, 0.5),
+    'dpkg': (2.0, 0.5),
+    'systemctl': (0.05, 0.02),
+    'systemctl start': (1.0, 0.2),
+    'systemctl restart': (1.5, 0.3),
+    'goal account addpartkey': (30.0, 5.0),
+    'goal': (0.3, 0.1),
+    'diagcfg': (0.1, 0.03),
+    'tee': (0.01, 0.005),
+    'python -m': (5.0, 1.0),
+    'algod': (0.002, 0.001),  # Per REST request
+    '*': (0.02, 0.01),
+}
+PACKAGE_INSTALL_TIME = (1.5, 0.3)  # Added per package in an apt transaction
+PACKAGE_DOWNLOAD_KB = 2048
+# Depends of the simulated packages; others have none
+PACKAGE_DEPENDS: Dict[str, List[str]] = {
+    'algorand-devtools': ['algorand'],
+    'algorand': ['systemd'],
+    'curl': ['libcurl4'],
+    'gnupg2': ['gnupg'],
+    'software-properties-common': ['python3-software-properties'],
+}
+ALGOD_STARTUP_TIME = 3.0
+ROUND_TIME = 2.8
+BASE_ROUND = 1_000_000
+NETWORKS = ('mainnet', 'testnet', 'betanet')
+ALGORAND_UNIT_PACKAGES = {'algorand', 'algorand-devtools'}  # Either installs the unit
+
+# Result of a scripted command: (exit status, stdout, stderr)
+Response = Tuple[int, str, str]
+Handler = Callable[[List[str], Optional[bytes]], Response]
+
+
+class SimulatedNode:
+    """
+    State of a simulated host running algod.
+
+    Commands run through a SimulatedBackend change this state and the
+    SimulatedAlgod REST server reports it, so the installer sees one
+    consistent machine. Times are multiplied by time_scale.
+    """
+
+    def __init__(self,
+                 data_dir: Path,
+                 root: Path,
+                 installed: Iterable[str] = (),
+                 time_scale: float = 1.0,
+                 startup_time: float = ALGOD_STARTUP_TIME,
+                 round_time: float = ROUND_TIME):
+        self.data_dir = Path(data_dir)
+        self.root = Path(root)
+        self.time_scale = time_scale
+        self.startup_time = startup_time
+        self.round_time = round_time
+        self.dpkg_status = self.root / 'dpkg' / 'status'
+        self.genesis_dir = self.root / 'opt' / 'algorand' / 'genesis'
+        self.apt_lists = self.root / 'apt' / 'lists'
+        self.token = secrets.token_hex(32)
+        self.admin_token = secrets.token_hex(32)
+        self.packages: Dict[str, str] = {}
+        self.services: Dict[str, str] = {}
+        self.enabled: set = set()
+        self.telemetry = {'enabled': False, 'name': ''}
+        self.partkeys: Dict[str, Dict] = {}
+        self.accounts: Dict[str, Dict] = {}
+        self.files: Dict[str, bytes] = {}  # Written with sudo tee; also on disk under root
+        self.algod = SimulatedAlgod(self)
+        self._started_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.apt_lists.mkdir(parents=True, exist_ok=True)
+        self.dpkg_status.parent.mkdir(parents=True, exist_ok=True)
+        self.install(installed)
+
+    def install(self, packages: Iterable[str]) -> None:
+        """Mark packages installed and rewrite the dpkg status database."""
+        with self._lock:
+            for package in packages:
+                self.packages.setdefault(package, '1.0.0')
+            entries = [
+                f"Package: {name}\nStatus: install ok installed\nVersion: {version}\n"
+                for name, version in sorted(self.packages.items())
+            ]
+            self.dpkg_status.write_text("\n".join(entries))
+            if ALGORAND_UNIT_PACKAGES & set(self.packages):
+                self._install_genesis_files()
+
+    def _install_genesis_files(self) -> None:
+        # Shipped by the algorand package, one per network
+        for network in NETWORKS:
+            path = self.genesis_dir / network / 'genesis.json'
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(json.dumps({
+                    'id': 'v1.0',
+                    'network': network,
+                    'proto': 'https://github.com/algorandfoundation/specs/tree/simulated',
+                    'alloc': [],
+                    'rwd': 'SIMULATEDREWARDSPOOL',
+                    'fees': 'SIMULATEDFEESINK',
+                    'timestamp': 1560211200,
+                }, indent='\t'))
+
+    def set_service(self, service: str, state: str) -> None:
+        with self._lock:
+            self.services[service] = state
+            if service != 'algorand':
+                return
+            if state == 'active':
+                self._started_at = time.monotonic()
+                self.algod.start()
+                (self.data_dir / 'algod.net').write_text(f"127.0.0.1:{self.algod.port}\n")
+                (self.data_dir / 'algod.token').write_text(self.token + '\n')
+                (self.data_dir / 'algod.admin.token').write_text(self.admin_token + '\n')
+            else:
+                self._started_at = None
+                self.algod.stop()
+
+    def algod_ready(self) -> bool:
+        started = self._started_at
+        return started is not None and \
+            time.monotonic() - started >= self.startup_time * self.time_scale
+
+    def current_round(self) -> int:
+        started = self._started_at
+        if started is None:
+            return BASE_ROUND
+        return BASE_ROUND + int((time.monotonic() - started) / (self.round_time * self.time_scale))
+
+    def add_partkey(self, address: str, first_valid: int, last_valid: int, dilution: int) -> str:
+        with self._lock:
+            participation_id = secrets.token_hex(26).upper()
+            self.partkeys[participation_id] = {
+                'id': participation_id,
+                'address': address,
+                'key': {
+                    'vote-first-valid': first_valid,
+                    'vote-last-valid': last_valid,
+                    'vote-key-dilution': dilution,
+                    'vote-participation-key': secrets.token_hex(32),
+                    'selection-participation-key': secrets.token_hex(32),
+                },
+            }
+            self.accounts.setdefault(address, {'amount': 100_000_000_000, 'status': 'Offline'})
+            return participation_id
+
+    def account(self, address: str) -> Dict:
+        with self._lock:
+            account = dict(self.accounts.get(address, {'amount': 0, 'status': 'Offline'}))
+        account.update({'address': address, 'round': self.current_round()})
+        return account
+
+    def close(self) -> None:
+        self.algod.stop()
+
+
+class SimulatedAlgod:
+    """algod's REST API for a SimulatedNode, served on a local port."""
+
+    def __init__(self, node: SimulatedNode, latency: Tuple[float, float] = DEFAULT_LATENCIES['algod']):
+        self.node = node
+        self.latency = latency
+        self.port: Optional[int] = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def start(self) -> None:
+        if self._server is not None:
+            return
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), _algod_handler(self))
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        # A short poll interval keeps stop(), and so restarts, quick
+        threading.Thread(target=self._server.serve_forever, kwargs={'poll_interval': 0.05},
+                         name='simulated-algod', daemon=True).start()
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def respond(self, method: str, path: str, token: str) -> Tuple[int, object]:
+        node = self.node
+        mean, jitter = self.latency
+        time.sleep(max(0.0, random.gauss(mean, jitter)) * node.time_scale)
+        path, _, _ = path.partition('?')
+        if not node.algod_ready():
+            return 503, {'message': 'node is starting'}
+        if path == '/health':
+            return 200, None
+        if path == '/versions':
+            return 200, self._versions()
+        if token not in (node.token, node.admin_token):
+            return 401, {'message': 'Invalid API Token'}
+        admin = token == node.admin_token
+
+        if path == '/v2/status':
+            return 200, self._status()
+        if path.startswith('/v2/status/wait-for-block-after/'):
+            after = int(path.rsplit('/', 1)[1])
+            deadline = time.monotonic() + 60 * node.time_scale
+            while node.current_round() <= after and time.monotonic() < deadline:
+                time.sleep(min(0.05, node.round_time * node.time_scale / 4))
+            return 200, self._status()
+        if path.startswith('/v2/accounts/'):
+            return 200, node.account(unquote(path.rsplit('/', 1)[1]))
+        if path.startswith('/v2/participation') or path.startswith('/v2/catchup/'):
+            if not admin:
+                return 401, {'message': 'Invalid API Token'}
+            if path == '/v2/participation':
+                with node._lock:
+                    return 200, list(node.partkeys.values())
+            if path.startswith('/v2/participation/'):
+                key = node.partkeys.get(path.rsplit('/', 1)[1])
+                return (200, key) if key else (404, {'message': 'participation id not found'})
+            return 200, {'catchup-message': f"{method} {unquote(path.rsplit('/', 1)[1])}"}
+        return 404, {'message': f"no route for {path}"}
+
+    def _versions(self) -> Dict:
+        # A node on a network's genesis reports that network's genesis hash
+        try:
+            network = json.loads((self.node.data_dir / 'genesis.json').read_text())['network']
+        except (OSError, ValueError, KeyError):
+            network = None
+        genesis_id, genesis_hash = GENESIS_HASHES.get(network, ('', ''))
+        return {'genesis_id': genesis_id, 'genesis_hash_b64': genesis_hash,
+                'versions': ['v2'], 'build': {'major': 3, 'minor': 0, 'build_number': 0}}
+
+    def _status(self) -> Dict:
+        return {
+            'last-round': self.node.current_round(),
+            'time-since-last-round': 0,
+            'catchup-time': 0,
+            'last-catchpoint': '',
+            'catchpoint': '',
+        }
+
+
+def _algod_handler(algod: SimulatedAlgod):
+    class _Handler(BaseHTTPRequestHandler):
+        def _handle(self):
+            status, body = algod.respond(self.command, self.path,
+                                         self.headers.get('X-Algo-API-Token', ''))
+            payload = json.dumps(body).encode() if body is not None else b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_DELETE = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    return _Handler
+
+
+class SimulatedBackend(CommandBackend):
+    """
+    Command backend that answers from a script instead of running anything.
+
+    apt-get, apt-cache, dpkg, dpkg-deb, systemctl, goal, diagcfg, tee and
+    the venv/pip commands are scripted against a SimulatedNode; apt-get
+    download writes simulated .deb files that dpkg installs, so offline
+    installs from the artifact cache run too. Each call sleeps for a
+    latency drawn from the scripted distribution, scaled by the node's
+    time_scale, before its effects apply. Other programs fail with exit
+    status 127 unless scripted with script().
+    """
+
+    def __init__(self,
+                 node: SimulatedNode,
+                 latencies: Optional[Dict[str, Tuple[float, float]]] = None,
+                 seed: Optional[int] = None):
+        self.node = node
+        self.latencies = {**DEFAULT_LATENCIES, **(latencies or {})}
+        self.calls: List[Tuple[List[str], float]] = []  # (command, simulated seconds)
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._calls_lock = threading.Lock()
+        self._local = threading.local()  # Working directory of the running command
+        self._handlers: Dict[str, Handler] = {
+            'apt-get': self._apt_get,
+            'apt-cache': self._apt_cache,
+            'dpkg': self._dpkg,
+            'dpkg-deb': self._dpkg_deb,
+            'systemctl': self._systemctl,
+            'goal': self._goal,
+            'diagcfg': self._diagcfg,
+            'tee': self._tee,
+            'python': self._python,
+            'install': _succeed,
+            'sync': _succeed,
+            'mv': _succeed,
+            'lsb_release': lambda args, input: (0, "Release:\t22.04\n", ''),
+        }
+
+    def script(self, program: str, handler: Handler,
+               latency: Optional[Tuple[float, float]] = None) -> None:
+        """Answer a program with handler(args, input) -> (status, stdout, stderr)."""
+        self._handlers[program] = handler
+        if latency is not None:
+            self.latencies[program] = latency
+
+    def command_time(self) -> float:
+        """Total simulated seconds spent in commands so far."""
+        with self._calls_lock:
+            return sum(seconds for _, seconds in self.calls)
+
+    def run(self,
+            cmd: List[str],
+            input=None,
+            capture_output: bool = False,
+            timeout: Optional[float] = None,
+            **kwargs) -> CommandResult:
+        args = _strip_sudo([str(arg) for arg in cmd])
+        program = os.path.basename(args[0])
+        if program.startswith('python'):
+            program = 'python'
+        if isinstance(input, str):
+            input = input.encode()
+
+        delay = self._latency(program, args[1:])
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        time.sleep(delay)
+        with self._calls_lock:
+            self.calls.append((list(cmd), delay))
+
+        handler = self._handlers.get(program)
+        self._local.cwd = kwargs.get('cwd')
+        if handler is None:
+            returncode, stdout, stderr = 127, '', f"{program}: command not found\n"
+        else:
+            returncode, stdout, stderr = handler(args[1:], input)
+
+        text = kwargs.get('text') or kwargs.get('universal_newlines') or kwargs.get('encoding')
+        captured_out = capture_output or kwargs.get('stdout') == subprocess.PIPE
+        captured_err = capture_output or kwargs.get('stderr') == subprocess.PIPE
+        return CommandResult(
+            cmd, returncode,
+            _output(stdout, captured_out, text),
+            _output(stderr, captured_err, text)
+        )
+
+    def _latency(self, program: str, args: List[str]) -> float:
+        key = program
+        for candidate in (' '.join([program] + args[:2]), ' '.join([program] + args[:1])):
+            if candidate in self.latencies:
+                key = candidate
+                break
+        mean, jitter = self.latencies.get(key, self.latencies['*'])
+        with self._random_lock:
+            seconds = max(0.0, self._random.gauss(mean, jitter))
+            if key == 'apt-get install':
+                mean, jitter = PACKAGE_INSTALL_TIME
+                for _ in _packages(args):
+                    seconds += max(0.0, self._random.gauss(mean, jitter))
+        return seconds * self.node.time_scale
+
+    def _apt_get(self, args: List[str], input: Optional[bytes]) -> Response:
+        if not args:
+            return 100, '', "E: Invalid operation\n"
+        if args[0] == 'update':
+            (self.node.apt_lists / 'simulated_Packages').touch()
+            return 0, "Reading package lists... Done\n", ''
+        if args[0] == 'install':
+            packages = _packages(args)
+            new = [p for p in packages if p not in self.node.packages]
+            fetched = f"Fetched {len(new) * PACKAGE_DOWNLOAD_KB:,} kB in 1s\n" if new else ''
+            if '--download-only' not in args:
+                self.node.install(packages)
+            setup = ''.join(f"Setting up {p} (1.0.0) ...\n" for p in new)
+            return 0, fetched + setup, ''
+        if args[0] == 'download':
+            directory = Path(self._local.cwd or '.')
+            for package in _packages(args):
+                (directory / f"{package}_1.0.0_amd64.deb").write_text(
+                    f"Package: {package}\nVersion: 1.0.0\nArchitecture: amd64\n"
+                    f"Depends: {', '.join(PACKAGE_DEPENDS.get(package, []))}\n"
+                )
+            return 0, f"Get: {len(_packages(args))} packages\n", ''
+        return 100, '', f"E: Invalid operation {args[0]}\n"
+
+    def _apt_cache(self, args: List[str], input: Optional[bytes]) -> Response:
+        if args[:1] != ['depends']:
+            return 100, '', "E: unsupported simulated apt-cache command\n"
+        lines, queue, seen = [], [a for a in args[1:] if not a.startswith('-')], set()
+        while queue:
+            package = queue.pop(0)
+            if package in seen:
+                continue
+            seen.add(package)
+            lines.append(package)
+            for dependency in PACKAGE_DEPENDS.get(package, []):
+                lines.append(f"  Depends: {dependency}")
+                queue.append(dependency)
+        return 0, ''.join(line + '\n' for line in lines), ''
+
+    def _dpkg(self, args: List[str], input: Optional[bytes]) -> Response:
+        if args[:1] == ['-i']:
+            self.node.install(_control(Path(path))['Package'] for path in args[1:])
+            return 0, '', ''
+        return 2, '', "dpkg: error: unsupported simulated operation\n"
+
+    def _dpkg_deb(self, args: List[str], input: Optional[bytes]) -> Response:
+        if args[:1] != ['-f'] or len(args) < 2:
+            return 2, '', "dpkg-deb: error: unsupported simulated operation\n"
+        fields = _control(Path(args[1]))
+        wanted = args[2:] or list(fields)
+        return 0, ''.join(f"{key}: {fields[key]}\n" for key in wanted if fields.get(key)), ''
+
+    def _systemctl(self, args: List[str], input: Optional[bytes]) -> Response:
+        if not args:
+            return 1, '', "Too few arguments.\n"
+        action, services = args[0], [a for a in args[1:] if not a.startswith('-')]
+        if action in ('start', 'restart'):
+            for service in services:
+                self.node.set_service(service, 'active')
+        elif action == 'stop':
+            for service in services:
+                self.node.set_service(service, 'inactive')
+        elif action == 'enable':
+            self.node.enabled.update(services)
+        elif action == 'is-active':
+            state = self.node.services.get(services[0], 'inactive') if services else 'inactive'
+            return (0 if state == 'active' else 3), state + '\n', ''
+        elif action == 'is-enabled':
+            state = 'enabled' if services and services[0] in self.node.enabled else 'disabled'
+            return (0 if state == 'enabled' else 1), state + '\n', ''
+        elif action == 'show':
+            loaded = services[:1] == ['algorand'] and \
+                bool(ALGORAND_UNIT_PACKAGES & set(self.node.packages))
+            values = {'LoadState': 'loaded' if loaded else 'not-found',
+                      'LimitNOFILE': '65536' if loaded else '524288'}
+            requested = [value for flag, value in zip(args, args[1:]) if flag == '-p']
+            return 0, ''.join(f"{key}={values.get(key, '')}\n" for key in requested), ''
+        elif action != 'daemon-reload':
+            return 1, '', f"Unknown command verb {action}.\n"
+        return 0, '', ''
+
+    def _goal(self, args: List[str], input: Optional[bytes]) -> Response:
+        options = _options(args)
+        if args[:2] == ['account', 'addpartkey']:
+            first = int(options.get('--roundFirstValid', 0))
+            last = int(options.get('--roundLastValid', 0))
+            dilution = int(options.get('--keyDilution', 10000))
+            self.node.add_partkey(options.get('-a', ''), first, last, dilution)
+            return 0, "Participation key generation successful\n", ''
+        if args[:2] == ['account', 'changeonlinestatus']:
+            transaction_file = options.get('--transaction-file')
+            if transaction_file:
+                Path(transaction_file).write_bytes(b'')
+            return 0, f"Transaction written to {transaction_file}\n", ''
+        if args[:2] == ['node', 'status']:
+            return 0, f"Last committed block: {self.node.current_round()}\n", ''
+        return 1, '', f"goal: unsupported simulated command {' '.join(args[:2])}\n"
+
+    def _diagcfg(self, args: List[str], input: Optional[bytes]) -> Response:
+        if args[:1] != ['telemetry']:
+            return 1, '', "diagcfg: unsupported simulated command\n"
+        telemetry = self.node.telemetry
+        if args[1:2] == ['enable']:
+            telemetry['enabled'] = True
+        elif args[1:2] == ['disable']:
+            telemetry['enabled'] = False
+        elif args[1:2] == ['name']:
+            telemetry['name'] = _options(args).get('-n', '')
+            telemetry['enabled'] = True
+        state = 'enabled' if telemetry['enabled'] else 'disabled'
+        return 0, f"Remote logging is {state}\n", ''
+
+    def _tee(self, args: List[str], input: Optional[bytes]) -> Response:
+        data = input or b''
+        for path in args:
+            if not path.startswith('-'):
+                self.node.files[path] = data
+                if os.path.commonpath([path, str(self.node.root)]) == str(self.node.root):
+                    Path(path).parent.mkdir(parents=True, exist_ok=True)
+                    Path(path).write_bytes(data)
+        return 0, data.decode(errors='replace'), ''
+
+    def _python(self, args: List[str], input: Optional[bytes]) -> Response:
+        if args[:2] in (['-m', 'venv'], ['-m', 'pip']):
+            return 0, '', ''
+        return 1, '', "python: unsupported simulated command\n"
+
+
+@contextmanager
+def simulated_system(root: Path,
+                     installed: Iterable[str] = (),
+                     time_scale: float = 1.0,
+                     latencies: Optional[Dict[str, Tuple[float, float]]] = None,
+                     seed: Optional[int] = None) -> Iterator[SimulatedBackend]:
+    """
+    Run the installer's commands against a simulated host under root.
+
+    The shared dpkg index and apt planner read the simulated dpkg status
+    and package lists, and the shared genesis provider the simulated
+    package's genesis files, for the duration. Every command goes through
+    the returned backend, whose node is backend.node.
+    """
+    root = Path(root)
+    node = SimulatedNode(root / 'data', root, installed, time_scale)
+    backend = SimulatedBackend(node, latencies, seed)
+    index = get_dpkg_index()
+    planner = get_apt_planner()
+    genesis = get_genesis_provider()
+    saved = (index.status_file, planner.lists_dir, planner.source_paths, planner.stamp_file)
+    saved_genesis = (genesis.packaged_dirs, genesis.cache_dir, genesis.index_file,
+                     genesis._resolved)
+    index.status_file = node.dpkg_status
+    index.refresh(force=True)
+    planner.lists_dir = node.apt_lists
+    planner.source_paths = []
+    planner.stamp_file = root / 'apt' / 'update.stamp'
+    genesis.packaged_dirs = [node.genesis_dir]
+    genesis.cache_dir = root / 'genesis-cache'
+    genesis.index_file = genesis.cache_dir / 'index.json'
+    genesis._resolved = {}
+    try:
+        with use_backend(backend):
+            yield backend
+    finally:
+        node.close()
+        index.status_file, planner.lists_dir, planner.source_paths, planner.stamp_file = saved
+        genesis.packaged_dirs, genesis.cache_dir, genesis.index_file, genesis._resolved = \
+            saved_genesis
+        index.refresh(force=True)
+
+
+def _strip_sudo(args: List[str]) -> List[str]:
+    if not args or os.path.basename(args[0]) != 'sudo':
+        return args
+    rest = args[1:]
+    while rest and rest[0].startswith('-'):
+        rest = rest[2:] if rest[0] in ('-u', '-g') else rest[1:]
+    return rest or args
+
+
+def _options(args: List[str]) -> Dict[str, str]:
+    """Values of `--flag value` pairs in a command line."""
+    return {flag: value for flag, value in zip(args, args[1:]) if flag.startswith('-')}
+
+
+def _packages(args: List[str]) -> List[str]:
+    packages, skip = [], False
+    for arg in args[1:]:
+        if skip:
+            skip = False
+        elif arg == '-o':
+            skip = True
+        elif not arg.startswith('-'):
+            packages.append(arg)
+    return packages
+
+
+def _control(deb: Path) -> Dict[str, str]:
+    """Control fields of a simulated .deb, which is just its control file."""
+    fields = {}
+    for line in deb.read_text().splitlines():
+        key, _, value = line.partition(':')
+        fields[key] = value.strip()
+    return fields
+
+
+def _output(value: str, captured: bool, text) -> Optional[object]:
+    if not captured:
+        return None
+    return value if text else value.encode()
+
+
+def _succeed(args: List[str], input: Optional[bytes]) -> Response:
+    return 0, '', ''
@@ -5,6 +5,9 @@ import os
 from pathlib import Path
 from typing import List
 
+from utils.apt_planner import get_apt_planner
+from utils.python_env import ensure_python_environment, venv_python as venv_python_path
+
 def check_python_version() -> None:
     """Check if Python version meets minimum requirements."""
     if sys.version_info < (3, 7):
@@ -17,31 +20,23 @@ def setup_virtual_environment() -> str:
     print("Setting up virtual environment...")
     try:
         # Install python3-venv if not present
-        subprocess.run(
-            ['sudo', 'apt-get', 'update'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        subprocess.run(
-            ['sudo', 'apt-get', 'install', '-y', 'python3-venv', 'python3-full'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
+        planner = get_apt_planner()
+        planner.request(['python3-venv', 'python3-full'])
+        planner.commit(quiet=True)
         
-        # Create venv directory in the installer directory
+        # Create venv directory in the installer directory, reusing an
+        # existing one rather than rebuilding it
         venv_path = Path(__file__).parent / 'venv'
-        subprocess.run(
-            [sys.executable, '-m', 'venv', str(venv_path)],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
+        if not venv_python_path(venv_path).exists():
+            subprocess.run(
+                [sys.executable, '-m', 'venv', str(venv_path)],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE
+            )
         
         # Return path to venv's Python
-        return str(venv_path / 'bin' / 'python3')
+        return str(venv_python_path(venv_path))
         
     except subprocess.CalledProcessError as e:
         print("Error: Failed to setup virtual environment")
@@ -52,22 +47,13 @@ def install_packages(venv_python: str, packages: List[str]) -> None:
     """Install required packages in virtual environment."""
     print("Installing required Python packages...")
     try:
-        # Upgrade pip in virtual environment
-        subprocess.run(
-            [venv_python, '-m', 'pip', 'install', '--upgrade', 'pip'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        # Install required packages
-        subprocess.run(
-            [venv_python, '-m', 'pip', 'install'] + packages,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        print("✔ All Python packages installed successfully")
+        # Installs from the local wheelhouse, and not at all if the venv
+        # already satisfies the package set
+        venv_path = Path(venv_python).parent.parent
+        if ensure_python_environment(packages, venv_path):
+            print("✔ All Python packages installed successfully")
+        else:
+            print("✔ Python packages already satisfied")
         
     except subprocess.CalledProcessError as e:
         print("Error: Failed to install required Python packages.")
@@ -83,7 +69,7 @@ def main():
     
     # Setup virtual environment
     venv_python = setup_virtual_environment()
-    print("✔ Virtual environment created")
+    print("✔ Virtual environment ready")
     
     # Define required packages
     packages = [
@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 import queue
+import time
 from pathlib import Path
 from typing import Optional
 from .settings_dialog import AdvancedSettingsDialog
@@ -11,7 +12,7 @@ class InstallerGUI:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Algorand Node Installer")
-        self.root.geometry("700x500")
+        self.root.geometry("700x560")
         
         # Setup queue for thread-safe GUI updates
         self.queue = queue.Queue()
@@ -22,10 +23,15 @@ class InstallerGUI:
     def _setup_variables(self):
         """Initialize GUI variables."""
         self.network_var = tk.StringVar(value="mainnet")
+        self.fast_catchup_var = tk.BooleanVar(value=False)
         self.relay_var = tk.BooleanVar(value=False)
         self.archival_var = tk.BooleanVar(value=False)
         self.telemetry_var = tk.BooleanVar(value=False)
         self.install_dir_var = tk.StringVar(value=str(Path.home() / 'algorand'))
+        self.offline_var = tk.BooleanVar(value=False)
+        
+        from utils.artifact_cache import DEFAULT_CACHE_DIR
+        self.artifact_cache_var = tk.StringVar(value=str(DEFAULT_CACHE_DIR))
         
     def _setup_gui(self):
         """Setup the main GUI elements."""
@@ -100,6 +106,12 @@ class InstallerGUI:
                 value=network.lower(),
                 variable=self.network_var
             ).grid(row=0, column=i, padx=10)
+        
+        ttk.Checkbutton(
+            network_frame,
+            text="Fast catchup (sync from latest catchpoint)",
+            variable=self.fast_catchup_var
+        ).grid(row=1, column=0, columnspan=3, sticky=tk.W, padx=10, pady=(5, 0))
             
     def _add_node_configuration(self):
         """Add node configuration controls."""
@@ -150,28 +162,51 @@ class InstallerGUI:
             command=self._browse_directory
         ).grid(row=0, column=1, padx=5)
         
+        # Packages come only from a filled artifact cache, without network access
+        ttk.Checkbutton(
+            dir_frame,
+            text="Offline install from artifact cache:",
+            variable=self.offline_var
+        ).grid(row=1, column=0, sticky=tk.W, padx=5, pady=(5, 0))
+        
+        ttk.Entry(
+            dir_frame,
+            textvariable=self.artifact_cache_var,
+            width=30
+        ).grid(row=2, column=0, sticky=tk.W, padx=5)
+        
+        ttk.Button(
+            dir_frame,
+            text="Browse",
+            command=lambda: self._browse_directory(self.artifact_cache_var)
+        ).grid(row=2, column=1, padx=5)
+        
     def _on_relay_change(self):
         """Handle relay node checkbox changes."""
         if self.relay_var.get():
             self.archival_var.set(True)  # Relay nodes must be archival
             
-    def _browse_directory(self):
+    def _browse_directory(self, variable: Optional[tk.StringVar] = None):
         """Show directory selection dialog."""
         from tkinter import filedialog
+        variable = variable or self.install_dir_var
         directory = filedialog.askdirectory(
-            initialdir=self.install_dir_var.get()
+            initialdir=variable.get()
         )
         if directory:
-            self.install_dir_var.set(directory)
+            variable.set(directory)
             
     def show_advanced_settings(self):
         """Show advanced settings dialog."""
         from utils.config_manager import AlgorandConfig
+        from utils.config_tuner import tune_for_host
         
+        data_dir = Path(self.install_dir_var.get()) / 'data'
         config_manager = AlgorandConfig(
-            Path(self.install_dir_var.get()) / 'data',
+            data_dir,
             is_relay=self.relay_var.get()
         )
+        config_manager.update_config({'Archival': self.archival_var.get()})
         
         def save_settings(updates):
             config_manager.update_config(updates)
@@ -180,7 +215,8 @@ class InstallerGUI:
         AdvancedSettingsDialog(
             self.root,
             config_manager.get_config(),
-            save_settings
+            save_settings,
+            tuner=lambda: tune_for_host(config_manager.role, data_dir)
         )
         
     def start_installation(self):
@@ -216,13 +252,20 @@ class InstallerGUI:
                 'network': self.network_var.get(),
                 'is_relay': self.relay_var.get(),
                 'is_archival': self.archival_var.get(),
-                'enable_telemetry': self.telemetry_var.get()
+                'enable_telemetry': self.telemetry_var.get(),
+                'fast_catchup': self.fast_catchup_var.get(),
+                'offline_install': self.offline_var.get(),
+                'artifact_cache_dir': (Path(self.artifact_cache_var.get())
+                                       if self.offline_var.get() else None)
             })
+            installer.on_progress = lambda percent, message: self.queue.put(
+                ('progress', percent, message)
+            )
             
             success = installer.run_installation()
             
             if success:
-                self.queue.put(('done', None))
+                self.queue.put(('done', installer.config['data_dir']))
             else:
                 self.queue.put(('error', "Installation failed. Check logs for details."))
                 
@@ -245,10 +288,57 @@ class InstallerGUI:
                     messagebox.showinfo("Success", 
                                       "Algorand node installed successfully!")
                     self._set_interface_state('normal')
+                    self._start_sync_monitor(msg[1])
+                elif msg[0] == 'sync':
+                    if msg[1] is not None:
+                        self.progress_var.set(msg[1])
+                    self.status_var.set(msg[2])
+                elif msg[0] == 'synced':
+                    self.progress_var.set(100)
+                    self.status_var.set(msg[1])
                     return
         except queue.Empty:
             self.root.after(100, self._check_queue)
             
+    def _start_sync_monitor(self, data_dir: Path):
+        """Report sync progress and ETA until the node is synced."""
+        self.progress_var.set(0)
+        self.status_var.set("Waiting for node to report sync progress...")
+        thread = threading.Thread(
+            target=self._monitor_sync,
+            args=(data_dir, self.network_var.get())
+        )
+        thread.daemon = True
+        thread.start()
+        
+    def _monitor_sync(self, data_dir: Path, network: str, interval: float = 5.0):
+        """Sample the node's round and post progress updates."""
+        from utils.algod_client import AlgodClient, AlgodError
+        from utils.sync_monitor import SyncSampler, describe
+        
+        try:
+            sampler = SyncSampler(AlgodClient.from_data_dir(data_dir), network)
+        except AlgodError as e:
+            self.queue.put(('synced', f"Sync progress unavailable: {str(e)}"))
+            return
+            
+        while True:
+            try:
+                estimate = sampler.sample()
+            except AlgodError:
+                time.sleep(interval)
+                continue
+            if estimate['synced']:
+                self.queue.put(('synced', describe(estimate)))
+                return
+            progress = estimate['progress']
+            self.queue.put((
+                'sync',
+                progress * 100 if progress is not None else None,
+                describe(estimate)
+            ))
+            time.sleep(interval)
+            
     def run(self):
         """Start the GUI."""
         self.root.mainloop()
@@ -1,19 +1,41 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
+import os
+import re
+import queue
+import threading
 import subprocess
+from pathlib import Path
+
+ADDRESS_PATTERN = re.compile(r'\b[A-Z2-7]{58}\b')
 
 class AlgorandKeyManagerGUI:
     def __init__(self, master):
         self.master = master
         master.title("Algorand Key Manager")
 
-        self.key_list = tk.Listbox(master, height=10, width=50)
+        self.data_dir = Path(os.environ.get('ALGORAND_DATA', '/var/lib/algorand'))
+        self.queue = queue.Queue()
+
+        self.key_list = tk.Listbox(master, height=10, width=50, selectmode=tk.EXTENDED)
         self.generate_button = ttk.Button(master, text="Generate Key", command=self.generate_key)
         self.sign_button = ttk.Button(master, text="Sign Transaction", command=self.sign_transaction)
+        self.partkey_button = ttk.Button(master, text="Generate Participation Keys",
+                                         command=self.generate_participation_keys)
+        self.status_button = ttk.Button(master, text="Participation Status",
+                                        command=self.show_participation_status)
+        self.progress_var = tk.DoubleVar()
+        self.progress = ttk.Progressbar(master, length=300, mode='determinate',
+                                        variable=self.progress_var)
+        self.status_var = tk.StringVar()
 
-        self.key_list.grid(row=0, column=0, columnspan=2, padx=10, pady=10)
+        self.key_list.grid(row=0, column=0, columnspan=4, padx=10, pady=10)
         self.generate_button.grid(row=1, column=0, padx=5, pady=10)
         self.sign_button.grid(row=1, column=1, padx=5, pady=10)
+        self.partkey_button.grid(row=1, column=2, padx=5, pady=10)
+        self.status_button.grid(row=1, column=3, padx=5, pady=10)
+        self.progress.grid(row=2, column=0, columnspan=4, padx=10)
+        ttk.Label(master, textvariable=self.status_var).grid(row=3, column=0, columnspan=4, pady=(0, 10))
 
         self.update_key_list()
 
@@ -46,6 +68,141 @@ class AlgorandKeyManagerGUI:
         except subprocess.CalledProcessError as e:
             messagebox.showerror("Error", f"Failed to sign transaction: {e}")
 
+    def generate_participation_keys(self):
+        addresses = []
+        for index in self.key_list.curselection():
+            match = ADDRESS_PATTERN.search(self.key_list.get(index))
+            if match:
+                addresses.append(match.group(0))
+        if not addresses:
+            messagebox.showerror("Error", "Please select one or more accounts.")
+            return
+
+        first_round = simpledialog.askinteger("Participation Keys", "First valid round:", minvalue=0)
+        if first_round is None:
+            return
+        last_round = simpledialog.askinteger("Participation Keys", "Last valid round:",
+                                             minvalue=first_round + 1)
+        if last_round is None:
+            return
+
+        from utils.participation_manager import ParticipationManager, PartKeyRequest
+
+        requests = [PartKeyRequest(address, first_round, last_round) for address in addresses]
+        manager = ParticipationManager(self.data_dir)
+
+        def progress(result, completed, total):
+            state = "generated" if result.success else "failed"
+            self.queue.put(('progress', completed * 100 / total,
+                            f"{result.request.address[:8]}... {state} "
+                            f"in {result.duration:.1f}s ({completed}/{total})"))
+
+        def run():
+            try:
+                summary = manager.generate_participation_keys(requests, progress_callback=progress)
+                self.queue.put(('done', summary))
+            except Exception as e:
+                self.queue.put(('error', str(e)))
+
+        self.partkey_button['state'] = 'disabled'
+        self.progress_var.set(0)
+        self.status_var.set(f"Generating {len(requests)} participation keys...")
+        threading.Thread(target=run, daemon=True).start()
+        self.master.after(100, self._check_queue)
+
+    def _selected_addresses(self):
+        indices = self.key_list.curselection() or range(self.key_list.size())
+        addresses = []
+        for index in indices:
+            match = ADDRESS_PATTERN.search(self.key_list.get(index))
+            if match:
+                addresses.append(match.group(0))
+        return addresses
+
+    def show_participation_status(self):
+        addresses = self._selected_addresses()
+        if not addresses:
+            messagebox.showerror("Error", "No accounts to check.")
+            return
+
+        from utils.participation_manager import ParticipationManager
+
+        window = tk.Toplevel(self.master)
+        window.title("Participation Status")
+        columns = ('address', 'state', 'stake', 'vote_key', 'last_proposed', 'last_heartbeat')
+        headings = ('Address', 'State', 'Stake (ALGO)', 'Vote Key', 'Last Proposed', 'Last Heartbeat')
+        tree = ttk.Treeview(window, columns=columns, show='headings', height=15)
+        for column, heading in zip(columns, headings):
+            tree.heading(column, text=heading)
+            tree.column(column, width=420 if column == 'address' else 110,
+                        anchor=tk.W if column == 'address' else tk.E)
+        tree.grid(row=0, column=0, padx=10, pady=10)
+        status_var = tk.StringVar(value=f"Checking {len(addresses)} accounts...")
+        ttk.Label(window, textvariable=status_var).grid(row=1, column=0, pady=(0, 10))
+
+        results = queue.Queue()
+        manager = ParticipationManager(self.data_dir)
+        threading.Thread(
+            target=lambda: results.put(manager.check_participation_statuses(addresses)),
+            daemon=True
+        ).start()
+
+        def show_results():
+            try:
+                statuses = results.get_nowait()
+            except queue.Empty:
+                window.after(100, show_results)
+                return
+            for row in statuses.values():
+                if row['error']:
+                    tree.insert('', tk.END, values=(row['address'], 'error', '', row['error'], '', ''))
+                    continue
+                if row['vote_last_valid'] is None:
+                    vote_key = '-'
+                elif row['vote_key_valid']:
+                    vote_key = f"until {row['vote_last_valid']}"
+                else:
+                    vote_key = 'expired'
+                tree.insert('', tk.END, values=(
+                    row['address'],
+                    'online' if row['online'] else 'offline',
+                    f"{row['stake'] / 1e6:,.6f}" if row['stake'] is not None else '-',
+                    vote_key,
+                    row['last_proposed'] or '-',
+                    row['last_heartbeat'] or '-'
+                ))
+            online = sum(1 for row in statuses.values() if row['online'])
+            status_var.set(f"{online} of {len(statuses)} accounts online")
+
+        window.after(100, show_results)
+
+    def _check_queue(self):
+        try:
+            while True:
+                msg = self.queue.get_nowait()
+                if msg[0] == 'progress':
+                    self.progress_var.set(msg[1])
+                    self.status_var.set(msg[2])
+                elif msg[0] == 'error':
+                    self.partkey_button['state'] = 'normal'
+                    messagebox.showerror("Error", f"Failed to generate participation keys: {msg[1]}")
+                    return
+                elif msg[0] == 'done':
+                    summary = msg[1]
+                    self.partkey_button['state'] = 'normal'
+                    self.status_var.set(f"Generated {summary['succeeded']} keys "
+                                        f"in {summary['wall_time']:.1f}s")
+                    lines = [f"{key['address'][:8]}...: "
+                             f"{'ok' if key['success'] else 'failed'} in {key['duration']:.1f}s"
+                             for key in summary['keys']]
+                    show = messagebox.showinfo if not summary['failed'] else messagebox.showwarning
+                    show("Participation Keys",
+                         f"{summary['succeeded']} generated, {summary['failed']} failed\n\n"
+                         + "\n".join(lines))
+                    return
+        except queue.Empty:
+            self.master.after(100, self._check_queue)
+
 if __name__ == "__main__": 
     root = tk.Tk()
     app = AlgorandKeyManagerGUI(root)
@@ -3,6 +3,14 @@ from tkinter import ttk, messagebox, simpledialog
 import subprocess
 import threading
 import os
+import time
+from collections import deque
+from pathlib import Path
+from utils.log_tailer import LogTailer
+from utils.log_query import LEVELS, LogFilter, format_record, log_files, query
+
+MAX_LOG_LINES = 2000
+FILTER_WINDOW_SECONDS = 24 * 60 * 60  # Filtered views search the last day
 
 class AlgorandNodeMonitorGUI:
     def __init__(self, master):
@@ -25,16 +33,110 @@ class AlgorandNodeMonitorGUI:
         self.start_button.grid(row=3, column=0, padx=5, pady=10)
         self.stop_button.grid(row=3, column=1, padx=5, pady=10)
         self.restart_button.grid(row=3, column=2, padx=5, pady=10)
+        self._add_filter_controls()
 
         self.log_file = os.path.expanduser("~/node/data/node.log")
+        self.log_tailer = LogTailer(self.log_file)
+        self.log_lines = deque(maxlen=MAX_LOG_LINES)  # Most recent lines only
+        self.log_filter = None
         self.poll_log()
 
+    def _add_filter_controls(self):
+        """Add controls for filtered log views."""
+        filter_frame = ttk.LabelFrame(self.master, text="Filter", padding=5)
+        filter_frame.grid(row=4, column=0, columnspan=3, padx=10, pady=(0, 10), sticky="WE")
+
+        self.level_var = tk.StringVar(value="")
+        self.component_var = tk.StringVar(value="")
+        self.pattern_var = tk.StringVar(value="")
+
+        ttk.Label(filter_frame, text="Min level:").grid(row=0, column=0, padx=2)
+        ttk.Combobox(
+            filter_frame,
+            textvariable=self.level_var,
+            values=[""] + LEVELS,
+            width=8,
+            state="readonly"
+        ).grid(row=0, column=1, padx=2)
+        ttk.Label(filter_frame, text="Component:").grid(row=0, column=2, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.component_var, width=12).grid(row=0, column=3, padx=2)
+        ttk.Label(filter_frame, text="Message regex:").grid(row=0, column=4, padx=2)
+        ttk.Entry(filter_frame, textvariable=self.pattern_var, width=16).grid(row=0, column=5, padx=2)
+        ttk.Button(filter_frame, text="Apply", command=self.apply_filter).grid(row=0, column=6, padx=2)
+        ttk.Button(filter_frame, text="Clear", command=self.clear_filter).grid(row=0, column=7, padx=2)
+
+    def apply_filter(self):
+        try:
+            log_filter = LogFilter(
+                min_level=self.level_var.get() or None,
+                since=time.time() - FILTER_WINDOW_SECONDS,
+                component=self.component_var.get().strip() or None,
+                pattern=self.pattern_var.get() or None
+            )
+        except Exception as e:
+            messagebox.showerror("Invalid Filter", str(e))
+            return
+
+        self.log_filter = log_filter
+        self.status_var.set("Searching logs...")
+        # Each search hands its lines to its own poller
+        result = []
+
+        def search():
+            # The sparse time index lets this seek to the window start
+            matches = deque(maxlen=MAX_LOG_LINES)
+            try:
+                paths = log_files(Path(self.log_file).parent)
+                for record in query(paths, log_filter):
+                    matches.append(format_record(record))
+            except Exception as e:
+                matches.append(f"Log search failed: {str(e)}")
+            result.append(list(matches))
+
+        threading.Thread(target=search, daemon=True).start()
+        self.master.after(200, self._show_filter_results, log_filter, result)
+
+    def _show_filter_results(self, log_filter, result):
+        if not result:
+            self.master.after(200, self._show_filter_results, log_filter, result)
+            return
+        lines = result[0]
+        # Results of a search superseded by a later Apply or Clear are dropped
+        if log_filter is self.log_filter:
+            self._replace_log_text(lines)
+            self.status_var.set(f"{len(lines)} matching log lines")
+
+    def clear_filter(self):
+        self.log_filter = None
+        self._replace_log_text(list(self.log_lines))
+        self.status_var.set("")
+
+    def _replace_log_text(self, lines):
+        self.log_text.delete("1.0", tk.END)
+        if lines:
+            self.log_text.insert(tk.END, "\n".join(lines) + "\n")
+        self.log_text.see(tk.END)
+
+    def _append_log_text(self, lines):
+        self.log_text.insert(tk.END, "\n".join(lines[-MAX_LOG_LINES:]) + "\n")
+        
+        # Keep the widget bounded to the same number of lines as the ring
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete("1.0", f"{line_count - MAX_LOG_LINES + 1}.0")
+        self.log_text.see(tk.END)
+
     def poll_log(self):
-        with open(self.log_file, "r") as f:
-            log = f.read()
-            self.log_text.delete(1.0, tk.END)
-            self.log_text.insert(tk.END, log)
-            self.log_text.see(tk.END)
+        new_lines = self.log_tailer.poll()
+        if new_lines:
+            self.log_lines.extend(new_lines)
+            if self.log_filter is None:
+                self._append_log_text(new_lines)
+            else:
+                matches = [self.log_filter.match(line) for line in new_lines]
+                matches = [format_record(record) for record in matches if record]
+                if matches:
+                    self._append_log_text(matches)
 
         self.master.after(5000, self.poll_log)  # Poll every 5 seconds
 
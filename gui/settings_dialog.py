@@ -1,15 +1,23 @@
 # gui/settings_dialog.py
 import tkinter as tk
-from tkinter import ttk
-from typing import Dict, Any, Callable
+from tkinter import ttk, messagebox
+import queue
+import threading
+from typing import Dict, Any, Callable, Optional
 
 class AdvancedSettingsDialog:
-    def __init__(self, parent, config: Dict[str, Any], on_save: Callable[[Dict[str, Any]], None]):
+    def __init__(self,
+                 parent,
+                 config: Dict[str, Any],
+                 on_save: Callable[[Dict[str, Any]], None],
+                 tuner: Optional[Callable[[], Any]] = None):
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Advanced Node Settings")
-        self.dialog.geometry("600x400")
+        self.dialog.geometry("600x480")
         self.config = config
         self.on_save = on_save
+        self.tuner = tuner  # Returns a TuningProfile for this host
+        self.variables = {}
         self._setup_gui()
         
     def _setup_gui(self):
@@ -40,13 +48,33 @@ class AdvancedSettingsDialog:
         self._add_performance_settings(perf_frame)
         self._add_api_settings(api_frame)
         
+        # Rationale for auto-tuned values
+        self.rationale_var = tk.StringVar()
+        ttk.Label(
+            self.dialog,
+            textvariable=self.rationale_var,
+            wraplength=560,
+            justify='left'
+        ).pack(fill='x', padx=10)
+        
+        button_frame = ttk.Frame(self.dialog)
+        button_frame.pack(pady=10)
+        
+        if self.tuner is not None:
+            self.tune_btn = ttk.Button(
+                button_frame,
+                text="Auto-tune for this Host",
+                command=self._auto_tune
+            )
+            self.tune_btn.grid(row=0, column=0, padx=5)
+        
         # Add save button
         save_btn = ttk.Button(
-            self.dialog,
+            button_frame,
             text="Save Settings",
             command=self._save_settings
         )
-        save_btn.pack(pady=10)
+        save_btn.grid(row=0, column=1, padx=5)
         
     def _add_basic_settings(self, parent):
         """Add basic node settings."""
@@ -96,8 +124,6 @@ class AdvancedSettingsDialog:
         frame = ttk.LabelFrame(parent, text=title, padding=10)
         frame.pack(fill='x', padx=10, pady=5)
         
-        self.variables = {}
-        
         for i, (label, key, type_) in enumerate(settings):
             ttk.Label(frame, text=label).grid(row=i, column=0, sticky='w', padx=5, pady=2)
             
@@ -111,6 +137,46 @@ class AdvancedSettingsDialog:
             widget.grid(row=i, column=1, padx=5, pady=2)
             self.variables[key] = (var, type_)
             
+    def _auto_tune(self):
+        """Measure the host in the background and fill in recommended values."""
+        results = queue.Queue()
+        
+        def run():
+            try:
+                results.put(('profile', self.tuner()))
+            except Exception as e:
+                results.put(('error', str(e)))
+        
+        def check():
+            try:
+                kind, value = results.get_nowait()
+            except queue.Empty:
+                self.dialog.after(100, check)
+                return
+            self.tune_btn['state'] = 'normal'
+            if kind == 'error':
+                self.rationale_var.set("")
+                messagebox.showerror("Auto-tune", f"Could not tune settings: {value}",
+                                     parent=self.dialog)
+                return
+            self._apply_profile(value)
+        
+        self.tune_btn['state'] = 'disabled'
+        self.rationale_var.set("Measuring host...")
+        threading.Thread(target=run, daemon=True).start()
+        self.dialog.after(100, check)
+        
+    def _apply_profile(self, profile):
+        """Show a tuning profile's values in the matching controls."""
+        changed = []
+        for key, value in profile.settings.items():
+            if key not in self.variables:
+                continue
+            var, type_ = self.variables[key]
+            var.set(value if type_ == "boolean" else str(value))
+            changed.append(f"{key}: {profile.rationale[key]}")
+        self.rationale_var.set(f"Tuned for a {profile.role} node. " + "; ".join(changed))
+        
     def _save_settings(self):
         """Save the settings and close dialog."""
         updates = {}
@@ -1,9 +1,11 @@
 # install.py
 import sys
-import subprocess
 import os
 from pathlib import Path
 
+from utils.apt_planner import get_apt_planner
+from utils.python_env import ensure_python_environment, read_requirements
+
 def check_python_version():
     """Check if Python version meets minimum requirements."""
     if sys.version_info < (3, 7):
@@ -14,42 +16,21 @@ def check_python_version():
 def setup_environment():
     """Ensure virtual environment and GUI dependencies are set up properly."""
     try:
-        # Install system dependencies including GUI requirements
-        subprocess.run(
-            ['sudo', 'apt-get', 'update'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        # Install required packages including tkinter
-        subprocess.run(
-            ['sudo', 'apt-get', 'install', '-y', 
-             'python3-venv', 
-             'python3-full',
-             'python3-tk'],  # Required for GUI
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        # Setup virtual environment
-        venv_path = Path('venv')
-        if not venv_path.exists():
-            subprocess.run(
-                [sys.executable, '-m', 'venv', str(venv_path)],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE
-            )
+        # Install system dependencies including GUI requirements;
+        # package lists are only refreshed if something is missing
+        planner = get_apt_planner()
+        planner.request([
+            'python3-venv',
+            'python3-full',
+            'python3-tk'  # Required for GUI
+        ])
+        planner.commit(quiet=True)
         
-        # Install requirements in virtual environment
-        venv_pip = venv_path / 'bin' / 'pip'
-        subprocess.run(
-            [str(venv_pip), 'install', '-r', 'requirements.txt'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
+        # Setup virtual environment and install requirements, skipped
+        # entirely when the venv fingerprint and installed pins match
+        ensure_python_environment(
+            read_requirements(Path('requirements.txt')),
+            Path('venv')
         )
         
         # Create activation script that launches GUI
@@ -1,16 +1,53 @@
 # main.py
 import sys
 import os
+import re
+import argparse
 import subprocess
 import logging
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 import json
+import time
 import uuid
+import urllib.request
+
+from utils import (config_tuner, dependencies, python_env, storage_benchmark, system_checks,
+                   tracing)
+from utils.apt_planner import DEFAULT_METADATA_TTL, get_apt_planner
+from utils.artifact_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_CACHE_BYTES, DebArtifactCache
+from utils.config_store import (ALGOD_DEFAULTS, CONFIG_FILE, GENESIS_FILE, LOGGING_FILE,
+                                PHONEBOOK_FILE, get_config_store)
+from utils.dpkg_index import get_dpkg_index
+from utils.fast_catchup import CATCHPOINT_URL_TEMPLATE
+from utils.install_journal import JOURNAL_FILE, InstallJournal, digest, file_fingerprint
+from utils.install_plan import (APT_UPDATE_ESTIMATE, DEFAULT_ESTIMATES, PACKAGE_ESTIMATE,
+                                InstallPlan, PlannedStep, config_diff, port_in_use, run_probes)
+from utils.logging_config import setup_logging
+from utils.network_manager import NetworkManager
+from utils.readiness import DEFAULT_DEADLINE, wait_for_node_ready
+from utils.step_executor import SUCCEEDED, StepExecutor
+
+ALGORAND_KEY_URL = 'https://releases.algorand.com/key.pub'
+ALGORAND_KEY_FILE = '/etc/apt/trusted.gpg.d/algorand.asc'
+PREREQUISITE_PACKAGES = ['gnupg2', 'curl', 'software-properties-common']
+ALGORAND_REPOSITORY = 'deb [arch=amd64] https://releases.algorand.com/deb/ stable main'
+ALGORAND_SOURCES_FILE = '/etc/apt/sources.list.d/algorand.list'
+ALGORAND_PACKAGES = PREREQUISITE_PACKAGES + ['algorand-devtools']
+DEFAULT_ENDPOINT_ADDRESS = '127.0.0.1:8080'
+INSTALLER_HOME = Path.home() / '.algorand-installer'
+INSTALL_REPORT_DIR = INSTALLER_HOME / 'reports'
+ENVIRONMENT_MARKER = '# Added by the Algorand node installer'
+_ALGORAND_DATA_EXPORT = re.compile(r'^\s*export\s+ALGORAND_DATA=')
 
 class AlgorandInstaller:
-    def __init__(self):
-        """Initialize the Algorand node installer."""
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the Algorand node installer.
+        
+        Args:
+            config: Overrides for the default installer settings
+        """
         self.config = {
             'data_dir': '/var/lib/algorand',
             'logging_config': {
@@ -24,157 +61,798 @@ class AlgorandInstaller:
                 'FilePath': '',  # Will be set during configuration
                 'UserName': '',  # Default empty for Algorand hosted endpoint
                 'Password': ''   # Default empty for Algorand hosted endpoint
-            }
+            },
+            'max_parallel_steps': 4,
+            'repository_key_url': ALGORAND_KEY_URL,
+            'repository_key_file': ALGORAND_KEY_FILE,
+            'sources_file': ALGORAND_SOURCES_FILE,
+            'python_environment': True,  # Prepare the installer's own venv
+            'apt_metadata_ttl': DEFAULT_METADATA_TTL,
+            'artifact_cache_dir': None,  # Local .deb store, disabled by default
+            'artifact_cache_max_bytes': DEFAULT_MAX_CACHE_BYTES,
+            'offline_install': False,  # Install only from the artifact cache
+            'network': 'mainnet',
+            'fast_catchup': False,
+            'catchpoint_url': CATCHPOINT_URL_TEMPLATE,
+            'readiness_deadline': DEFAULT_DEADLINE,
+            'is_relay': False,
+            'is_archival': False,
+            'storage_benchmark': True,  # Measure the data disk during install
+            'tune_config': True,  # Size config.json for this host and role
+            'relay_discovery': False,  # Prefer the lowest latency relays
+            'preferred_relays': 8,
+            'installer_home': INSTALLER_HOME,  # Install logs go under logs/
+            'report_dir': INSTALL_REPORT_DIR,
+            'journal_file': None,  # Defaults to journal.json under installer_home
+            'resume': True,  # Skip steps an earlier run completed
         }
+        self.config.update(config or {})
+        self.time_to_ready: Dict[str, float] = {}
+        # Optional callback receiving (percent complete, status message)
+        self.on_progress: Optional[Callable[[float, str], None]] = None
+        self.system_facts: Dict[str, Any] = {}
+        self.step_timings: Dict[str, Any] = {}
+        self.storage_report: Dict[str, Any] = {}
+        self.plan_report: Dict[str, Any] = {}
+        self._repository_key = b''
         self._setup_logging()
         
     def _setup_logging(self) -> None:
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
+        try:
+            setup_logging(Path(self.config['installer_home']))
+        except OSError:
+            logging.basicConfig(
+                level=logging.INFO,
+                format='%(asctime)s - %(levelname)s - %(message)s'
+            )
         self.logger = logging.getLogger(__name__)
 
+    def _stage_telemetry_config(self) -> None:
+        """Write logging.config contents ahead of telemetry configuration."""
+        self.logger.info("Staging telemetry configuration files...")
+        
+        # Create global config directory
+        global_config_dir = Path.home() / '.algorand'
+        global_config_dir.mkdir(parents=True, exist_ok=True)
+        global_config_file = global_config_dir / 'logging.config'
+        
+        # Node config is staged in the config store and written once the
+        # algorand user and data directory exist
+        store = get_config_store(Path(self.config['data_dir']))
+        node_config_file = store.data_dir / LOGGING_FILE
+        
+        # Keep the node's telemetry identity across reinstalls; a new GUID
+        # would otherwise force a restart every run
+        existing_guid = store.load(LOGGING_FILE).get('GUID')
+        if existing_guid:
+            self.config['logging_config']['GUID'] = existing_guid
+        
+        for config_path in [global_config_file, node_config_file]:
+            config_content = self.config['logging_config'].copy()
+            config_content['FilePath'] = str(config_path)
+            
+            if config_path == node_config_file:
+                store.stage(LOGGING_FILE, config_content)
+            else:
+                # Global config can be written directly
+                with open(config_path, 'w') as f:
+                    json.dump(config_content, f, indent=2)
+        
+        self.config['logging_config']['FilePath'] = str(node_config_file)
+
     def _configure_telemetry(self) -> None:
         """Configure telemetry settings for the node."""
         try:
             self.logger.info("Setting up telemetry configuration...")
             
-            # Create global config directory
-            global_config_dir = Path.home() / '.algorand'
-            global_config_dir.mkdir(parents=True, exist_ok=True)
-            global_config_file = global_config_dir / 'logging.config'
+            store = get_config_store(Path(self.config['data_dir']))
+            if not store.has_staged(LOGGING_FILE):
+                self._stage_telemetry_config()
             
-            # Create node-specific config directory
-            node_config_dir = Path(self.config['data_dir'])
-            node_config_file = node_config_dir / 'logging.config'
-            
-            # Update config files
-            for config_path in [global_config_file, node_config_file]:
-                self.config['logging_config']['FilePath'] = str(config_path)
-                config_content = self.config['logging_config'].copy()
-                
-                # Write config with proper permissions
-                if config_path == node_config_file:
-                    # Write to temporary file first for node config
-                    temp_path = Path('/tmp/logging.config.tmp')
-                    with open(temp_path, 'w') as f:
-                        json.dump(config_content, f, indent=2)
-                    
-                    # Move to final location with proper ownership
-                    subprocess.run([
-                        'sudo', 'mv', str(temp_path), str(config_path)
-                    ], check=True)
-                    
-                    subprocess.run([
-                        'sudo', 'chown', 'algorand:algorand', str(config_path)
-                    ], check=True)
-                    
-                    subprocess.run([
-                        'sudo', 'chmod', '644', str(config_path)
-                    ], check=True)
-                else:
-                    # Global config can be written directly
-                    with open(config_path, 'w') as f:
-                        json.dump(config_content, f, indent=2)
+            # Written as the algorand user only if it differs from what the
+            # node already has; any restart is left to start_service
+            store.commit()
             
             # Disable telemetry initially using diagcfg
             self.logger.info("Initializing telemetry settings...")
-            subprocess.run([
+            tracing.run([
                 'sudo', '-u', 'algorand', '-H', '-E',
                 'diagcfg', 'telemetry', 'disable'
             ], check=True)
             
             # Verify telemetry configuration
             self.logger.info("Verifying telemetry configuration...")
-            result = subprocess.run([
+            result = tracing.run([
                 'sudo', '-u', 'algorand', '-H', '-E',
                 'diagcfg', 'telemetry'
             ], capture_output=True, text=True, check=True)
             
             if "is disabled" not in result.stdout:
                 raise Exception("Telemetry verification failed")
-            
-            # Restart node to apply telemetry settings
-            self.logger.info("Restarting node to apply telemetry settings...")
-            subprocess.run(['sudo', 'systemctl', 'restart', 'algorand'], check=True)
-            
-            # Wait for service to fully start
-            subprocess.run(['sleep', '5'], check=True)
-            
-            # Verify service is running
-            result = subprocess.run([
-                'sudo', 'systemctl', 'status', 'algorand'
-            ], capture_output=True, text=True)
-            if "active (running)" not in result.stdout:
-                raise Exception("Node failed to restart after telemetry configuration")
                 
         except Exception as e:
             self.logger.error(f"Failed to configure telemetry: {str(e)}")
             raise
 
-    def run_installation(self) -> bool:
-        """Run the Ubuntu-specific installation process."""
+    def _fetch_repository_key(self) -> None:
+        # Fetched in-process so it does not wait for curl to be installed
+        self.logger.info("Fetching Algorand repository key...")
+        with urllib.request.urlopen(self.config['repository_key_url'], timeout=30) as response:
+            self._repository_key = response.read()
+        tracing.add_bytes(len(self._repository_key))
+
+    def _install_repository_key(self) -> None:
+        if not self._repository_key:
+            # fetch_repository_key was skipped as up to date
+            self._fetch_repository_key()
+        self.logger.info("Adding Algorand repository key...")
+        tracing.run(
+            ['sudo', 'tee', str(self.config['repository_key_file'])],
+            input=self._repository_key,
+            stdout=subprocess.DEVNULL,
+            check=True
+        )
+
+    def _add_repository(self) -> None:
+        sources_file = Path(self.config['sources_file'])
+        if sources_file.exists() and sources_file.read_text().strip() == ALGORAND_REPOSITORY:
+            self.logger.info("Algorand repository already configured")
+            return
+        self.logger.info("Adding Algorand repository...")
+        tracing.run(
+            ['sudo', 'tee', str(sources_file)],
+            input=(ALGORAND_REPOSITORY + '\n').encode(),
+            stdout=subprocess.DEVNULL,
+            check=True
+        )
+        get_apt_planner().mark_sources_changed()
+
+    def _install_packages(self) -> None:
+        # Prerequisites and Algorand go into a single apt transaction
+        planner = get_apt_planner()
+        planner.request(PREREQUISITE_PACKAGES)
+        planner.request(['algorand-devtools'])
+        if not planner.commit():
+            self.logger.info("Algorand and prerequisites already installed")
+
+    def _setup_python_environment(self) -> None:
+        self.logger.info("Preparing Python environment...")
+        dependencies._setup_python_environment()
+
+    def _probe_system(self) -> None:
+        self.system_facts = system_checks.collect_system_facts(Path(self.config['data_dir']))
+        self.logger.info(f"System facts: {self.system_facts}")
+
+    def _node_role(self) -> str:
+        if self.config['is_relay']:
+            return 'relay'
+        return 'archival' if self.config['is_archival'] else 'participation'
+
+    def _benchmark_storage(self) -> Optional[Dict[str, Any]]:
+        # Slow storage is reported, not fatal; the node may still keep up
+        role = self._node_role()
         try:
-            # System updates
-            self.logger.info("Updating system packages...")
-            subprocess.run(['sudo', 'apt-get', 'update'], check=True)
-            
-            # Install prerequisites
-            self.logger.info("Installing prerequisites...")
-            subprocess.run([
-                'sudo', 'apt-get', 'install', '-y',
-                'gnupg2', 'curl', 'software-properties-common'
-            ], check=True)
-            
-            # Add Algorand repository key
-            self.logger.info("Adding Algorand repository key...")
-            key_process = subprocess.run(
-                ['curl', '-o', '-', 'https://releases.algorand.com/key.pub'],
-                capture_output=True,
-                check=True
-            )
-            subprocess.run(
-                ['sudo', 'tee', '/etc/apt/trusted.gpg.d/algorand.asc'],
-                input=key_process.stdout,
-                check=True
-            )
-            
-            # Add repository
-            self.logger.info("Adding Algorand repository...")
-            subprocess.run([
-                'sudo', 'add-apt-repository',
-                'deb [arch=amd64] https://releases.algorand.com/deb/ stable main'
-            ], check=True)
-            
-            # Update again after adding repo
-            subprocess.run(['sudo', 'apt-get', 'update'], check=True)
-            
-            # Install Algorand with devtools
-            self.logger.info("Installing Algorand and developer tools...")
-            subprocess.run([
-                'sudo', 'apt-get', 'install', '-y', 'algorand-devtools'
-            ], check=True)
-            
-            # Set environment variable
-            self.logger.info("Setting up environment variables...")
-            bashrc_path = os.path.expanduser('~/.bashrc')
-            env_var = '\nexport ALGORAND_DATA=/var/lib/algorand\n'
-            with open(bashrc_path, 'a') as f:
-                if env_var not in open(bashrc_path).read():
-                    f.write(env_var)
-            
-            # Start and enable service
+            results = storage_benchmark.run_storage_benchmark(Path(self.config['data_dir']))
+        except Exception as e:
+            self.logger.warning(f"Storage benchmark failed: {str(e)}")
+            return None
+        shortfalls = storage_benchmark.evaluate(results, role)
+        for shortfall in shortfalls:
+            self.logger.warning(f"Storage below recommended level: {shortfall}")
+        self.storage_report = {'role': role, 'results': results, 'shortfalls': shortfalls}
+        return self.storage_report
+
+    def _restore_storage_report(self, report: Dict[str, Any]) -> None:
+        self.storage_report = report
+
+    def _tune_config(self) -> None:
+        # Staged only; committed with the telemetry config before the
+        # service starts so tuning costs no extra restart
+        data_dir = Path(self.config['data_dir'])
+        facts = None
+        results = self.storage_report.get('results')
+        if results:
+            # Reuse the benchmark's IOPS rather than loading the disk again
+            facts = system_checks.collect_host_facts(data_dir, measure_iops=False)
+            facts['disk_iops'] = results['random_read_iops']
+        profile = config_tuner.tune_for_host(self._node_role(), data_dir, facts=facts)
+        # Values already in config.json were set in Advanced Settings or by
+        # hand and win over tuning; the store leaves defaults out of the file
+        store = get_config_store(data_dir)
+        stored = store.load(CONFIG_FILE)
+        settings = {key: value for key, value in profile.settings.items()
+                    if key not in stored or stored[key] == ALGOD_DEFAULTS.get(key)}
+        kept = sorted(set(profile.settings) - set(settings))
+        if kept:
+            self.logger.info(f"Keeping configured values for {', '.join(kept)}")
+        store.stage(CONFIG_FILE, settings)
+
+    def write_install_report(self, success: bool) -> Optional[Path]:
+        """
+        Save timings, host facts, the storage benchmark and trace spans as
+        JSON, with a Chrome trace of the run alongside.
+        """
+        tracer = tracing.get_tracer()
+        report = {
+            'success': success,
+            'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'network': self.config['network'],
+            'role': self._node_role(),
+            'system_facts': self.system_facts,
+            'storage': self.storage_report,
+            'step_timings': self.step_timings,
+            'plan': self.plan_report,
+            'time_to_ready': self.time_to_ready,
+            'apt': get_apt_planner().report(),
+            'trace': tracer.report(),
+        }
+        try:
+            report_dir = Path(self.config['report_dir'])
+            report_dir.mkdir(parents=True, exist_ok=True)
+            stem = f"install-{time.strftime('%Y%m%d-%H%M%S')}"
+            report_file = report_dir / f"{stem}.json"
+            trace_file = report_dir / f"{stem}.trace.json"
+            report['trace_file'] = str(trace_file)
+            with open(report_file, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+            tracer.write_chrome_trace(trace_file)
+            self.logger.info(f"Install report saved to {report_file}, trace to {trace_file}")
+            return report_file
+        except OSError as e:
+            self.logger.warning(f"Could not save install report: {str(e)}")
+            return None
+
+    def _environment_export(self) -> str:
+        return f"export ALGORAND_DATA={self.config['data_dir']}"
+
+    def _set_environment(self) -> None:
+        self.logger.info("Setting up environment variables...")
+        bashrc_path = Path.home() / '.bashrc'
+        export = self._environment_export()
+        try:
+            lines = bashrc_path.read_text().splitlines()
+        except FileNotFoundError:
+            lines = []
+        if [line for line in lines if _ALGORAND_DATA_EXPORT.match(line)] == [export]:
+            self.logger.info("ALGORAND_DATA is already set in ~/.bashrc")
+            return
+        # Replace earlier exports, including ones with another data dir or
+        # different spacing, rather than appending another
+        lines = [line for line in lines
+                 if line != ENVIRONMENT_MARKER and not _ALGORAND_DATA_EXPORT.match(line)]
+        lines.extend([ENVIRONMENT_MARKER, export])
+        tmp = bashrc_path.with_name('.bashrc.algorand-installer')
+        tmp.write_text('\n'.join(lines) + '\n')
+        if bashrc_path.exists():
+            os.chmod(tmp, bashrc_path.stat().st_mode & 0o7777)
+        os.replace(tmp, bashrc_path)
+
+    def _start_service(self) -> None:
+        # The package may already have started algod; restart it only if
+        # committed config changes need it, all in one restart
+        store = get_config_store(Path(self.config['data_dir']))
+        restart = lambda: tracing.run(['sudo', 'systemctl', 'restart', 'algorand'], check=True)
+        if not store.apply_restart(restart):
             self.logger.info("Starting Algorand service...")
-            subprocess.run(['sudo', 'systemctl', 'start', 'algorand'], check=True)
-            subprocess.run(['sudo', 'systemctl', 'enable', 'algorand'], check=True)
-            
-            # Wait for service to fully start before configuring telemetry
-            subprocess.run(['sleep', '5'], check=True)
-            
-            # Configure telemetry after node is running
-            self._configure_telemetry()
-            
+            tracing.run(['sudo', 'systemctl', 'start', 'algorand'], check=True)
+
+    def _enable_service(self) -> None:
+        tracing.run(['sudo', 'systemctl', 'enable', 'algorand'], check=True)
+
+    def _wait_for_service(self) -> None:
+        # Wait for service to fully start before catching up
+        readiness = wait_for_node_ready(Path(self.config['data_dir']),
+                                        deadline=self.config['readiness_deadline'])
+        self.time_to_ready['service_start'] = readiness.time_to_ready
+        if not readiness:
+            raise Exception(f"Algorand service did not become ready: {readiness.detail}")
+
+    def _verify_genesis(self) -> None:
+        # Fails the install if the genesis algod loaded, whether packaged or
+        # downloaded, is not the selected network's pinned one
+        NetworkManager(Path(self.config['data_dir'])).verify_genesis(self.config['network'])
+
+    def _fast_catchup(self) -> None:
+        network = self.config['network']
+        self.logger.info(f"Starting fast catchup for {network}...")
+        
+        def report(phase: str, fraction: float) -> None:
+            if self.on_progress:
+                self.on_progress(fraction * 100, f"Fast catchup: {phase}")
+        
+        manager = NetworkManager(Path(self.config['data_dir']))
+        if not manager.fast_catchup(network, self.config['catchpoint_url'], report):
+            self.logger.info("Node will sync from its current round")
+
+    def _setup_network(self) -> None:
+        # genesis.json is written now and config.json staged; a changed
+        # genesis restarts the node along with the config in start_service
+        manager = NetworkManager(Path(self.config['data_dir']))
+        manager.setup_network(self.config['network'], commit=False)
+
+    def _discover_relays(self) -> None:
+        # Staged only; committed with the telemetry config before the service
+        # starts so the phonebook costs no extra restart
+        manager = NetworkManager(Path(self.config['data_dir']))
+        try:
+            manager.discover_relays(self.config['network'], self.config['preferred_relays'],
+                                    commit=False)
+        except Exception as e:
+            self.logger.warning(f"Relay discovery failed, using DNS bootstrap only: {str(e)}")
+
+    def _configure_apt_planner(self) -> None:
+        planner = get_apt_planner()
+        planner.metadata_ttl = self.config['apt_metadata_ttl']
+        planner.offline = self.config['offline_install']
+        cache_dir = self.config['artifact_cache_dir']
+        if cache_dir is None and planner.offline:
+            cache_dir = DEFAULT_CACHE_DIR
+        if cache_dir is not None:
+            planner.artifact_cache = DebArtifactCache(
+                Path(cache_dir),
+                max_bytes=self.config['artifact_cache_max_bytes']
+            )
+
+    def fill_artifact_cache(self) -> List[Dict[str, Any]]:
+        """
+        Download the installer's packages and everything they depend on into
+        the artifact cache, so that other hosts can install from a copy of
+        it offline. The Algorand repository must be configured on this host.
+
+        Returns:
+            Index entries of the downloaded artifacts
+        """
+        cache = DebArtifactCache(
+            Path(self.config['artifact_cache_dir'] or DEFAULT_CACHE_DIR),
+            max_bytes=self.config['artifact_cache_max_bytes']
+        )
+        planner = get_apt_planner()
+        planner.metadata_ttl = self.config['apt_metadata_ttl']
+        planner.refresh()
+        return cache.fill(ALGORAND_PACKAGES)
+
+    def _open_journal(self) -> InstallJournal:
+        path = self.config['journal_file'] or Path(self.config['installer_home']) / JOURNAL_FILE
+        return InstallJournal(Path(path))
+
+    # Verification probes for the install journal. Each returns a
+    # fingerprint of the state a step leaves behind, or None if that state
+    # is missing, and must be cheap enough to run on every install.
+
+    def _probe_repository_key(self) -> Optional[str]:
+        return file_fingerprint(Path(self.config['repository_key_file']))
+
+    def _probe_repository(self) -> Optional[str]:
+        return file_fingerprint(Path(self.config['sources_file']))
+
+    def _probe_packages(self) -> Optional[str]:
+        versions = self._package_versions()
+        return None if None in versions.values() else digest(versions)
+
+    def _probe_python_environment(self) -> Optional[str]:
+        venv_path = python_env.DEFAULT_VENV_PATH
+        if not python_env.environment_is_current(venv_path, dependencies.PYTHON_PACKAGES):
+            return None
+        return file_fingerprint(venv_path / python_env.FINGERPRINT_FILE)
+
+    def _probe_telemetry_config(self) -> Optional[str]:
+        fingerprints = [
+            file_fingerprint(Path.home() / '.algorand' / 'logging.config'),
+            file_fingerprint(Path(self.config['data_dir']) / LOGGING_FILE),
+        ]
+        return None if None in fingerprints else digest(fingerprints)
+
+    def _probe_node_config(self) -> Optional[str]:
+        return file_fingerprint(Path(self.config['data_dir']) / CONFIG_FILE)
+
+    def _probe_node_logging_config(self) -> Optional[str]:
+        return file_fingerprint(Path(self.config['data_dir']) / LOGGING_FILE)
+
+    def _probe_network(self) -> Optional[str]:
+        data_dir = Path(self.config['data_dir'])
+        if NetworkManager(data_dir).get_current_network() != self.config['network']:
+            return None
+        return file_fingerprint(data_dir / GENESIS_FILE)
+
+    def _probe_phonebook(self) -> Optional[str]:
+        return file_fingerprint(Path(self.config['data_dir']) / PHONEBOOK_FILE)
+
+    def _probe_environment(self) -> Optional[str]:
+        try:
+            lines = (Path.home() / '.bashrc').read_text().splitlines()
+        except OSError:
+            return None
+        exports = [line for line in lines if _ALGORAND_DATA_EXPORT.match(line)]
+        return digest(exports) if exports == [self._environment_export()] else None
+
+    def _probe_data_disk(self) -> Optional[str]:
+        probe_dir = storage_benchmark.existing_parent(Path(self.config['data_dir']))
+        return digest(os.stat(probe_dir).st_dev)
+
+    def _unit_probe(self, query: str, expected: str) -> Callable[[], Optional[str]]:
+        def probe() -> Optional[str]:
+            state = self._unit_state(query)
+            return state if state == expected else None
+        return probe
+
+    def _unit_state(self, query: str) -> str:
+        result = tracing.run(['systemctl', query, 'algorand'], capture_output=True, text=True)
+        return result.stdout.strip() or 'unknown'
+
+    def _package_versions(self) -> Dict[str, Optional[str]]:
+        index = get_dpkg_index()
+        return {package: index.get_version(package) for package in ALGORAND_PACKAGES}
+
+    def build_installation_steps(self) -> StepExecutor:
+        """
+        Describe the installation as a dependency graph of steps.
+
+        Steps carry their inputs and a verification probe, so that with
+        resume enabled a rerun skips what an earlier run completed.
+        """
+        executor = StepExecutor(max_workers=self.config['max_parallel_steps'],
+                                journal=self._open_journal())
+        self._configure_apt_planner()
+        data_dir = str(self.config['data_dir'])
+        package_inputs = {'packages': ALGORAND_PACKAGES, 'offline': self.config['offline_install']}
+        # The GUID is new on every run unless kept from an existing config
+        telemetry_inputs = {
+            'data_dir': data_dir,
+            'logging_config': {key: value for key, value in self.config['logging_config'].items()
+                               if key not in ('GUID', 'FilePath')},
+        }
+        
+        if self.config['offline_install']:
+            # Everything comes from the artifact cache; no repository needed
+            executor.add_step('install_packages', self._install_packages,
+                              inputs=package_inputs, probe=self._probe_packages)
+        else:
+            # The repository is written directly rather than through
+            # add-apt-repository, so it does not wait on any package install
+            key_inputs = {'url': str(self.config['repository_key_url']),
+                          'file': str(self.config['repository_key_file'])}
+            executor.add_step('fetch_repository_key', self._fetch_repository_key,
+                              inputs=key_inputs, probe=self._probe_repository_key)
+            executor.add_step('install_repository_key', self._install_repository_key,
+                              depends_on=['fetch_repository_key'],
+                              inputs=key_inputs, probe=self._probe_repository_key)
+            executor.add_step('add_repository', self._add_repository,
+                              depends_on=['install_repository_key'],
+                              inputs={'repository': ALGORAND_REPOSITORY,
+                                      'file': str(self.config['sources_file'])},
+                              probe=self._probe_repository)
+            executor.add_step('install_packages', self._install_packages,
+                              depends_on=['add_repository'],
+                              inputs=package_inputs, probe=self._probe_packages)
+        
+        # Independent of the package chain
+        if self.config['python_environment']:
+            executor.add_step('python_environment', self._setup_python_environment,
+                              inputs={'requirements': dependencies.PYTHON_PACKAGES},
+                              probe=self._probe_python_environment)
+        executor.add_step('system_probes', self._probe_system)
+        executor.add_step('stage_telemetry_config', self._stage_telemetry_config,
+                          inputs=telemetry_inputs, probe=self._probe_telemetry_config,
+                          applied_later=True)
+        executor.add_step('set_environment', self._set_environment,
+                          inputs={'data_dir': data_dir}, probe=self._probe_environment)
+        # Disk measurements wait for apt and pip to stop writing, and run one
+        # after the other, so neither measures contention
+        disk_writers = ['install_packages', 'system_probes']
+        if self.config['python_environment']:
+            disk_writers.append('python_environment')
+        if self.config['storage_benchmark']:
+            executor.add_step('storage_benchmark', self._benchmark_storage,
+                              depends_on=disk_writers,
+                              inputs={'data_dir': data_dir, 'role': self._node_role()},
+                              probe=self._probe_data_disk,
+                              restore=self._restore_storage_report)
+        # The package installs mainnet's genesis; the selected network's
+        # replaces it before the service starts on it
+        executor.add_step('setup_network', self._setup_network,
+                          depends_on=['install_packages'],
+                          inputs={'data_dir': data_dir, 'network': self.config['network']},
+                          probe=self._probe_network, applied_later=True)
+        config_steps = ['install_packages', 'stage_telemetry_config', 'setup_network']
+        if self.config['tune_config']:
+            # Tuned from the benchmark's measurements when there are any; the
+            # descriptor limit is the algorand unit's, installed by then
+            executor.add_step('tune_config', self._tune_config,
+                              depends_on=(['storage_benchmark'] if self.config['storage_benchmark']
+                                          else disk_writers),
+                              inputs={'data_dir': data_dir, 'role': self._node_role()},
+                              probe=self._probe_node_config, applied_later=True)
+            config_steps.append('tune_config')
+        if self.config['relay_discovery']:
+            executor.add_step('discover_relays', self._discover_relays,
+                              inputs={'data_dir': data_dir, 'network': self.config['network'],
+                                      'preferred_relays': self.config['preferred_relays']},
+                              probe=self._probe_phonebook, applied_later=True)
+            config_steps.append('discover_relays')
+        
+        # Config is written before the service starts so that it is applied
+        # by a single start or restart
+        executor.add_step('configure_telemetry', self._configure_telemetry,
+                          depends_on=config_steps,
+                          inputs=telemetry_inputs, probe=self._probe_node_logging_config)
+        executor.add_step('start_service', self._start_service,
+                          depends_on=['configure_telemetry'],
+                          inputs={'data_dir': data_dir},
+                          probe=self._unit_probe('is-active', 'active'))
+        executor.add_step('enable_service', self._enable_service,
+                          depends_on=['install_packages'],
+                          probe=self._unit_probe('is-enabled', 'enabled'))
+        executor.add_step('wait_for_service', self._wait_for_service,
+                          depends_on=['start_service'])
+        executor.add_step('verify_genesis', self._verify_genesis,
+                          depends_on=['wait_for_service', 'setup_network'])
+        if self.config['fast_catchup']:
+            executor.add_step('fast_catchup', self._fast_catchup,
+                              depends_on=['wait_for_service', 'enable_service', 'setup_network',
+                                          'verify_genesis'])
+        return executor
+
+    def plan(self, from_step: Optional[str] = None) -> InstallPlan:
+        """
+        Decide what an installation would do on this host, without changing it.
+
+        The current state is read by probes that run concurrently: packages,
+        apt sources, the service unit, node config files, genesis, the
+        Python environment, ports and disk. Raises ValueError if from_step
+        is not a known step.
+
+        Args:
+            from_step: Plan to rerun this step and every step that depends
+                on it, whatever their current state
+        """
+        started = time.perf_counter()
+        with tracing.get_tracer().span('plan', 'install', network=self.config['network']):
+            executor = self.build_installation_steps()
+            forced = set(executor.downstream(from_step)) if from_step is not None else set()
+            facts, errors = run_probes(self._plan_probes(executor))
+        probe_time = time.perf_counter() - started
+        steps, warnings = self._plan_steps(executor, facts, forced)
+        warnings.extend(f"Could not probe {name}: {error}" for name, error in errors.items())
+        return InstallPlan(self, steps, facts, warnings, probe_time, from_step=from_step)
+
+    def _plan_probes(self, executor: StepExecutor) -> Dict[str, Callable[[], Any]]:
+        data_dir = Path(self.config['data_dir'])
+        store = get_config_store(data_dir)
+
+        def read_text(path: Path) -> Optional[str]:
+            try:
+                return path.read_text()
+            except FileNotFoundError:
+                return None
+
+        def read_json(path: Path) -> Optional[Dict[str, Any]]:
+            text = read_text(path)
+            return json.loads(text) if text is not None else None
+
+        def ports() -> Dict[str, bool]:
+            config = store.load(CONFIG_FILE)
+            addresses = [config.get('EndpointAddress') or DEFAULT_ENDPOINT_ADDRESS]
+            if config.get('NetAddress'):
+                addresses.append(config['NetAddress'])
+            return {address: port_in_use(address) for address in addresses}
+
+        def algod_endpoint() -> Optional[bool]:
+            # algod writes algod.net once its REST API is listening
+            address = read_text(data_dir / 'algod.net')
+            return port_in_use(address.strip().split('://', 1)[-1]) if address else None
+
+        probes: Dict[str, Callable[[], Any]] = {
+            'packages': self._package_versions,
+            'apt_lists_fresh': get_apt_planner().lists_are_fresh,
+            'service_active': lambda: self._unit_state('is-active'),
+            'service_enabled': lambda: self._unit_state('is-enabled'),
+            'node_logging_config': lambda: store.load(LOGGING_FILE),
+            'global_logging_config': lambda: read_json(Path.home() / '.algorand' / 'logging.config'),
+            'genesis_network': lambda: NetworkManager(data_dir).get_current_network(),
+            'environment': lambda: self._probe_environment() is not None,
+            'ports': ports,
+            'algod_listening': algod_endpoint,
+            'free_space_gb': lambda: system_checks._get_available_space(data_dir),
+        }
+        if not self.config['offline_install']:
+            probes['repository_key'] = self._probe_repository_key
+            probes['sources'] = lambda: read_text(Path(self.config['sources_file']))
+        if self.config['python_environment']:
+            probes['python_environment'] = lambda: python_env.environment_is_current(
+                python_env.DEFAULT_VENV_PATH, dependencies.PYTHON_PACKAGES)
+        if self.config['relay_discovery']:
+            probes['phonebook'] = lambda: (data_dir / PHONEBOOK_FILE).exists()
+        if executor.journal is not None:
+            # Host measurements are too slow to repeat for a plan; these
+            # steps are planned from what the journal recorded instead
+            journaled = [executor.steps[name] for name in ('storage_benchmark', 'tune_config')
+                         if name in executor.steps]
+            probes['journaled'] = lambda: {
+                step.name: executor.journal.is_complete(step.name, step.inputs, step.probe())
+                for step in journaled
+            }
+        return probes
+
+    def _plan_steps(self,
+                    executor: StepExecutor,
+                    facts: Dict[str, Any],
+                    forced: Set[str]) -> Tuple[List[PlannedStep], List[str]]:
+        """Decide each step from the probed facts, in dependency order."""
+        data_dir = Path(self.config['data_dir'])
+        decisions: Dict[str, Tuple[bool, str, List[str]]] = {}
+        warnings: List[str] = []
+
+        def decide(name: str, run: bool, reason: str, details: Optional[List[str]] = None) -> None:
+            decisions[name] = (run, reason, details or [])
+
+        def runs(name: str) -> bool:
+            return name in decisions and decisions[name][0]
+
+        if not self.config['offline_install']:
+            key_missing = facts.get('repository_key') is None
+            decide('fetch_repository_key', key_missing,
+                   'repository key missing' if key_missing else 'repository key present')
+            decide('install_repository_key', key_missing,
+                   f"write {self.config['repository_key_file']}" if key_missing
+                   else 'repository key present')
+            sources = facts.get('sources')
+            if sources is not None and sources.strip() == ALGORAND_REPOSITORY:
+                decide('add_repository', False, 'repository configured')
+            else:
+                details = [f"- {line}" for line in (sources or '').splitlines() if line.strip()]
+                details.append(f"+ {ALGORAND_REPOSITORY}")
+                decide('add_repository', True, f"write {self.config['sources_file']}", details)
+
+        versions = facts.get('packages') or {package: None for package in ALGORAND_PACKAGES}
+        missing = [package for package, version in versions.items() if version is None]
+        refresh = bool(missing) and (runs('add_repository') or not facts.get('apt_lists_fresh'))
+        if missing:
+            decide('install_packages', True,
+                   f"install {len(missing)} packages" + (' after apt update' if refresh else ''),
+                   [f"+ {package}" for package in missing])
+        else:
+            decide('install_packages', False, 'packages installed',
+                   [f"= {package} {version}" for package, version in versions.items()])
+
+        if self.config['python_environment']:
+            current = bool(facts.get('python_environment'))
+            decide('python_environment', not current,
+                   'environment current' if current else 'create or update the venv')
+        decide('system_probes', True, 'read host facts for the install report')
+
+        # Same content _stage_telemetry_config would write, keeping the GUID
+        node_logging = facts.get('node_logging_config') or {}
+        desired = dict(self.config['logging_config'],
+                       GUID=node_logging.get('GUID') or self.config['logging_config']['GUID'])
+        node_changes = config_diff(node_logging,
+                                   {**node_logging, **desired,
+                                    'FilePath': str(data_dir / LOGGING_FILE)})
+        global_path = Path.home() / '.algorand' / 'logging.config'
+        global_changes = config_diff(facts.get('global_logging_config') or {},
+                                     dict(desired, FilePath=str(global_path)))
+        decide('stage_telemetry_config', bool(node_changes or global_changes),
+               f"update {global_path}" if global_changes else 'telemetry config unchanged',
+               global_changes)
+
+        exported = bool(facts.get('environment'))
+        decide('set_environment', not exported,
+               'ALGORAND_DATA exported' if exported else 'export ALGORAND_DATA in ~/.bashrc',
+               [] if exported else [f"+ {self._environment_export()}"])
+        network = self.config['network']
+        genesis = facts.get('genesis_network')
+        if genesis == network:
+            decide('setup_network', False, f"{network} genesis installed")
+        else:
+            decide('setup_network', True, f"install {network} genesis and bootstrap",
+                   ([f"- genesis: {genesis}"] if genesis else []) + [f"+ genesis: {network}"])
+        journaled = facts.get('journaled') or {}
+        if self.config['storage_benchmark']:
+            measured = journaled.get('storage_benchmark', False)
+            decide('storage_benchmark', not measured,
+                   'measured by an earlier run' if measured else 'measure the data disk')
+        if self.config['tune_config']:
+            tuned = journaled.get('tune_config', False)
+            decide('tune_config', not tuned,
+                   'tuned by an earlier run' if tuned else 'size config.json for this host')
+        if self.config['relay_discovery']:
+            have_phonebook = bool(facts.get('phonebook'))
+            decide('discover_relays', not have_phonebook,
+                   'phonebook present' if have_phonebook else 'rank relays by latency')
+
+        configure = bool(node_changes) or runs('setup_network') or runs('discover_relays') or \
+            runs('tune_config')
+        decide('configure_telemetry', configure,
+               f"update {data_dir / LOGGING_FILE}" if node_changes
+               else 'write staged config' if configure else 'node logging.config unchanged',
+               node_changes)
+        # _start_service restarts only for committed config changes that
+        # need it; otherwise it starts the unit, a no-op when it is active
+        active = facts.get('service_active')
+        if active != 'active':
+            decide('start_service', True, f"start: service is {active or 'unknown'}")
+        elif runs('setup_network'):
+            decide('start_service', True, f"restart on the {network} genesis")
+        elif node_changes:
+            decide('start_service', True, 'restart to apply logging.config changes')
+        elif configure:
+            decide('start_service', True, 'restart if the staged config changes any file')
+        else:
+            decide('start_service', False, 'service active')
+        enabled = facts.get('service_enabled')
+        decide('enable_service', enabled != 'enabled',
+               'service enabled' if enabled == 'enabled' else f"service is {enabled or 'unknown'}")
+        listening = bool(facts.get('algod_listening'))
+        if runs('start_service') or runs('install_packages') or not listening:
+            # Upgrading the package restarts algod too
+            decide('wait_for_service', True, 'wait for the REST API and a new block')
+        else:
+            decide('wait_for_service', False, 'REST API answering')
+        decide('verify_genesis', True, f"compare the node's genesis with {network}'s pinned hash")
+        if self.config['fast_catchup']:
+            decide('fast_catchup', True, 'catch up if the node is behind')
+
+        if not self.config['resume']:
+            forced = set(executor.steps)
+        journal = executor.journal
+        steps = []
+        for name in executor.topological_order():
+            run, reason, details = decisions.get(name, (True, 'no probe', []))
+            if name in forced and not run:
+                run, reason = True, 'forced' if self.config['resume'] else 'resume disabled'
+            entry = journal.entry(name) if journal is not None else None
+            if name == 'install_packages':
+                estimate = PACKAGE_ESTIMATE * len(missing) + (APT_UPDATE_ESTIMATE if refresh else 0.0)
+            elif entry and entry['status'] == SUCCEEDED and entry.get('finished_at'):
+                # How long it took on this host last time
+                estimate = entry['finished_at'] - entry['started_at']
+            else:
+                estimate = DEFAULT_ESTIMATES.get(name, 1.0)
+            steps.append(PlannedStep(name, run, reason, estimate, details,
+                                     executor.steps[name].depends_on))
+
+        role = self._node_role()
+        free_space = facts.get('free_space_gb')
+        min_space = storage_benchmark.ROLE_THRESHOLDS[role]['min_free_gb']
+        if free_space is not None and free_space < min_space:
+            warnings.append(f"{free_space:.1f}GB free for {data_dir}; a {role} node needs "
+                            f"{min_space:.0f}GB")
+        if active != 'active':
+            for address, in_use in (facts.get('ports') or {}).items():
+                if in_use:
+                    warnings.append(f"{address} is in use but algorand is not running")
+        return steps, warnings
+
+    def run_installation(self,
+                         from_step: Optional[str] = None,
+                         plan: Optional[InstallPlan] = None) -> bool:
+        """
+        Run the Ubuntu-specific installation process.
+
+        Steps that an earlier run completed, and whose probes still pass,
+        are skipped. Raises ValueError if from_step is not a known step.
+
+        Args:
+            from_step: Rerun this step and every step that depends on it,
+                even if the journal shows them complete
+            plan: Run exactly the steps this plan decided to run
+        """
+        executor = self.build_installation_steps()
+        if not self.config['resume']:
+            executor.journal.clear()
+        from_step = plan.from_step if plan is not None else from_step
+        if from_step is not None:
+            forced = executor.rerun_from(from_step)
+            self.logger.info(f"Rerunning from {from_step}: {', '.join(forced)}")
+        if plan is not None:
+            executor.select(plan.to_run)
+            self.plan_report = plan.as_dict()
+            self.logger.info(f"Running planned steps: {', '.join(plan.to_run)}")
+        success = False
+        try:
+            with tracing.get_tracer().span('run_installation', 'install',
+                                           network=self.config['network']):
+                executor.run()
+            success = True
             return True
             
         except subprocess.CalledProcessError as e:
@@ -186,6 +864,13 @@ class AlgorandInstaller:
         except Exception as e:
             self.logger.error(f"Unexpected error during installation: {str(e)}")
             return False
+            
+        finally:
+            executor.log_timing_report()
+            get_apt_planner().log_report()
+            self.step_timings = executor.timing_report()
+            tracing.get_tracer().log_summary()
+            self.write_install_report(success)
 
 def print_usage_info():
     """Print helpful usage information after successful installation."""
@@ -208,10 +893,53 @@ def print_usage_info():
     print("- Service control: sudo systemctl start/stop/restart algorand")
     print("- Wallet operations: sudo -u algorand -E goal account listpartkeys")
 
-def main():
+def main(argv=None):
     """Main entry point for the installer."""
-    installer = AlgorandInstaller()
-    success = installer.run_installation()
+    parser = argparse.ArgumentParser(description="Install and configure an Algorand node")
+    parser.add_argument('--from-step', metavar='STEP',
+                        help="Rerun STEP and the steps that depend on it, even if already complete")
+    parser.add_argument('--no-resume', action='store_true',
+                        help="Discard the install journal and run every step")
+    parser.add_argument('--artifact-cache', metavar='DIR',
+                        help="Keep downloaded .deb files in DIR and install from there")
+    parser.add_argument('--offline', action='store_true',
+                        help="Install packages only from the artifact cache, without network access")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--dry-run', action='store_true',
+                      help="Print what the installation would do and exit without changes")
+    mode.add_argument('--plan', action='store_true',
+                      help="Print the plan, then run only the steps it lists")
+    mode.add_argument('--fill-artifact-cache', action='store_true',
+                      help="Download the packages and their dependencies into the artifact "
+                           "cache for offline installs, and exit")
+    args = parser.parse_args(argv)
+    if args.fill_artifact_cache and args.offline:
+        parser.error("--fill-artifact-cache needs network access and cannot be --offline")
+
+    config: Dict[str, Any] = {'resume': not args.no_resume, 'offline_install': args.offline}
+    if args.artifact_cache:
+        config['artifact_cache_dir'] = Path(args.artifact_cache)
+    installer = AlgorandInstaller(config)
+    if args.fill_artifact_cache:
+        try:
+            entries = installer.fill_artifact_cache()
+        except Exception as e:
+            print(f"\nFilling the artifact cache failed: {str(e)}")
+            return 1
+        print(f"Downloaded {len(entries)} packages into the artifact cache; install from it with "
+              f"--offline --artifact-cache {args.artifact_cache or DEFAULT_CACHE_DIR}")
+        return 0
+    try:
+        if args.dry_run or args.plan:
+            plan = installer.plan(from_step=args.from_step)
+            print(plan.render())
+            if args.dry_run:
+                return 0
+            success = plan.execute()
+        else:
+            success = installer.run_installation(from_step=args.from_step)
+    except ValueError as e:
+        parser.error(str(e))
     if success:
         print_usage_info()
         return 0
@@ -1,20 +1,64 @@
 # utils/__init__.py
 """Utility modules for Algorand node installation."""
 
+from . import algod_client
+from . import apt_planner
+from . import artifact_cache
+from . import command_backend
 from . import config_manager
+from . import config_store
+from . import config_tuner
 from . import dependencies
+from . import dpkg_index
+from . import fast_catchup
+from . import genesis_provider
+from . import install_journal
+from . import install_plan
+from . import key_scheduler
+from . import log_query
+from . import log_tailer
 from . import logging_config
 from . import network_manager
 from . import participation_manager
+from . import partkey_registry
 from . import permissions
+from . import python_env
+from . import readiness
+from . import relay_discovery
+from . import step_executor
+from . import storage_benchmark
+from . import sync_monitor
 from . import system_checks
+from . import tracing
 
 __all__ = [
+    'algod_client',
+    'apt_planner',
+    'artifact_cache',
+    'command_backend',
     'config_manager',
+    'config_store',
+    'config_tuner',
     'dependencies',
+    'dpkg_index',
+    'fast_catchup',
+    'genesis_provider',
+    'install_journal',
+    'install_plan',
+    'key_scheduler',
+    'log_query',
+    'log_tailer',
     'logging_config',
     'network_manager',
     'participation_manager',
+    'partkey_registry',
     'permissions',
-    'system_checks'
+    'python_env',
+    'readiness',
+    'relay_discovery',
+    'step_executor',
+    'storage_benchmark',
+    'sync_monitor',
+    'system_checks',
+    'tracing'
 ]
@@ -0,0 +1,214 @@
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_READ_TTL = 1.0  # A round takes roughly three seconds
+
+
+class AlgodError(Exception):
+    """Raised when an algod REST call fails."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class _SingleFlightCache:
+    """
+    TTL cache where concurrent misses for one key share a single call.
+
+    The first caller for a stale key performs the request; callers that
+    arrive while it is in flight wait for and reuse its result.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[float, Any]] = {}
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._errors: Dict[str, BaseException] = {}
+
+    def get(self, key: str, ttl: float, fetch: Callable[[], Any]) -> Any:
+        while True:
+            with self._lock:
+                cached = self._values.get(key)
+                if cached is not None and time.monotonic() - cached[0] < ttl:
+                    return cached[1]
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = threading.Event()
+                    self._in_flight[key] = event
+                    leader = True
+                else:
+                    leader = False
+
+            if not leader:
+                event.wait()
+                with self._lock:
+                    error = self._errors.get(key)
+                    cached = self._values.get(key)
+                if error is not None:
+                    raise error
+                if cached is not None:
+                    return cached[1]
+                continue
+
+            try:
+                value = fetch()
+            except BaseException as e:
+                with self._lock:
+                    self._errors[key] = e
+                    del self._in_flight[key]
+                event.set()
+                raise
+            with self._lock:
+                self._values[key] = (time.monotonic(), value)
+                self._errors.pop(key, None)
+                del self._in_flight[key]
+            event.set()
+            return value
+
+    def invalidate(self, prefix: str = '') -> None:
+        with self._lock:
+            for key in [k for k in self._values if k.startswith(prefix)]:
+                del self._values[key]
+
+
+class AlgodClient:
+    """
+    algod REST client over a persistent connection pool.
+
+    Read endpoints go through a single-flight TTL cache, so repeated and
+    concurrent reads within the TTL cost one request.
+    """
+
+    def __init__(self,
+                 address: str,
+                 token: str,
+                 admin_token: Optional[str] = None,
+                 timeout: float = 10,
+                 read_ttl: float = DEFAULT_READ_TTL,
+                 session=None):
+        if not address.startswith('http'):
+            address = f"http://{address}"
+        self.address = address.rstrip('/')
+        self.token = token
+        self.admin_token = admin_token
+        self.timeout = timeout
+        self.read_ttl = read_ttl
+        self._session = session
+        self._session_lock = threading.Lock()
+        self._cache = _SingleFlightCache()
+
+    @classmethod
+    def from_data_dir(cls, data_dir: Path, **kwargs) -> 'AlgodClient':
+        """Build a client from the algod.net and algod.token files of a node."""
+        data_dir = Path(data_dir)
+        try:
+            address = (data_dir / 'algod.net').read_text().strip()
+            token = (data_dir / 'algod.token').read_text().strip()
+        except OSError as e:
+            raise AlgodError(f"Could not read algod endpoint from {data_dir}: {str(e)}")
+        admin_token_file = data_dir / 'algod.admin.token'
+        admin_token = admin_token_file.read_text().strip() if admin_token_file.exists() else None
+        return cls(address, token, admin_token=admin_token, **kwargs)
+
+    def status(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get the node status."""
+        return self._cached_get('/v2/status', max_age)
+
+    def versions(self) -> Dict[str, Any]:
+        """Get the node's build and the genesis ID and hash it runs."""
+        return self._cached_get('/versions', None)
+
+    def health(self) -> bool:
+        """Check that algod is serving its REST API (no token required)."""
+        self._request('GET', '/health')
+        return True
+
+    def wait_for_block_after(self, round_number: int, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Block until the node has a round after round_number, or algod times out."""
+        return self._request('GET', f"/v2/status/wait-for-block-after/{round_number}",
+                             timeout=timeout)
+
+    def account(self, address: str, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get an account's state without its assets and applications."""
+        return self._cached_get(f"/v2/accounts/{address}?exclude=all", max_age)
+
+    def participation_keys(self, max_age: Optional[float] = None) -> List[Dict[str, Any]]:
+        """List the participation keys installed on the node."""
+        keys = self._cached_get('/v2/participation', max_age, admin=True)
+        return keys if isinstance(keys, list) else []
+
+    def participation_key(self, participation_id: str,
+                          max_age: Optional[float] = None) -> Dict[str, Any]:
+        """Get a single participation key by ID."""
+        return self._cached_get(f"/v2/participation/{participation_id}", max_age, admin=True)
+
+    def start_catchup(self, catchpoint: str) -> Dict[str, Any]:
+        """Start fast catchup to a catchpoint."""
+        self._cache.invalidate('/v2/status')
+        return self._request('POST', f"/v2/catchup/{quote(catchpoint, safe='')}", admin=True)
+
+    def abort_catchup(self, catchpoint: str) -> Dict[str, Any]:
+        """Abort a fast catchup in progress."""
+        self._cache.invalidate('/v2/status')
+        return self._request('DELETE', f"/v2/catchup/{quote(catchpoint, safe='')}", admin=True)
+
+    def invalidate(self, prefix: str = '') -> None:
+        """Drop cached reads whose path starts with prefix."""
+        self._cache.invalidate(prefix)
+
+    def _cached_get(self, path: str, max_age: Optional[float], admin: bool = False) -> Any:
+        ttl = self.read_ttl if max_age is None else max_age
+        if ttl <= 0:
+            return self._request('GET', path, admin=admin)
+        return self._cache.get(path, ttl, lambda: self._request('GET', path, admin=admin))
+
+    def _request(self,
+                 method: str,
+                 path: str,
+                 admin: bool = False,
+                 timeout: Optional[float] = None,
+                 **kwargs) -> Any:
+        token = self.admin_token if admin and self.admin_token else self.token
+        headers = {'X-Algo-API-Token': token}
+        try:
+            response = self._get_session().request(
+                method,
+                self.address + path,
+                headers=headers,
+                timeout=timeout or self.timeout,
+                **kwargs
+            )
+        except Exception as e:
+            raise AlgodError(f"{method} {path} failed: {str(e)}")
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get('message', response.text)
+            except ValueError:
+                message = response.text
+            raise AlgodError(f"{method} {path} returned {response.status_code}: {message}",
+                             status_code=response.status_code)
+        if not response.content:
+            return {}
+        try:
+            return response.json()
+        except ValueError:
+            raise AlgodError(f"{method} {path} returned invalid JSON")
+
+    def _get_session(self):
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                self._session = requests.Session()
+                # Keep enough pooled connections for concurrent callers
+                adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            return self._session
@@ -0,0 +1,248 @@
+import time
+import logging
+import subprocess
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import tracing
+from .artifact_cache import DebArtifactCache
+from .dpkg_index import get_dpkg_index
+
+logger = logging.getLogger(__name__)
+
+APT_LISTS_DIR = Path('/var/lib/apt/lists')
+APT_SOURCE_PATHS = [
+    Path('/etc/apt/sources.list'),
+    Path('/etc/apt/sources.list.d'),
+    Path('/etc/apt/trusted.gpg.d'),
+]
+# apt gives list files the server's Last-Modified time and leaves them
+# alone on a 304, so the planner stamps its own successful updates
+UPDATE_STAMP_FILE = Path.home() / '.algorand-installer' / 'apt-update.stamp'
+DEFAULT_METADATA_TTL = 6 * 60 * 60  # 6 hours
+
+
+class AptPlanner:
+    """
+    Collects package requests into a single apt transaction.
+
+    `apt-get update` is skipped while the planner's last successful update
+    is younger than the TTL and no apt source has changed since. The
+    planner counts the refreshes and transactions it saved so callers can
+    report them.
+    """
+
+    def __init__(self,
+                 metadata_ttl: float = DEFAULT_METADATA_TTL,
+                 lists_dir: Path = APT_LISTS_DIR,
+                 source_paths: Optional[List[Path]] = None,
+                 stamp_file: Path = UPDATE_STAMP_FILE,
+                 artifact_cache: Optional[DebArtifactCache] = None,
+                 offline: bool = False):
+        self.metadata_ttl = metadata_ttl
+        self.artifact_cache = artifact_cache
+        self.offline = offline
+        self.lists_dir = Path(lists_dir)
+        self.source_paths = source_paths if source_paths is not None else APT_SOURCE_PATHS
+        self.stamp_file = Path(stamp_file)
+        self._required: List[str] = []
+        self._optional: List[str] = []
+        self._sources_changed = False
+        self._lock = threading.RLock()
+        self.stats = {
+            'refreshes_requested': 0,
+            'refreshes_run': 0,
+            'transactions_requested': 0,
+            'transactions_run': 0,
+        }
+
+    def request(self, packages: Iterable[str], optional: bool = False) -> List[str]:
+        """
+        Queue packages for the next transaction.
+
+        Returns:
+            List of packages that still need installing
+        """
+        missing = get_dpkg_index().get_missing(packages)
+        with self._lock:
+            target = self._optional if optional else self._required
+            for package in missing:
+                if package not in self._required and package not in target:
+                    target.append(package)
+        return missing
+
+    def mark_sources_changed(self) -> None:
+        """Force the next refresh, e.g. after adding a repository."""
+        with self._lock:
+            self._sources_changed = True
+
+    def lists_are_fresh(self) -> bool:
+        """Check whether the last update is within the TTL and no source changed since."""
+        if self._newest_mtime([self.lists_dir], skip={'lock', 'partial'},
+                              children_only=True) is None:
+            return False
+        try:
+            updated_at = self.stamp_file.stat().st_mtime
+        except OSError:
+            return False
+        if time.time() - updated_at > self.metadata_ttl:
+            return False
+        sources_mtime = self._newest_mtime(self.source_paths)
+        return sources_mtime is None or sources_mtime <= updated_at
+
+    def refresh(self, force: bool = False, quiet: bool = False) -> bool:
+        """
+        Run `apt-get update` unless the package lists are fresh.
+
+        Returns:
+            bool: True if an update was run
+        """
+        with self._lock:
+            self.stats['refreshes_requested'] += 1
+            if not force and not self._sources_changed and self.lists_are_fresh():
+                logger.info("Package lists are fresh, skipping apt-get update")
+                return False
+
+            logger.info("Updating package lists...")
+            self._run(['sudo', 'apt-get', 'update'], quiet)
+            self._write_stamp()
+            self._sources_changed = False
+            self.stats['refreshes_run'] += 1
+            return True
+
+    def commit(self, quiet: bool = False) -> List[str]:
+        """
+        Install every queued package in one apt transaction.
+
+        Optional packages are dropped with a warning if they cannot be
+        installed alongside the required ones.
+
+        Returns:
+            List of packages that were installed
+        """
+        with self._lock:
+            if self._required or self._optional:
+                self.stats['transactions_requested'] += 1
+            required = get_dpkg_index().get_missing(self._required)
+            optional = get_dpkg_index().get_missing(self._optional)
+            self._required, self._optional = [], []
+            if not required and not optional:
+                # Nothing to install, so the refresh that would have
+                # preceded the transaction is avoided too
+                self.stats['refreshes_requested'] += 1
+                return []
+
+            if self.artifact_cache is not None:
+                return self._commit_from_cache(required, optional, quiet)
+
+            self.refresh(quiet=quiet)
+            try:
+                self._install(required + optional, quiet)
+                return required + optional
+            except subprocess.CalledProcessError:
+                if not optional:
+                    raise
+                logger.warning(
+                    f"Installing optional packages failed, retrying without: {', '.join(optional)}"
+                )
+            if required:
+                self._install(required, quiet)
+            return required
+
+    def _commit_from_cache(self,
+                           required: List[str],
+                           optional: List[str],
+                           quiet: bool) -> List[str]:
+        # Offline installs never refresh or download; otherwise anything
+        # not yet cached is downloaded into the store first
+        cache = self.artifact_cache
+        if self.offline:
+            self.stats['refreshes_requested'] += 1
+        else:
+            uncached = [p for p in required + optional if cache.lookup(p) is None]
+            if uncached:
+                self.refresh(quiet=quiet)
+                try:
+                    cache.fill(uncached)
+                except subprocess.CalledProcessError:
+                    if not optional:
+                        raise
+                    cache.fill([p for p in uncached if p in required])
+
+        optional = [p for p in optional if cache.lookup(p) is not None]
+        installed = cache.install(required + optional, quiet=quiet)
+        if installed:
+            self.stats['transactions_run'] += 1
+        return required + optional
+
+    def report(self) -> Dict[str, int]:
+        """Get counts of apt work run and avoided."""
+        with self._lock:
+            stats = dict(self.stats)
+        stats['refreshes_avoided'] = stats['refreshes_requested'] - stats['refreshes_run']
+        stats['transactions_avoided'] = max(
+            0, stats['transactions_requested'] - stats['transactions_run']
+        )
+        return stats
+
+    def log_report(self) -> None:
+        """Log how much apt work was avoided."""
+        stats = self.report()
+        logger.info(
+            f"apt: {stats['refreshes_run']} refreshes run, {stats['refreshes_avoided']} avoided; "
+            f"{stats['transactions_run']} transactions run, "
+            f"{stats['transactions_avoided']} avoided"
+        )
+
+    def _install(self, packages: List[str], quiet: bool) -> None:
+        logger.info(f"Installing packages: {', '.join(packages)}")
+        self._run(['sudo', 'apt-get', 'install', '-y'] + packages, quiet)
+        self.stats['transactions_run'] += 1
+
+    def _write_stamp(self) -> None:
+        try:
+            self.stamp_file.parent.mkdir(parents=True, exist_ok=True)
+            self.stamp_file.touch()
+        except OSError as e:
+            logger.warning(f"Could not record apt update time: {str(e)}")
+
+    @staticmethod
+    def _run(cmd: List[str], quiet: bool) -> None:
+        if quiet:
+            # Output is captured rather than discarded so the tracer can
+            # count what apt fetched
+            tracing.run(cmd, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        else:
+            tracing.run(cmd, check=True)
+
+    @staticmethod
+    def _newest_mtime(paths: Iterable[Path],
+                      skip: Iterable[str] = (),
+                      children_only: bool = False) -> Optional[float]:
+        newest = None
+        for path in paths:
+            try:
+                candidates = [] if children_only else [path]
+                if path.is_dir():
+                    candidates.extend(p for p in path.iterdir() if p.name not in skip)
+                for candidate in candidates:
+                    mtime = candidate.stat().st_mtime
+                    if newest is None or mtime > newest:
+                        newest = mtime
+            except OSError:
+                continue
+        return newest
+
+
+_planner: Optional[AptPlanner] = None
+_planner_lock = threading.Lock()
+
+
+def get_apt_planner() -> AptPlanner:
+    """Get the shared apt planner for this process."""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = AptPlanner()
+        return _planner
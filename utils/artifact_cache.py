@@ -0,0 +1,301 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import logging
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from . import tracing
+from .dpkg_index import get_dpkg_index
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = Path.home() / '.algorand-installer' / 'debs'
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024**3  # 2GB
+CONTROL_FIELDS = ['Package', 'Version', 'Architecture', 'Pre-Depends', 'Depends', 'Provides']
+
+
+class DebArtifactCache:
+    """
+    Content-addressed local store of .deb files.
+
+    Blobs are stored by SHA256 and indexed by package, version and digest.
+    The index records when each entry was last used so the store can be
+    kept under a size budget by evicting the least recently used entries.
+    Packages can be installed from the store with `dpkg -i` in dependency
+    order without touching the network.
+    """
+
+    def __init__(self,
+                 root: Path = DEFAULT_CACHE_DIR,
+                 max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        self.root = Path(root)
+        self.blob_dir = self.root / 'blobs'
+        self.index_file = self.root / 'index.json'
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    @staticmethod
+    def entry_key(package: str, version: str, sha256: str) -> str:
+        return f"{package}_{version}_{sha256}"
+
+    def entries(self) -> Dict[str, Dict]:
+        """Get the index of cached artifacts."""
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._load_index()
+            return self._entries
+
+    def add(self, deb_path: Path) -> Dict:
+        """
+        Add a .deb file to the store.
+
+        Args:
+            deb_path: Path to the package file
+
+        Returns:
+            Index entry for the stored artifact
+        """
+        deb_path = Path(deb_path)
+        sha256 = self._sha256(deb_path)
+        fields = self._read_control(deb_path)
+        entry = {
+            'package': fields['Package'],
+            'version': fields['Version'],
+            'architecture': fields.get('Architecture', ''),
+            'depends': _parse_depends(fields.get('Pre-Depends', '')) +
+                       _parse_depends(fields.get('Depends', '')),
+            'provides': [names[0] for names in _parse_depends(fields.get('Provides', ''))],
+            'sha256': sha256,
+            'size': deb_path.stat().st_size,
+            'last_used': time.time(),
+        }
+
+        with self._lock:
+            blob = self._blob_path(sha256)
+            if not blob.exists():
+                self.blob_dir.mkdir(parents=True, exist_ok=True)
+                fd, tmp_name = tempfile.mkstemp(dir=str(self.blob_dir), suffix='.tmp')
+                os.close(fd)
+                shutil.copyfile(deb_path, tmp_name)
+                os.replace(tmp_name, blob)
+
+            key = self.entry_key(entry['package'], entry['version'], sha256)
+            self.entries()[key] = entry
+            self._evict()
+            self._save_index()
+        return entry
+
+    def lookup(self, package: str, version: Optional[str] = None) -> Optional[Dict]:
+        """Find the most recently used cached artifact for a package."""
+        with self._lock:
+            matches = [
+                entry for entry in self.entries().values()
+                if (entry['package'] == package or package in entry.get('provides', []))
+                and (version is None or entry['version'] == version)
+                and self._blob_path(entry['sha256']).exists()
+            ]
+        if not matches:
+            return None
+        return max(matches, key=lambda entry: entry['last_used'])
+
+    def fill(self, packages: List[str]) -> List[Dict]:
+        """
+        Download packages and their full dependency closure into the store.
+
+        Dependencies are fetched whether or not they are installed here, so
+        a store seeded on a provisioned host is complete for a bare one.
+        The package lists should be current before calling this.
+        """
+        closure = dependency_closure(packages)
+        with tempfile.TemporaryDirectory(prefix='algorand-debs-') as archive_dir:
+            logger.info(f"Downloading {len(closure)} packages into artifact cache "
+                        f"for {', '.join(packages)}")
+            tracing.run(['apt-get', 'download'] + closure, cwd=archive_dir, check=True)
+            downloaded = sorted(Path(archive_dir).glob('*.deb'))
+            tracing.add_bytes(sum(path.stat().st_size for path in downloaded))
+            return [self.add(path) for path in downloaded]
+
+    def resolve(self, packages: Iterable[str]) -> List[Dict]:
+        """
+        Order cached artifacts for installation, dependencies first.
+
+        Dependencies that are already installed are skipped. Raises if a
+        requested package or a missing dependency is not in the store.
+        """
+        index = get_dpkg_index()
+        ordered: List[Dict] = []
+        visiting = set()
+        visited = set()
+        queued = set()
+
+        def visit(alternatives: List[str], required_by: Optional[str]) -> None:
+            for name in alternatives:
+                if name in visited or name in visiting or index.is_provided(name):
+                    return
+            for name in alternatives:
+                entry = self.lookup(name)
+                if entry is None:
+                    continue
+                if entry['sha256'] in queued:
+                    visited.add(name)
+                    return
+                visiting.add(name)
+                for dep in entry['depends']:
+                    visit(dep, name)
+                visiting.discard(name)
+                visited.add(name)
+                queued.add(entry['sha256'])
+                ordered.append(entry)
+                return
+            wanted = ' | '.join(alternatives)
+            if required_by:
+                raise Exception(f"{wanted} (required by {required_by}) is not in the artifact cache")
+            raise Exception(f"{wanted} is not in the artifact cache")
+
+        for package in packages:
+            visit([package], None)
+        return ordered
+
+    def install(self, packages: List[str], quiet: bool = False) -> List[str]:
+        """
+        Install packages from the store with dpkg in dependency order.
+
+        Returns:
+            List of packages that were installed
+        """
+        ordered = self.resolve(packages)
+        if not ordered:
+            return []
+
+        files = []
+        for entry in ordered:
+            blob = self._blob_path(entry['sha256'])
+            if self._sha256(blob) != entry['sha256']:
+                raise Exception(f"Cached artifact for {entry['package']} failed verification")
+            files.append(str(blob))
+
+        logger.info(f"Installing from artifact cache: {', '.join(e['package'] for e in ordered)}")
+        cmd = ['sudo', 'dpkg', '-i'] + files
+        if quiet:
+            tracing.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        else:
+            tracing.run(cmd, check=True)
+
+        with self._lock:
+            now = time.time()
+            for entry in ordered:
+                entry['last_used'] = now
+            self._save_index()
+        return [entry['package'] for entry in ordered]
+
+    def total_size(self) -> int:
+        with self._lock:
+            return sum(entry['size'] for entry in self.entries().values())
+
+    def _evict(self) -> None:
+        entries = self.entries()
+        total = self.total_size()
+        for key in sorted(entries, key=lambda k: entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            entry = entries.pop(key)
+            total -= entry['size']
+            if not any(e['sha256'] == entry['sha256'] for e in entries.values()):
+                try:
+                    self._blob_path(entry['sha256']).unlink()
+                except OSError:
+                    pass
+            logger.info(f"Evicted {entry['package']} {entry['version']} from artifact cache")
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.blob_dir / f"{sha256}.deb"
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f).get('entries', {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable artifact cache index: {str(e)}")
+            return {}
+
+    def _save_index(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.index_file.with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump({'entries': self.entries()}, f, indent=2)
+        os.replace(tmp, self.index_file)
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _read_control(deb_path: Path) -> Dict[str, str]:
+        result = tracing.run(
+            ['dpkg-deb', '-f', str(deb_path)] + CONTROL_FIELDS,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        fields: Dict[str, str] = {}
+        current = None
+        for line in result.stdout.splitlines():
+            if line[:1] in (' ', '\t') and current:
+                fields[current] += ' ' + line.strip()
+            elif ':' in line:
+                current, value = line.split(':', 1)
+                fields[current] = value.strip()
+        if 'Package' not in fields or 'Version' not in fields:
+            raise Exception(f"{deb_path} is not a valid Debian package")
+        return fields
+
+
+def dependency_closure(packages: List[str]) -> List[str]:
+    """
+    Resolve packages and everything they depend on, recursively, with apt-cache.
+
+    Recommends and suggests are left out, matching how the installer
+    installs. Virtual packages are represented by the real packages apt
+    lists as providing them.
+    """
+    result = tracing.run([
+        'apt-cache', 'depends', '--recurse', '--no-recommends', '--no-suggests',
+        '--no-conflicts', '--no-breaks', '--no-replaces', '--no-enhances'
+    ] + packages, capture_output=True, text=True, check=True)
+    closure = []
+    for line in result.stdout.splitlines():
+        # Unindented lines name each package in the closure; virtual ones
+        # are shown in angle brackets
+        name = line.strip()
+        if line[:1].isspace() or not name or name.startswith('<') or name in closure:
+            continue
+        closure.append(name)
+    return closure
+
+
+def _parse_depends(value: str) -> List[List[str]]:
+    """Parse a Depends field into lists of alternative package names."""
+    depends = []
+    for clause in value.split(','):
+        names = []
+        for alternative in clause.split('|'):
+            name = alternative.strip().split(' ', 1)[0].split('(', 1)[0]
+            name = name.split(':', 1)[0]
+            if name:
+                names.append(name)
+        if names:
+            depends.append(names)
+    return depends
@@ -0,0 +1,149 @@
+import os
+import time
+import threading
+import subprocess
+from contextlib import contextmanager
+from typing import Iterator, List, Optional, Tuple
+
+
+class CommandResult(subprocess.CompletedProcess):
+    """CompletedProcess with the child's CPU time."""
+
+    def __init__(self, args, returncode, stdout=None, stderr=None, child_cpu: float = 0.0):
+        super().__init__(args, returncode, stdout, stderr)
+        self.child_cpu = child_cpu  # User and system seconds
+
+
+class CommandBackend:
+    """
+    Runs the external commands the installer depends on.
+
+    Implementations take subprocess.run's arguments, except check, which
+    callers apply to the returned result.
+    """
+
+    def run(self,
+            cmd: List[str],
+            input=None,
+            capture_output: bool = False,
+            timeout: Optional[float] = None,
+            **kwargs) -> CommandResult:
+        raise NotImplementedError
+
+
+class SubprocessBackend(CommandBackend):
+    """Runs commands on this host."""
+
+    def run(self,
+            cmd: List[str],
+            input=None,
+            capture_output: bool = False,
+            timeout: Optional[float] = None,
+            **kwargs) -> CommandResult:
+        # Mirrors subprocess.run, which does not expose the child's rusage:
+        # the pipes are drained here and the child is reaped with wait4
+        if input is not None:
+            kwargs['stdin'] = subprocess.PIPE
+        if capture_output:
+            kwargs['stdout'] = subprocess.PIPE
+            kwargs['stderr'] = subprocess.PIPE
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with subprocess.Popen(cmd, **kwargs) as process:
+            try:
+                stdout, stderr = _communicate(process, input, timeout, deadline)
+                rusage = _wait4(process, timeout, deadline)
+            except BaseException:
+                process.kill()
+                raise
+        child_cpu = 0.0
+        if rusage is not None:
+            child_cpu = rusage.ru_utime + rusage.ru_stime
+        return CommandResult(process.args, process.returncode, stdout, stderr, child_cpu)
+
+
+def _communicate(process: subprocess.Popen, input,
+                 timeout: Optional[float], deadline: Optional[float]) -> Tuple:
+    """Write input and read stdout and stderr to EOF without waiting for the child."""
+    output = {}
+
+    def read(name: str, stream) -> None:
+        output[name] = stream.read()
+        stream.close()
+
+    def write(stream) -> None:
+        try:
+            if input:
+                stream.write(input)
+            stream.close()
+        except BrokenPipeError:
+            pass  # The child exited without reading all of its input
+
+    threads = []
+    if process.stdin is not None:
+        threads.append(threading.Thread(target=write, args=(process.stdin,), daemon=True))
+    for name in ('stdout', 'stderr'):
+        stream = getattr(process, name)
+        if stream is not None:
+            threads.append(threading.Thread(target=read, args=(name, stream), daemon=True))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        if thread.is_alive():
+            raise subprocess.TimeoutExpired(process.args, timeout)
+    return output.get('stdout'), output.get('stderr')
+
+
+def _wait4(process: subprocess.Popen, timeout: Optional[float], deadline: Optional[float]):
+    """
+    Reap the child with wait4 and set its returncode.
+
+    Returns:
+        The child's resource usage, or None if it was reaped elsewhere
+    """
+    delay = 0.0005
+    while True:
+        try:
+            pid, status, rusage = os.wait4(process.pid, 0 if deadline is None else os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere, as when SIGCHLD is ignored; Popen reports 0 too
+            process.returncode = 0
+            return None
+        if pid == process.pid:
+            if os.WIFSIGNALED(status):
+                process.returncode = -os.WTERMSIG(status)
+            else:
+                process.returncode = os.WEXITSTATUS(status)
+            return rusage
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise subprocess.TimeoutExpired(process.args, timeout)
+        delay = min(delay * 2, remaining, 0.05)
+        time.sleep(delay)
+
+
+_backend: CommandBackend = SubprocessBackend()
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> CommandBackend:
+    """Get the backend commands currently run through."""
+    return _backend
+
+
+def set_backend(backend: CommandBackend) -> CommandBackend:
+    """Route all commands through backend; returns the previous one."""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+        return previous
+
+
+@contextmanager
+def use_backend(backend: CommandBackend) -> Iterator[CommandBackend]:
+    """Run commands through backend for the duration of the block."""
+    previous = set_backend(backend)
+    try:
+        yield backend
+    finally:
+        set_backend(previous)
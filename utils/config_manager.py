@@ -1,16 +1,19 @@
 # utils/config_manager.py
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from . import tracing
+from .config_store import (CONFIG_FILE, CONFIG_VERSION, KMD_CONFIG_FILE, LOGGING_FILE,
+                           get_config_store)
+
 logger = logging.getLogger(__name__)
 
 class AlgorandConfig:
     """Manages Algorand node configuration settings."""
     
     DEFAULT_CONFIG = {
-        "Version": 34,
+        "Version": CONFIG_VERSION,
         "GossipFanout": 4,
         "NetAddress": "",  # Will be set based on node type
         "BaseLoggerDebugLevel": 4,
@@ -48,7 +51,8 @@ class AlgorandConfig:
     
     def __init__(self, data_dir: Path, is_relay: bool = False):
         self.data_dir = data_dir
-        self.config_file = data_dir / 'config.json'
+        self.config_file = data_dir / CONFIG_FILE
+        self.store = get_config_store(data_dir)
         self.is_relay = is_relay
         self.config = self.DEFAULT_CONFIG.copy()
         
@@ -57,15 +61,17 @@ class AlgorandConfig:
     
     def load_existing_config(self) -> bool:
         """Load existing configuration if available."""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    existing_config = json.load(f)
-                    self.config.update(existing_config)
-                return True
-        except Exception as e:
-            logger.error(f"Failed to load existing config: {str(e)}")
-        return False
+        existing_config = self.store.load(CONFIG_FILE)
+        if not existing_config:
+            return False
+        self.config.update(existing_config)
+        return True
+    
+    @property
+    def role(self) -> str:
+        if self.is_relay:
+            return 'relay'
+        return 'archival' if self.config.get('Archival') else 'participation'
     
     def update_config(self, updates: Dict[str, Any]) -> None:
         """Update configuration with new values."""
@@ -76,16 +82,27 @@ class AlgorandConfig:
         return self.config.copy()
     
     def save_config(self) -> bool:
-        """Save configuration to file."""
+        """
+        Save configuration to file.
+        
+        Only keys that differ from algod's defaults are written, and the
+        file is left untouched if nothing changed. Call restart_if_needed
+        to apply the changes to a running node.
+        """
         try:
-            self.config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
+            self.store.stage(CONFIG_FILE, self.config)
+            self.store.commit()
             return True
         except Exception as e:
             logger.error(f"Failed to save config: {str(e)}")
             return False
     
+    def restart_if_needed(self, service: str = 'algorand') -> bool:
+        """Restart the node once if saved changes require it."""
+        return self.store.apply_restart(
+            lambda: tracing.run(['sudo', 'systemctl', 'restart', service], check=True)
+        )
+    
     def configure_telemetry(self, 
                           enable: bool = False,
                           hostname: Optional[str] = None) -> None:
@@ -102,10 +119,9 @@ class AlgorandConfig:
             telemetry_config["Name"] = hostname
         
         # Save telemetry config
-        telemetry_file = self.data_dir / 'logging.config'
         try:
-            with open(telemetry_file, 'w') as f:
-                json.dump(telemetry_config, f, indent=2)
+            self.store.stage(LOGGING_FILE, telemetry_config)
+            self.store.commit()
         except Exception as e:
             logger.error(f"Failed to save telemetry config: {str(e)}")
     
@@ -120,10 +136,8 @@ class AlgorandConfig:
         }
         
         # Save kmd config
-        kmd_config_file = self.data_dir / 'kmd-v0.5' / 'kmd_config.json'
         try:
-            kmd_config_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(kmd_config_file, 'w') as f:
-                json.dump(kmd_config, f, indent=2)
+            self.store.stage(KMD_CONFIG_FILE, kmd_config)
+            self.store.commit()
         except Exception as e:
             logger.error(f"Failed to save kmd config: {str(e)}")
@@ -0,0 +1,292 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+CONFIG_VERSION = 34
+
+CONFIG_FILE = 'config.json'
+LOGGING_FILE = 'logging.config'
+KMD_CONFIG_FILE = 'kmd-v0.5/kmd_config.json'
+PHONEBOOK_FILE = 'phonebook.json'
+GENESIS_FILE = 'genesis.json'
+
+# algod's built-in values for the keys the installer manages; keys equal to
+# these are left out of config.json since algod applies them anyway
+ALGOD_DEFAULTS: Dict[str, Any] = {
+    "GossipFanout": 4,
+    "NetAddress": "",
+    "BaseLoggerDebugLevel": 4,
+    "IncomingConnectionsLimit": 2400,
+    "Archival": False,
+    "EnableMetricReporting": False,
+    "EnableDeveloperAPI": False,
+    "EnableProfiler": False,
+    "RestReadTimeoutSeconds": 15,
+    "RestWriteTimeoutSeconds": 120,
+    "RunHosted": False,
+    "SuggestedFeeBlockHistory": 3,
+    "TxPoolSize": 75000,
+    "EnableLedgerService": False,
+    "EnableBlockService": False,
+    "EnableGossipBlockService": True,
+    "CatchupBlockFetchTimeoutSec": 4,
+    "DeadlockDetection": 0,
+    "CatchupParallelBlocks": 16,
+    "DNSBootstrapID": "<network>.algorand.network",
+}
+
+NOOP = 'no-op'
+HOT = 'hot'
+RESTART = 'restart'
+
+# How changes to each file take effect. algod reads config.json,
+# logging.config, phonebook.json and genesis.json only at startup; kmd is
+# started on demand by goal and picks its config up on its next start
+# without touching algod.
+FILE_POLICIES = {
+    CONFIG_FILE: RESTART,
+    LOGGING_FILE: RESTART,
+    PHONEBOOK_FILE: RESTART,
+    GENESIS_FILE: RESTART,
+    KMD_CONFIG_FILE: HOT,
+}
+
+
+class ConfigChange:
+    """A single key change in a node config file."""
+
+    def __init__(self, file: str, key: str, old: Any, new: Any, kind: str):
+        self.file = file
+        self.key = key
+        self.old = old
+        self.new = new
+        self.kind = kind
+
+    def __repr__(self) -> str:
+        return f"ConfigChange({self.file}:{self.key} {self.old!r} -> {self.new!r}, {self.kind})"
+
+
+class NodeConfigStore:
+    """
+    Single writer for a node's config.json, logging.config, phonebook.json,
+    genesis.json and kmd config.
+
+    Callers stage updates, which are merged per file. Committing compares
+    the merged result with what is on disk key by key, rewrites only files
+    that changed semantically, and records whether any change needs algod
+    to restart. Pending restarts from all writers are applied together by
+    apply_restart, so several config changes cost one restart.
+    """
+
+    def __init__(self, data_dir: Path, owner: Optional[str] = 'algorand'):
+        self.data_dir = Path(data_dir)
+        self.owner = owner
+        self._lock = threading.RLock()
+        self._staged: Dict[str, Dict[str, Any]] = {}
+        self._removed: Dict[str, set] = {}
+        self._restart_changes: List[ConfigChange] = []
+
+    @property
+    def restart_required(self) -> bool:
+        return bool(self._restart_changes)
+
+    def load(self, name: str) -> Dict[str, Any]:
+        """Read a config file as stored on disk; missing files are empty."""
+        try:
+            with open(self.data_dir / name, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read {self.data_dir / name}: {str(e)}")
+            return {}
+
+    def effective(self, name: str, stored: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Values the consumer of a file actually uses, defaults included."""
+        stored = self.load(name) if stored is None else stored
+        if name == CONFIG_FILE:
+            return {**ALGOD_DEFAULTS, **stored}
+        return dict(stored)
+
+    def stage(self, name: str, updates: Dict[str, Any], remove: Iterable[str] = ()) -> None:
+        """Queue updates to a config file; later updates win per key."""
+        with self._lock:
+            staged = self._staged.setdefault(name, {})
+            removed = self._removed.setdefault(name, set())
+            for key, value in updates.items():
+                staged[key] = value
+                removed.discard(key)
+            for key in remove:
+                staged.pop(key, None)
+                removed.add(key)
+
+    def has_staged(self, name: str) -> bool:
+        return name in self._staged
+
+    def diff(self, include_noop: bool = False) -> List[ConfigChange]:
+        """Compare staged updates with the files on disk."""
+        with self._lock:
+            changes = []
+            for name in self._staged:
+                changes.extend(self._diff_file(name, self.load(name), include_noop))
+            return changes
+
+    def commit(self) -> List[ConfigChange]:
+        """
+        Write every file with staged changes that differ from disk.
+
+        Returns:
+            List of changes applied, excluding no-ops
+        """
+        with self._lock:
+            applied = []
+            for name in list(self._staged):
+                stored = self.load(name)
+                changes = self._diff_file(name, stored, include_noop=False)
+                if changes:
+                    self._write(name, self._merged(name, stored))
+                    applied.extend(changes)
+                    self._restart_changes.extend(c for c in changes if c.kind == RESTART)
+                del self._staged[name]
+                self._removed.pop(name, None)
+
+            for change in applied:
+                logger.info(f"{change.file}: {change.key} {change.old!r} -> {change.new!r} "
+                            f"({change.kind})")
+            if not applied:
+                logger.info("Node configuration is unchanged")
+            return applied
+
+    def replace(self, name: str, content: str) -> bool:
+        """
+        Write a whole file, such as genesis.json, that is not merged by key.
+
+        Returns:
+            bool: True if the file changed; a restart it needs is left to
+            apply_restart like any committed change
+        """
+        with self._lock:
+            try:
+                old = (self.data_dir / name).read_text()
+            except FileNotFoundError:
+                old = None
+            if old == content:
+                return False
+            self._write_text(name, content)
+            change = ConfigChange(name, 'contents', 'missing' if old is None else 'old', 'new',
+                                  FILE_POLICIES.get(name, RESTART))
+            logger.info(f"{name}: replaced ({change.kind})")
+            if change.kind == RESTART:
+                self._restart_changes.append(change)
+            return True
+
+    def apply_restart(self, restart: Callable[[], None]) -> bool:
+        """
+        Restart the node once if any committed change requires it.
+
+        Returns:
+            bool: True if a restart was performed
+        """
+        with self._lock:
+            if not self._restart_changes:
+                return False
+            keys = sorted({f"{c.file}:{c.key}" for c in self._restart_changes})
+            logger.info(f"Restarting node to apply {len(keys)} config changes: {', '.join(keys)}")
+            restart()
+            self._restart_changes = []
+            return True
+
+    def _merged(self, name: str, stored: Dict[str, Any]) -> Dict[str, Any]:
+        merged = {**stored, **self._staged.get(name, {})}
+        for key in self._removed.get(name, ()):
+            merged.pop(key, None)
+        if name == CONFIG_FILE:
+            merged['Version'] = max(merged.get('Version', 0), CONFIG_VERSION)
+            merged = {key: value for key, value in merged.items()
+                      if key not in ALGOD_DEFAULTS or ALGOD_DEFAULTS[key] != value}
+        return merged
+
+    def _diff_file(self, name: str, stored: Dict[str, Any], include_noop: bool) -> List[ConfigChange]:
+        old = self.effective(name, stored)
+        new = self.effective(name, self._merged(name, stored))
+        policy = FILE_POLICIES.get(name, RESTART)
+        changes = []
+        for key in sorted(set(old) | set(new)):
+            if old.get(key) != new.get(key):
+                changes.append(ConfigChange(name, key, old.get(key), new.get(key), policy))
+            elif include_noop and key in self._staged.get(name, {}):
+                changes.append(ConfigChange(name, key, old.get(key), new.get(key), NOOP))
+        return changes
+
+    def _write(self, name: str, data: Dict[str, Any]) -> None:
+        self._write_text(name, json.dumps(data, indent=2, sort_keys=True) + '\n')
+
+    def _write_text(self, name: str, content: str) -> None:
+        path = self.data_dir / name
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, content)
+        except PermissionError:
+            self._write_privileged(path, content)
+
+    def _write_privileged(self, path: Path, content: str) -> None:
+        # Stage in a private temp file, then place it next to the target with
+        # sudo and rename it over the target so readers never see a partial file
+        fd, temp_path = tempfile.mkstemp(prefix='algorand-config-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            partial = f"{path}.partial"
+            install = ['sudo', 'install', '-D', '-m', '644']
+            if self.owner:
+                install.extend(['-o', self.owner, '-g', self.owner])
+            tracing.run(install + [temp_path, partial], check=True)
+            tracing.run(['sudo', 'sync', partial], check=True)
+            tracing.run(['sudo', 'mv', '-f', partial, str(path)], check=True)
+        finally:
+            os.unlink(temp_path)
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    fd, temp_path = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    # Persist the rename itself
+    dir_fd = os.open(str(path.parent), os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+_stores: Dict[Path, NodeConfigStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_config_store(data_dir: Path) -> NodeConfigStore:
+    """Get the shared config store for a data directory."""
+    key = Path(data_dir).resolve()
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = NodeConfigStore(key)
+        return _stores[key]
@@ -0,0 +1,143 @@
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .system_checks import collect_host_facts
+
+logger = logging.getLogger(__name__)
+
+ROLES = ('participation', 'relay', 'archival')
+
+# Thresholds for the data disk, in 4K random read IOPS
+FAST_DISK_IOPS = 20000
+SLOW_DISK_IOPS = 2000
+
+FD_RESERVE = 2048  # Descriptors kept for the ledger databases and logs
+MIN_INCOMING_CONNECTIONS = 800
+MAX_INCOMING_CONNECTIONS = 10000
+RAM_PER_CONNECTION_MB = 2.5
+CONNECTIONS_PER_MBPS = 10
+
+
+class TuningProfile:
+    """Recommended config values for a role, each with its rationale."""
+
+    def __init__(self, role: str, facts: Dict[str, Any]):
+        self.role = role
+        self.facts = facts
+        self.settings: Dict[str, Any] = {}
+        self.rationale: Dict[str, str] = {}
+
+    def set(self, key: str, value: Any, reason: str) -> None:
+        self.settings[key] = value
+        self.rationale[key] = reason
+
+    def describe(self) -> str:
+        lines = [f"Recommended settings for a {self.role} node:"]
+        for key, value in self.settings.items():
+            lines.append(f"  {key} = {value!r}: {self.rationale[key]}")
+        return "\n".join(lines)
+
+
+def recommend_profile(role: str, facts: Dict[str, Any]) -> TuningProfile:
+    """
+    Turn host facts into config values for a node role.
+
+    Args:
+        role: 'participation', 'relay' or 'archival'
+        facts: Output of system_checks.collect_host_facts
+
+    Returns:
+        TuningProfile with settings and the reason for each
+    """
+    if role not in ROLES:
+        raise ValueError(f"Unknown node role: {role}")
+
+    profile = TuningProfile(role, facts)
+    cores = facts.get('cpu_count') or 4
+    ram_gb = facts.get('total_ram_gb') or 4
+    iops = facts.get('disk_iops')
+    fast_disk = iops >= FAST_DISK_IOPS if iops is not None else bool(facts.get('is_ssd'))
+    slow_disk = iops < SLOW_DISK_IOPS if iops is not None else not facts.get('is_ssd')
+    disk = (f"{iops:,.0f} random read IOPS" if iops is not None
+            else ("SSD" if facts.get('is_ssd') else "rotational disk"))
+
+    # Role-defining settings
+    is_relay = role == 'relay'
+    profile.set('Archival', role in ('relay', 'archival'),
+                "relays and archival nodes keep the full block history")
+    profile.set('NetAddress', ':4160' if is_relay else '',
+                "relays accept peer connections on the gossip port" if is_relay
+                else "non-relay nodes only make outgoing connections")
+    profile.set('EnableLedgerService', is_relay, "relays serve catchpoints to catching-up nodes"
+                if is_relay else "only relays serve ledger data")
+    profile.set('EnableBlockService', is_relay, "relays serve blocks to catching-up nodes"
+                if is_relay else "only relays serve blocks")
+
+    # Incoming connections are bounded by descriptors, memory and bandwidth
+    if is_relay:
+        limits = {'RAM': int(ram_gb * 1024 / RAM_PER_CONNECTION_MB)}
+        fd_limit = facts.get('fd_limit')
+        if fd_limit:
+            limits['file descriptor limit'] = max(0, fd_limit - FD_RESERVE)
+        nic = facts.get('nic_speed_mbps')
+        if nic:
+            limits['NIC speed'] = nic * CONNECTIONS_PER_MBPS
+        bound, limit = min(limits.items(), key=lambda item: item[1])
+        limit = max(MIN_INCOMING_CONNECTIONS, min(limit, MAX_INCOMING_CONNECTIONS))
+        reason = f"bounded by {bound} ({', '.join(f'{k}: {v:,}' for k, v in limits.items())})"
+        # Fewer descriptors than a working relay needs is a host problem;
+        # tuning the relay down to fit would leave it refusing peers
+        if fd_limit and limits['file descriptor limit'] < limit:
+            needed = limit + FD_RESERVE
+            logger.warning(f"LimitNOFILE={fd_limit:,} is too low for {limit:,} incoming "
+                           f"connections; raise LimitNOFILE for the algorand service to "
+                           f"at least {needed:,}")
+            reason += f"; needs LimitNOFILE of at least {needed:,}"
+        profile.set('IncomingConnectionsLimit', limit, reason)
+    else:
+        profile.set('IncomingConnectionsLimit', 2400,
+                    "algod default; a node without NetAddress accepts no peers")
+
+    profile.set('GossipFanout', 4,
+                "algod default; more outgoing relay peers add bandwidth without lowering latency")
+
+    # Transaction pool memory grows with its size
+    if ram_gb < 6:
+        pool, reason = 25000, f"{ram_gb:.0f}GB RAM leaves little headroom for a full pool"
+    elif ram_gb < 12:
+        pool, reason = 50000, f"{ram_gb:.0f}GB RAM fits a reduced pool"
+    elif is_relay and ram_gb >= 64:
+        pool, reason = 150000, f"{ram_gb:.0f}GB RAM lets a relay buffer bursts"
+    else:
+        pool, reason = 75000, f"algod default, fits {ram_gb:.0f}GB RAM"
+    profile.set('TxPoolSize', pool, reason)
+
+    # Catchup fetches blocks in parallel; verification is CPU bound and
+    # writing them is IOPS bound
+    if slow_disk:
+        parallel = min(8, cores * 2)
+        reason = f"{disk} cannot absorb more concurrent block writes"
+    elif fast_disk:
+        parallel = max(16, min(64, cores * 4))
+        reason = f"{cores} cores to verify blocks and {disk}"
+    else:
+        parallel = max(8, min(32, cores * 2))
+        reason = f"{cores} cores with {disk}"
+    profile.set('CatchupParallelBlocks', parallel, reason)
+
+    if slow_disk:
+        profile.set('BaseLoggerDebugLevel', 3,
+                    f"log warnings only to spare write bandwidth on a {disk}")
+    else:
+        profile.set('BaseLoggerDebugLevel', 4, "algod default")
+    return profile
+
+
+def tune_for_host(role: str, data_dir: Path, facts: Optional[Dict[str, Any]] = None) -> TuningProfile:
+    """Collect host facts for a data directory and recommend a profile."""
+    if facts is None:
+        facts = collect_host_facts(data_dir)
+    profile = recommend_profile(role, facts)
+    logger.info(profile.describe())
+    return profile
@@ -1,11 +1,15 @@
 # utils/dependencies.py
 import subprocess
-import sys
 import logging
 import os
 from pathlib import Path
 from typing import List, Dict
 
+from .apt_planner import get_apt_planner
+from .dpkg_index import get_dpkg_index
+from .python_env import ensure_python_environment
+from .tracing import traced
+
 logger = logging.getLogger(__name__)
 
 REQUIRED_PACKAGES = {
@@ -33,6 +37,7 @@ PYTHON_PACKAGES = [
     'packaging>=21.0'
 ]
 
+@traced('dependencies')
 def check_dependencies() -> None:
     """Check and install required system and Python dependencies."""
     logger.info("Installing dependencies...")
@@ -45,97 +50,48 @@ def check_dependencies() -> None:
     
     logger.info("All dependencies are satisfied")
 
+@traced('dependencies')
 def _check_system_packages() -> None:
     """Check and install required system packages."""
-    missing_essential = _get_missing_packages(REQUIRED_PACKAGES['essential'])
-    missing_optional = _get_missing_packages(REQUIRED_PACKAGES['optional'])
+    planner = get_apt_planner()
+    missing_essential = planner.request(REQUIRED_PACKAGES['essential'])
+    missing_optional = planner.request(REQUIRED_PACKAGES['optional'], optional=True)
     
     if missing_essential:
         logger.info(f"Installing essential packages: {', '.join(missing_essential)}")
-        _install_packages(missing_essential)
     
     if missing_optional:
         logger.info(f"Installing recommended packages: {', '.join(missing_optional)}")
-        try:
-            _install_packages(missing_optional)
-        except Exception as e:
-            logger.warning(f"Some optional packages could not be installed: {str(e)}")
+    
+    try:
+        planner.commit(quiet=True)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Failed to install packages: {e.stderr.decode()}")
+        raise Exception("Package installation failed")
 
 def _get_missing_packages(packages: List[str]) -> List[str]:
     """Check which packages are not installed."""
-    missing = []
-    for package in packages:
-        try:
-            result = subprocess.run(
-                ['dpkg', '-s', package],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL
-            )
-            if result.returncode != 0:
-                missing.append(package)
-        except Exception:
-            missing.append(package)
-    return missing
+    return get_dpkg_index().get_missing(packages)
 
+@traced('dependencies')
 def _install_packages(packages: List[str]) -> None:
     """Install specified packages using apt-get."""
+    planner = get_apt_planner()
+    planner.request(packages)
     try:
-        # Update package list
-        subprocess.run(
-            ['sudo', 'apt-get', 'update'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        # Install packages
-        subprocess.run(
-            ['sudo', 'apt-get', 'install', '-y'] + packages,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
+        planner.commit(quiet=True)
     except subprocess.CalledProcessError as e:
         logger.error(f"Failed to install packages: {e.stderr.decode()}")
         raise Exception("Package installation failed")
 
+@traced('dependencies')
 def _setup_python_environment() -> None:
     """Setup and configure Python virtual environment."""
     try:
         venv_path = Path(__file__).parent.parent / 'venv'
         
-        # Create virtual environment if it doesn't exist
-        if not venv_path.exists():
-            logger.info("Creating virtual environment...")
-            subprocess.run(
-                [sys.executable, '-m', 'venv', str(venv_path)],
-                check=True,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.PIPE
-            )
-        
-        # Get path to pip in virtual environment
-        if sys.platform == "win32":
-            venv_pip = venv_path / 'Scripts' / 'pip'
-        else:
-            venv_pip = venv_path / 'bin' / 'pip'
-        
-        # Upgrade pip in virtual environment
-        subprocess.run(
-            [str(venv_pip), 'install', '--upgrade', 'pip'],
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
-        
-        # Install required packages in virtual environment
-        logger.info("Installing Python packages in virtual environment...")
-        subprocess.run(
-            [str(venv_pip), 'install'] + PYTHON_PACKAGES,
-            check=True,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE
-        )
+        # Skips venv creation and pip when the environment is already current
+        ensure_python_environment(PYTHON_PACKAGES, venv_path)
         
         # Create activation script if it doesn't exist
         activate_script = Path(__file__).parent.parent / 'activate_venv.sh'
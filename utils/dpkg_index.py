@@ -0,0 +1,118 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DPKG_STATUS_FILE = Path('/var/lib/dpkg/status')
+
+
+class DpkgStatusIndex:
+    """
+    In-process index of installed Debian packages.
+
+    The dpkg status database is parsed once in a single streaming pass and
+    re-parsed only when the file's mtime or size changes, so any number of
+    installed/version queries cost a dict lookup instead of a `dpkg -s` fork.
+    """
+
+    def __init__(self, status_file: Path = DPKG_STATUS_FILE):
+        self.status_file = Path(status_file)
+        self._packages: Dict[str, str] = {}
+        self._provides: Dict[str, str] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-parse the status file if it changed since the last parse."""
+        try:
+            stat = os.stat(self.status_file)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError as e:
+            logger.warning(f"Could not read dpkg status file: {str(e)}")
+            stamp = None
+
+        with self._lock:
+            if not force and stamp is not None and stamp == self._stamp:
+                return
+            if stamp is not None:
+                self._packages, self._provides = self._parse()
+            else:
+                self._packages, self._provides = {}, {}
+            self._stamp = stamp
+
+    def is_installed(self, package: str) -> bool:
+        """Check whether a package (optionally `name:arch`) is installed."""
+        self.refresh()
+        return package in self._packages
+
+    def is_provided(self, name: str) -> bool:
+        """Check whether an installed package provides a (virtual) name."""
+        self.refresh()
+        return name in self._packages or name in self._provides
+
+    def get_version(self, package: str) -> Optional[str]:
+        """Get the installed version of a package, or None."""
+        self.refresh()
+        return self._packages.get(package)
+
+    def get_missing(self, packages: Iterable[str]) -> List[str]:
+        """Return the packages that are not installed, preserving order."""
+        self.refresh()
+        return [package for package in packages if package not in self._packages]
+
+    def installed_packages(self) -> Dict[str, str]:
+        """Get a snapshot of installed package names and versions."""
+        self.refresh()
+        return dict(self._packages)
+
+    def _parse(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        packages: Dict[str, str] = {}
+        provides: Dict[str, str] = {}
+        name = version = arch = status = provided = None
+
+        def flush() -> None:
+            if name and status and status.split()[-1] == 'installed':
+                packages[name] = version or ''
+                if arch:
+                    packages[f"{name}:{arch}"] = version or ''
+                for virtual in (provided or '').split(','):
+                    virtual = virtual.strip().split(' ', 1)[0]
+                    if virtual:
+                        provides[virtual] = name
+
+        with open(self.status_file, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line == '\n':
+                    flush()
+                    name = version = arch = status = provided = None
+                elif line[0] in ' \t':
+                    continue  # Continuation of a multi-line field
+                elif line.startswith('Package:'):
+                    name = line[8:].strip()
+                elif line.startswith('Status:'):
+                    status = line[7:].strip()
+                elif line.startswith('Version:'):
+                    version = line[8:].strip()
+                elif line.startswith('Architecture:'):
+                    arch = line[13:].strip()
+                elif line.startswith('Provides:'):
+                    provided = line[9:].strip()
+            flush()
+
+        return packages, provides
+
+
+_index: Optional[DpkgStatusIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_dpkg_index() -> DpkgStatusIndex:
+    """Get the shared package index for this process."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = DpkgStatusIndex()
+        return _index
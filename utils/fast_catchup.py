@@ -0,0 +1,154 @@
+import re
+import time
+import logging
+from typing import Callable, Optional
+
+from . import tracing
+from .algod_client import AlgodClient, AlgodError
+
+logger = logging.getLogger(__name__)
+
+CATCHPOINT_URL_TEMPLATE = (
+    'https://algorand-catchpoints.s3.us-east-2.amazonaws.com/channel/{network}/latest.catchpoint'
+)
+CATCHPOINT_PATTERN = re.compile(r'^(\d+)#[A-Z2-7]+$')
+
+ProgressCallback = Callable[[str, float], None]
+
+
+class FastCatchup:
+    """
+    Drives algod fast catchup to the latest catchpoint of a network.
+
+    The catchpoint label is fetched from a configurable source, catchup is
+    started through algod, and the account and block phases are monitored
+    until the node leaves catchpoint mode. On any failure or stall the
+    catchup is aborted so the node falls back to normal sync.
+    """
+
+    def __init__(self,
+                 client: AlgodClient,
+                 network: str,
+                 label_url_template: str = CATCHPOINT_URL_TEMPLATE,
+                 poll_interval: float = 5,
+                 stall_timeout: float = 600,
+                 timeout: float = 2 * 60 * 60,
+                 session=None):
+        self.client = client
+        self.network = network
+        self.label_url_template = label_url_template
+        self.poll_interval = poll_interval
+        self.stall_timeout = stall_timeout
+        self.timeout = timeout
+        self._session = session
+
+    def fetch_label(self) -> str:
+        """Fetch the latest catchpoint label for the network."""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        url = self.label_url_template.format(network=self.network)
+        response = self._session.get(url, timeout=15)
+        response.raise_for_status()
+        tracing.add_bytes(len(response.content))
+        label = response.text.strip()
+        if not CATCHPOINT_PATTERN.match(label):
+            raise Exception(f"Invalid catchpoint label from {url}: {label!r}")
+        return label
+
+    def run(self, progress_callback: Optional[ProgressCallback] = None) -> bool:
+        """
+        Catch the node up to the latest catchpoint.
+
+        Args:
+            progress_callback: Called with (phase, fraction complete)
+
+        Returns:
+            bool: True if fast catchup completed, False if the node was left
+            to sync normally
+        """
+        label = None
+        try:
+            label = self.fetch_label()
+            target_round = int(CATCHPOINT_PATTERN.match(label).group(1))
+            if self.client.status().get('last-round', 0) >= target_round:
+                logger.info("Node is already past the latest catchpoint")
+                return True
+
+            logger.info(f"Starting fast catchup to {label}")
+            self.client.start_catchup(label)
+            self._monitor(target_round, progress_callback)
+            logger.info("Fast catchup completed")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Fast catchup failed, falling back to normal sync: {str(e)}")
+            if label is not None:
+                try:
+                    self.client.abort_catchup(label)
+                except AlgodError:
+                    pass
+            return False
+
+    def _monitor(self, target_round: int, progress_callback: Optional[ProgressCallback]) -> None:
+        started = time.monotonic()
+        last_progress = None
+        last_change = started
+        in_catchpoint_mode = False
+
+        while True:
+            status = self.client.status()
+            now = time.monotonic()
+            if status.get('catchpoint'):
+                in_catchpoint_mode = True
+            elif status.get('last-round', 0) >= target_round:
+                if progress_callback:
+                    progress_callback('done', 1.0)
+                return
+            # Without a catchpoint below the target, algod either abandoned
+            # the catchup or never began it; normal sync keeps the round
+            # moving, so the stall check below would not notice
+            elif in_catchpoint_mode:
+                raise Exception(f"Node left catchpoint mode at round "
+                                f"{status.get('last-round', 0)}, before {target_round}")
+            elif now - started > self.stall_timeout:
+                raise Exception("Node did not enter catchpoint mode")
+
+            phase, fraction = catchpoint_phase(status)
+            if progress_callback:
+                progress_callback(phase, fraction)
+
+            progress = (phase, fraction, status.get('last-round'))
+            if progress != last_progress:
+                last_progress, last_change = progress, now
+            elif now - last_change > self.stall_timeout:
+                raise Exception(f"Catchup stalled during {phase}")
+            if now - started > self.timeout:
+                raise Exception("Catchup timed out")
+
+            time.sleep(self.poll_interval)
+
+
+def catchpoint_phase(status: dict) -> tuple:
+    """
+    Describe the current fast catchup phase from an algod status response.
+
+    Returns:
+        Tuple of (phase name, fraction of that phase complete)
+    """
+    def ratio(done_key: str, total_key: str) -> float:
+        total = status.get(total_key) or 0
+        return min(1.0, (status.get(done_key) or 0) / total) if total else 0.0
+
+    if not status.get('catchpoint'):
+        return 'syncing', 0.0
+    if status.get('catchpoint-total-blocks'):
+        return 'downloading blocks', ratio('catchpoint-acquired-blocks', 'catchpoint-total-blocks')
+    total_accounts = status.get('catchpoint-total-accounts') or 0
+    if total_accounts and (status.get('catchpoint-processed-accounts') or 0) < total_accounts:
+        return 'downloading accounts', ratio('catchpoint-processed-accounts',
+                                             'catchpoint-total-accounts')
+    if total_accounts:
+        return 'verifying accounts', ratio('catchpoint-verified-accounts',
+                                           'catchpoint-total-accounts')
+    return 'starting', 0.0
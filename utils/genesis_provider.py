@@ -0,0 +1,266 @@
+import os
+import json
+import base64
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+# Genesis files shipped by the algorand package
+PACKAGED_GENESIS_DIRS = [
+    Path('/var/lib/algorand/genesis'),
+    Path('/opt/algorand/genesis'),
+]
+GENESIS_URL_TEMPLATE = (
+    'https://raw.githubusercontent.com/algorand/go-algorand/master/'
+    'installer/genesis/{network}/genesis.json'
+)
+DEFAULT_CACHE_DIR = Path.home() / '.algorand-installer' / 'genesis'
+CHUNK_SIZE = 64 * 1024
+
+# Genesis ID and hash (SHA512/256 of the canonical encoding, base64) of each
+# network, as algod reports them at /versions
+GENESIS_HASHES: Dict[str, Tuple[str, str]] = {
+    'mainnet': ('mainnet-v1.0', 'wGHE2Pwdvd7S12BL5FaOP20EGYesN73ktiC1qzkkit8='),
+    'testnet': ('testnet-v1.0', 'SGO1GKSzyE7IEPItTxCByw9x8FmnrCDexi9/cOUJOiI='),
+    'betanet': ('betanet-v1.0', 'mFgazF+2uRS1tMiL9dsj01hJGySEmPN28B/TjjvpVW0='),
+}
+
+
+class GenesisProvider:
+    """
+    Supplies genesis files per network from a content-addressed cache.
+
+    Lookup order is the in-process cache, genesis files shipped with the
+    algorand package, and finally a streaming download over a pooled
+    session. Downloads are revalidated with ETag/If-None-Match, hashed
+    while streaming, and installed atomically. Blobs are stored by SHA256
+    so the same genesis is never stored or downloaded twice.
+    """
+
+    def __init__(self,
+                 cache_dir: Path = DEFAULT_CACHE_DIR,
+                 packaged_dirs: Optional[List[Path]] = None,
+                 url_template: str = GENESIS_URL_TEMPLATE,
+                 expected_sha256: Optional[Dict[str, str]] = None,
+                 session=None):
+        self.cache_dir = Path(cache_dir)
+        self.index_file = self.cache_dir / 'index.json'
+        self.packaged_dirs = packaged_dirs if packaged_dirs is not None else PACKAGED_GENESIS_DIRS
+        self.url_template = url_template
+        self.expected_sha256 = expected_sha256 or {}
+        self._session = session
+        self._resolved: Dict[str, Path] = {}
+        self._lock = threading.Lock()
+
+    def get_genesis(self, network: str) -> Path:
+        """
+        Get a verified genesis file for a network.
+
+        Returns:
+            Path to the cached genesis file
+        """
+        with self._lock:
+            if network in self._resolved and self._resolved[network].exists():
+                return self._resolved[network]
+
+            path = self._from_package(network)
+            if path is None:
+                path = self._download(network)
+            self._resolved[network] = path
+            return path
+
+    def install(self, network: str, destination: Path) -> None:
+        """Atomically place the network's genesis file at destination."""
+        source = self.get_genesis(network)
+        destination = Path(destination)
+        if destination.exists() and _sha256_file(destination) == source.stem:
+            return
+        with open(source, 'rb') as src:
+            _atomic_write(destination, src)
+
+    def _from_package(self, network: str) -> Optional[Path]:
+        for base in self.packaged_dirs:
+            candidate = base / network / 'genesis.json'
+            if not candidate.is_file():
+                continue
+            try:
+                with open(candidate, 'rb') as f:
+                    path = self._store(network, f, etag=None)
+                logger.info(f"Using packaged {network} genesis file from {candidate}")
+                return path
+            except Exception as e:
+                logger.warning(f"Ignoring packaged genesis file {candidate}: {str(e)}")
+        return None
+
+    def _download(self, network: str) -> Path:
+        index = self._load_index()
+        cached = index.get(network, {})
+        cached_path = self.cache_dir / f"{cached.get('sha256', '')}.json"
+
+        headers = {}
+        if cached.get('etag') and cached_path.exists():
+            headers['If-None-Match'] = cached['etag']
+
+        url = self.url_template.format(network=network)
+        logger.info(f"Fetching {network} genesis file...")
+        with self._get_session().get(url, headers=headers, stream=True, timeout=30) as response:
+            if response.status_code == 304:
+                logger.info(f"Cached {network} genesis file is current")
+                return cached_path
+            response.raise_for_status()
+            return self._store(network,
+                               _ResponseReader(response),
+                               etag=response.headers.get('ETag'))
+
+    def _store(self, network: str, stream, etag: Optional[str]) -> Path:
+        """Stream into the cache, verifying while writing."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.cache_dir), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+                    tmp.write(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+
+            sha256 = digest.hexdigest()
+            expected = self.expected_sha256.get(network)
+            if expected and expected != sha256:
+                raise Exception(f"{network} genesis hash mismatch: expected {expected}, got {sha256}")
+            _check_genesis(network, Path(tmp_name))
+
+            path = self.cache_dir / f"{sha256}.json"
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        index = self._load_index()
+        index[network] = {'sha256': sha256, 'etag': etag}
+        self._save_index(index)
+        return path
+
+    def _get_session(self):
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        return self._session
+
+    def _load_index(self) -> Dict[str, Dict]:
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_index(self, index: Dict[str, Dict]) -> None:
+        _atomic_write(self.index_file, _BytesReader(json.dumps(index, indent=2).encode()))
+
+
+class _ResponseReader:
+    """Adapts a streaming requests response to a read() interface."""
+
+    def __init__(self, response):
+        self._chunks = response.iter_content(chunk_size=CHUNK_SIZE)
+
+    def read(self, size: int) -> bytes:
+        chunk = next(self._chunks, b'')
+        tracing.add_bytes(len(chunk))
+        return chunk
+
+
+class _BytesReader:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self, size: int) -> bytes:
+        chunk, self._data = self._data[:size], self._data[size:]
+        return chunk
+
+
+def _check_genesis(network: str, path: Path) -> None:
+    """Reject content that is not a genesis file for the network."""
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except ValueError:
+        raise Exception(f"Downloaded {network} genesis file is not valid JSON")
+    if network not in str(data.get('network', '')).lower():
+        raise Exception(f"Genesis file is for {data.get('network')!r}, not {network}")
+    if network in GENESIS_HASHES:
+        genesis_id = f"{data.get('network')}-{data.get('id')}"
+        if genesis_id != GENESIS_HASHES[network][0]:
+            raise Exception(f"Genesis file is {genesis_id}, not {GENESIS_HASHES[network][0]}")
+
+
+def check_genesis_hash(network: str, genesis_id: str, genesis_hash: str) -> None:
+    """
+    Compare the genesis a node loaded with the network's pinned ID and hash.
+
+    Raises:
+        Exception: If either differs; networks without a pinned hash pass
+    """
+    if network not in GENESIS_HASHES:
+        logger.warning(f"No pinned genesis hash for {network}; not verified")
+        return
+    expected_id, expected_hash = GENESIS_HASHES[network]
+    if genesis_id != expected_id or _hash_bytes(genesis_hash) != _hash_bytes(expected_hash):
+        raise Exception(f"Node genesis is {genesis_id} {genesis_hash}, expected {network} "
+                        f"genesis {expected_id} {expected_hash}")
+
+
+def _hash_bytes(value: str) -> Optional[bytes]:
+    # Tolerate the URL-safe alphabet some tools print hashes in
+    if not value:
+        return None
+    try:
+        return base64.b64decode(str(value).replace('-', '+').replace('_', '/'), validate=True)
+    except ValueError:
+        return None
+
+
+def _atomic_write(destination: Path, stream) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=str(destination.parent), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                tmp.write(chunk)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp_name, destination)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+_provider: Optional[GenesisProvider] = None
+_provider_lock = threading.Lock()
+
+
+def get_genesis_provider() -> GenesisProvider:
+    """Get the shared genesis provider for this process."""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = GenesisProvider()
+        return _provider
@@ -0,0 +1,133 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from .step_executor import FAILED, RUNNING, SUCCEEDED
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FILE = 'journal.json'
+JOURNAL_VERSION = 1
+
+
+def digest(value: Any) -> str:
+    """Stable SHA256 of a JSON-serializable value."""
+    encoded = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_fingerprint(path: Path) -> Optional[str]:
+    """SHA256 of a file's contents, or None if it cannot be read."""
+    sha256 = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(chunk)
+    except OSError:
+        return None
+    return sha256.hexdigest()
+
+
+class InstallJournal:
+    """
+    Persistent record of installation steps across runs.
+
+    Each entry keeps a step's inputs, its outcome and the fingerprint its
+    verification probe returned once the run finished. On a later run a
+    step is complete when it succeeded with the same inputs and its probe
+    still returns the same fingerprint. A probe that returns None cannot
+    vouch for the step, so it runs again.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def entry(self, step: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(step)
+            return dict(entry) if entry is not None else None
+
+    def is_complete(self, step: str, inputs: Dict[str, Any], fingerprint: Optional[str]) -> bool:
+        """Check whether a step can be skipped given its probe's current fingerprint."""
+        entry = self.entry(step)
+        return (
+            fingerprint is not None
+            and entry is not None
+            and entry['status'] == SUCCEEDED
+            and entry['inputs_digest'] == digest(inputs)
+            and entry.get('fingerprint') == fingerprint
+        )
+
+    def record_start(self, step: str, inputs: Dict[str, Any]) -> None:
+        self._update(step, {
+            'status': RUNNING,
+            'inputs': inputs,
+            'inputs_digest': digest(inputs),
+            'fingerprint': None,
+            'outcome': None,
+            'error': None,
+            'started_at': time.time(),
+            'finished_at': None,
+        })
+
+    def record_success(self, step: str, outcome: Any = None) -> None:
+        self._update(step, {'status': SUCCEEDED, 'outcome': outcome, 'finished_at': time.time()})
+
+    def record_failure(self, step: str, error: BaseException) -> None:
+        self._update(step, {
+            'status': FAILED,
+            'error': f"{type(error).__name__}: {error}",
+            'finished_at': time.time(),
+        })
+
+    def record_fingerprint(self, step: str, fingerprint: Optional[str]) -> None:
+        self._update(step, {'fingerprint': fingerprint})
+
+    def invalidate(self, steps: Iterable[str]) -> None:
+        """Forget steps so they run on the next attempt."""
+        with self._lock:
+            for step in steps:
+                self._entries.pop(step, None)
+            self._save()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._save()
+
+    def _update(self, step: str, fields: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.setdefault(step, {}).update(fields)
+            self._save()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable install journal: {str(e)}")
+            return {}
+        if data.get('version') != JOURNAL_VERSION:
+            return {}
+        return data.get('steps', {})
+
+    def _save(self) -> None:
+        # Rewritten after every change so an interrupted run can resume
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump({'version': JOURNAL_VERSION, 'steps': self._entries},
+                          f, indent=2, default=str)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save install journal: {str(e)}")
@@ -0,0 +1,206 @@
+import json
+import time
+import socket
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+PROBE_WORKERS = 16
+PORT_TIMEOUT = 0.2
+
+# Typical seconds per step, used when the journal has no earlier run
+DEFAULT_ESTIMATES: Dict[str, float] = {
+    'fetch_repository_key': 0.5,
+    'install_repository_key': 0.2,
+    'add_repository': 0.2,
+    'install_packages': 10.0,
+    'python_environment': 30.0,
+    'system_probes': 0.5,
+    'stage_telemetry_config': 0.05,
+    'set_environment': 0.05,
+    'setup_network': 1.0,
+    'storage_benchmark': 15.0,
+    'tune_config': 1.0,
+    'discover_relays': 3.0,
+    'configure_telemetry': 1.0,
+    'start_service': 5.0,
+    'enable_service': 0.5,
+    'wait_for_service': 30.0,
+    'verify_genesis': 0.1,
+    'fast_catchup': 600.0,
+}
+APT_UPDATE_ESTIMATE = 15.0
+PACKAGE_ESTIMATE = 5.0  # Download and install, per package
+
+# Config values never printed in a plan
+SECRET_KEYS = {'Password'}
+
+
+def run_probes(probes: Dict[str, Callable[[], Any]],
+               max_workers: int = PROBE_WORKERS) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """
+    Run read-only probes concurrently.
+
+    Returns:
+        Tuple of (results by probe name, errors by probe name); a failed
+        probe's result is None
+    """
+    tracer = get_tracer()
+    parent = tracer.current()
+
+    def run(name: str, probe: Callable[[], Any]) -> Any:
+        with tracer.span(name, 'probe', parent=parent):
+            return probe()
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(probes))),
+                            thread_name_prefix='plan-probe') as pool:
+        futures = {name: pool.submit(run, name, probe) for name, probe in probes.items()}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                logger.debug(f"Probe {name} failed: {str(e)}")
+                results[name] = None
+                errors[name] = str(e)
+    return results, errors
+
+
+def port_in_use(address: str, timeout: float = PORT_TIMEOUT) -> bool:
+    """Check whether something accepts connections on host:port; an empty host is localhost."""
+    host, _, port = address.rpartition(':')
+    host = host.strip('[]') or '127.0.0.1'
+    try:
+        with socket.create_connection((host, int(port)), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+def config_diff(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Diff lines for the keys that differ between two config dicts."""
+    def show(key: str, value: Any) -> str:
+        return '"***"' if key in SECRET_KEYS and value else json.dumps(value)
+
+    lines = []
+    for key in sorted(set(old) | set(new)):
+        if old.get(key) != new.get(key):
+            if key in old:
+                lines.append(f"- {key}: {show(key, old[key])}")
+            if key in new:
+                lines.append(f"+ {key}: {show(key, new[key])}")
+    return lines
+
+
+def format_duration(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds:.1f}s"
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    return f"{seconds / 60:.0f}m"
+
+
+class PlannedStep:
+    """What a plan will do for one installation step."""
+
+    def __init__(self,
+                 name: str,
+                 run: bool,
+                 reason: str,
+                 estimate: float = 0.0,
+                 details: Optional[List[str]] = None,
+                 depends_on: Tuple[str, ...] = ()):
+        self.name = name
+        self.run = run
+        self.reason = reason
+        self.estimate = estimate if run else 0.0  # Seconds
+        self.details = details or []
+        self.depends_on = depends_on
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'run': self.run,
+            'reason': self.reason,
+            'estimate': round(self.estimate, 3),
+            'details': self.details,
+            'depends_on': list(self.depends_on),
+        }
+
+
+class InstallPlan:
+    """
+    The actions an installation would take on this host, decided from
+    read-only probes of its current state.
+
+    A plan is executable: execute() runs the installer with only the
+    planned steps, treating every other step as already done.
+    """
+
+    def __init__(self,
+                 installer,
+                 steps: List[PlannedStep],
+                 facts: Dict[str, Any],
+                 warnings: List[str],
+                 probe_time: float,
+                 from_step: Optional[str] = None):
+        self.installer = installer
+        self.steps = {step.name: step for step in steps}
+        self.facts = facts
+        self.warnings = warnings
+        self.probe_time = probe_time
+        self.from_step = from_step
+        self.created_at = time.time()
+
+    @property
+    def to_run(self) -> List[str]:
+        return [name for name, step in self.steps.items() if step.run]
+
+    def estimated_time(self) -> float:
+        """Seconds along the longest chain of dependent planned steps."""
+        finish: Dict[str, float] = {}
+        for name, step in self.steps.items():
+            start = max((finish.get(dep, 0.0) for dep in step.depends_on), default=0.0)
+            finish[name] = start + step.estimate
+        return max(finish.values(), default=0.0)
+
+    def render(self) -> str:
+        """The plan as diff-style text: '+' steps run, '=' steps are left alone."""
+        config = self.installer.config
+        lines = [
+            f"Install plan for a {self.installer._node_role()} node on {config['network']} "
+            f"in {config['data_dir']} (probed in {self.probe_time:.2f}s)",
+            '',
+        ]
+        for step in self.steps.values():
+            marker = '+' if step.run else '='
+            estimate = f"~{format_duration(step.estimate)}" if step.run else ''
+            lines.append(f"{marker} {step.name:<24} {estimate:>7}  {step.reason}")
+            lines.extend(f"      {detail}" for detail in step.details)
+        if self.warnings:
+            lines.append('')
+            lines.extend(f"! {warning}" for warning in self.warnings)
+        lines.append('')
+        lines.append(f"{len(self.to_run)} of {len(self.steps)} steps to run, estimated "
+                     f"{format_duration(self.estimated_time())} along the critical path")
+        return "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'created_at': self.created_at,
+            'probe_time': self.probe_time,
+            'from_step': self.from_step,
+            'estimated_time': self.estimated_time(),
+            'steps': {name: step.as_dict() for name, step in self.steps.items()},
+            'warnings': self.warnings,
+            'facts': {name: value for name, value in self.facts.items()
+                      if name not in ('node_logging_config', 'global_logging_config')},
+        }
+
+    def execute(self) -> bool:
+        """Run the installation, doing only the planned steps."""
+        return self.installer.run_installation(plan=self)
@@ -0,0 +1,247 @@
+import sys
+import time
+import heapq
+import logging
+import argparse
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .algod_client import AlgodError
+from .participation_manager import ParticipationManager
+from .sync_monitor import DEFAULT_ROUND_TIME, format_duration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON = 7 * 24 * 3600  # Renew keys this many seconds before expiry
+DEFAULT_VALIDITY_ROUNDS = 3_000_000  # Roughly three months of rounds
+DEFAULT_RESYNC_INTERVAL = 6 * 3600  # Pick up keys added or removed elsewhere
+ROUND_TIME_SMOOTHING = 0.2
+
+AlertCallback = Callable[[str, str], None]
+
+
+def _log_alert(address: str, message: str) -> None:
+    logger.warning(f"{address}: {message}")
+
+
+class KeyExpiryScheduler:
+    """
+    Renews participation keys ahead of their expiry.
+
+    The newest key of each account is kept in a heap ordered by last valid
+    round. The daemon sleeps until the head of the heap enters the renewal
+    horizon, using the measured round time to turn rounds into seconds,
+    then generates a new key, writes its keyreg transaction file and
+    raises an alert so the transaction can be signed and sent.
+    """
+
+    def __init__(self,
+                 manager: ParticipationManager,
+                 horizon: float = DEFAULT_HORIZON,
+                 validity_rounds: int = DEFAULT_VALIDITY_ROUNDS,
+                 resync_interval: float = DEFAULT_RESYNC_INTERVAL,
+                 alert: AlertCallback = _log_alert):
+        """
+        Args:
+            manager: Participation manager for the node
+            horizon: Seconds before expiry at which a key is renewed
+            validity_rounds: Validity range of renewed keys
+            resync_interval: Longest sleep between key list refreshes
+            alert: Called with (address, message) for renewals and failures
+        """
+        self.manager = manager
+        self.horizon = horizon
+        self.validity_rounds = validity_rounds
+        self.resync_interval = resync_interval
+        self.alert = alert
+        self.round_time = DEFAULT_ROUND_TIME
+        self._heap: List[Tuple[int, str]] = []
+        self._failed: Dict[str, float] = {}
+        self._last_observed: Optional[Tuple[float, int]] = None
+        self._last_refresh = 0.0
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def current_round(self) -> int:
+        """Read the node's round and update the measured round time."""
+        round_number = int(self.manager.client.status(max_age=0).get('last-round', 0))
+        now = time.time()
+        if self._last_observed is not None:
+            last_time, last_round = self._last_observed
+            if round_number > last_round:
+                measured = (now - last_time) / (round_number - last_round)
+                self.round_time += ROUND_TIME_SMOOTHING * (measured - self.round_time)
+        self._last_observed = (now, round_number)
+        return round_number
+
+    def refresh(self) -> None:
+        """
+        Rebuild the heap from the keys installed on the node.
+
+        Only accounts that are online with one of the node's keys as their
+        registered vote key are scheduled; keys of offline or retired
+        accounts are left to expire.
+        """
+        registry = self.manager.refresh_keys()
+        self._heap = [(registry.newest_for_address(address).last_valid, address)
+                      for address in registry.addresses()
+                      if self._is_participating(address, registry)]
+        heapq.heapify(self._heap)
+        self._last_refresh = time.monotonic()
+
+    def _is_participating(self, address: str, registry) -> bool:
+        account = self.manager.client.account(address, max_age=0)
+        registered = (account.get('participation') or {}).get('vote-participation-key')
+        if account.get('status') != 'Online' or registered is None:
+            logger.debug(f"Not scheduling {address}: account is not participating")
+            return False
+        if not any(record.vote_key == registered for record in registry.for_address(address)):
+            logger.debug(f"Not scheduling {address}: registered vote key is not on this node")
+            return False
+        return True
+
+    def horizon_rounds(self) -> int:
+        return int(self.horizon / self.round_time)
+
+    def schedule(self, current_round: Optional[int] = None) -> List[Dict]:
+        """Describe when each account's newest key expires and will be renewed."""
+        if current_round is None:
+            current_round = self.current_round()
+        now = time.time()
+        schedule = []
+        for last_round, address in sorted(self._heap):
+            rounds_left = last_round - current_round
+            schedule.append({
+                'address': address,
+                'last_round': last_round,
+                'rounds_left': rounds_left,
+                'expires_at': now + rounds_left * self.round_time,
+                'renew_at': now + max(0, rounds_left - self.horizon_rounds()) * self.round_time,
+            })
+        return schedule
+
+    def run_pending(self) -> float:
+        """
+        Renew every key inside the horizon.
+
+        Returns:
+            float: Seconds until the next key enters the horizon or a
+                failed renewal is due for retry
+        """
+        if time.monotonic() - self._last_refresh >= self.resync_interval:
+            self.refresh()
+        current_round = self.current_round()
+        due_round = current_round + self.horizon_rounds()
+
+        backing_off = []
+        while self._heap and self._heap[0][0] <= due_round:
+            last_round, address = heapq.heappop(self._heap)
+            retry_at = self._failed.get(address)
+            if retry_at is not None and retry_at > time.monotonic():
+                backing_off.append((last_round, address, retry_at))
+                continue
+            self._renew(address, last_round, current_round)
+
+        delay = self.resync_interval
+        for last_round, address, retry_at in backing_off:
+            heapq.heappush(self._heap, (last_round, address))
+            delay = min(delay, retry_at - time.monotonic())
+        upcoming = [last_round for last_round, _ in self._heap if last_round > due_round]
+        if upcoming:
+            delay = min(delay, (min(upcoming) - due_round) * self.round_time)
+        return max(0.0, delay)
+
+    def start(self) -> None:
+        """Run the scheduler in a background daemon thread."""
+        self._stopped = False
+        self._thread = threading.Thread(target=self.run_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def wake(self) -> None:
+        """Re-read the key list and re-evaluate the schedule now."""
+        self._last_refresh = 0.0
+        self._wake.set()
+
+    def run_forever(self) -> None:
+        while not self._stopped:
+            try:
+                delay = self.run_pending()
+            except (AlgodError, KeyError) as e:
+                logger.error(f"Key expiry check failed: {str(e)}")
+                delay = min(60.0, self.resync_interval)
+            if delay > 0:
+                logger.debug(f"Next key expiry check in {format_duration(delay)}")
+            self._wake.wait(max(delay, 1.0))
+            self._wake.clear()
+
+    def _renew(self, address: str, last_round: int, current_round: int) -> None:
+        first_round = current_round
+        new_last_round = max(last_round, current_round) + self.validity_rounds
+        logger.info(f"Renewing participation key for {address}, "
+                    f"current key expires at round {last_round}")
+
+        if not self.manager.generate_participation_key(address, first_round, new_last_round):
+            self._failed[address] = time.monotonic() + self.resync_interval
+            self.alert(address, f"Participation key expires at round {last_round} "
+                                f"and renewal failed; retrying later")
+            heapq.heappush(self._heap, (last_round, address))
+            return
+
+        transaction_file = Path(self.manager.data_dir) / f"online-{address}.txn"
+        if not self.manager.register_online(address, transaction_file):
+            self._failed[address] = time.monotonic() + self.resync_interval
+            self.alert(address, f"Generated a key valid until round {new_last_round} "
+                                f"but could not create its keyreg transaction")
+            heapq.heappush(self._heap, (new_last_round, address))
+            return
+
+        self._failed.pop(address, None)
+        heapq.heappush(self._heap, (new_last_round, address))
+        self.alert(address, f"Renewed participation key until round {new_last_round}; "
+                            f"sign and send {transaction_file} to register it")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Renew participation keys before they expire")
+    parser.add_argument('-d', '--data-dir', type=Path, default=Path('/var/lib/algorand'))
+    parser.add_argument('--horizon-days', type=float, default=DEFAULT_HORIZON / 86400,
+                        help="Renew keys this many days before expiry")
+    parser.add_argument('--validity-rounds', type=int, default=DEFAULT_VALIDITY_ROUNDS)
+    parser.add_argument('--list', action='store_true', help="Print the schedule and exit")
+    args = parser.parse_args(argv)
+
+    scheduler = KeyExpiryScheduler(
+        ParticipationManager(args.data_dir),
+        horizon=args.horizon_days * 86400,
+        validity_rounds=args.validity_rounds
+    )
+    try:
+        scheduler.refresh()
+        if args.list:
+            for entry in scheduler.schedule():
+                print(f"{entry['address']}  expires at round {entry['last_round']} "
+                      f"(in {format_duration(entry['rounds_left'] * scheduler.round_time)}), "
+                      f"renewal in {format_duration(entry['renew_at'] - time.time())}")
+            return 0
+    except AlgodError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
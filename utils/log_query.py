@@ -0,0 +1,313 @@
+import os
+import re
+import sys
+import json
+import mmap
+import bisect
+import hashlib
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ['debug', 'info', 'warning', 'error', 'fatal', 'panic']
+LEVEL_RANK = {name: rank for rank, name in enumerate(LEVELS)}
+LEVEL_RANK['warn'] = LEVEL_RANK['warning']
+
+MMAP_THRESHOLD = 16 * 1024 * 1024
+INDEX_INTERVAL = 1024 * 1024
+DEFAULT_INDEX_DIR = Path.home() / '.algorand-installer' / 'logindex'
+
+_TIME_FIELD = re.compile(rb'"time":\s*"([^"]+)"')
+_LEVEL_FIELD = re.compile(rb'"level":\s*"([a-z]+)"')
+_FUNCTION_FIELD = re.compile(rb'"function":\s*"([^"]+)"')
+_FRACTION = re.compile(r'\.(\d+)')
+_REGEX_SYNTAX = set('.^$*+?{}[]\\|()')
+
+
+def parse_time(value: str) -> Optional[float]:
+    """Parse an algod log timestamp to epoch seconds."""
+    try:
+        value = _FRACTION.sub(lambda m: '.' + m.group(1)[:6].ljust(6, '0'), value, count=1)
+        if value.endswith('Z'):
+            value = value[:-1] + '+0000'
+        elif len(value) > 6 and value[-3] == ':' and value[-6] in '+-':
+            value = value[:-3] + value[-2:]
+        fmt = '%Y-%m-%dT%H:%M:%S.%f%z' if '.' in value else '%Y-%m-%dT%H:%M:%S%z'
+        return datetime.strptime(value, fmt).timestamp()
+    except ValueError:
+        return None
+
+
+def component_of(function: str) -> str:
+    """Derive the go-algorand package from a log record's function field."""
+    path = function.split('go-algorand/', 1)[-1]
+    return path.split('.', 1)[0]
+
+
+class LogFilter:
+    """
+    Predicate over algod JSON log lines.
+
+    Time and level are extracted with byte-level regexes so that lines
+    outside the filter are rejected without JSON decoding; only matching
+    lines are decoded.
+    """
+
+    def __init__(self,
+                 min_level: Optional[str] = None,
+                 since: Optional[float] = None,
+                 until: Optional[float] = None,
+                 component: Optional[str] = None,
+                 pattern: Optional[str] = None):
+        self.min_rank = LEVEL_RANK[min_level.lower()] if min_level else None
+        self.since = since
+        self.until = until
+        self.component = component
+        self.pattern = re.compile(pattern) if pattern else None
+        # Anchors and other syntax apply to the message, not the JSON line,
+        # so only a literal pattern can be checked against the raw bytes
+        literal = pattern and not _REGEX_SYNTAX.intersection(pattern)
+        self._raw_literal = pattern.encode() if literal else None
+
+    def match(self, line) -> Optional[Dict]:
+        """
+        Test a raw log line.
+
+        Returns:
+            Decoded record with time, level, component and msg, or None
+        """
+        if isinstance(line, str):
+            line = line.encode('utf-8', errors='replace')
+
+        timestamp = None
+        if self.since is not None or self.until is not None:
+            timestamp = _record_time(line)
+            if timestamp is None:
+                return None
+            if self.since is not None and timestamp < self.since:
+                return None
+            if self.until is not None and timestamp > self.until:
+                return None
+
+        if self.min_rank is not None:
+            level = _LEVEL_FIELD.search(line)
+            if not level or LEVEL_RANK.get(level.group(1).decode(), -1) < self.min_rank:
+                return None
+
+        if self.component is not None:
+            function = _FUNCTION_FIELD.search(line)
+            if not function or component_of(function.group(1).decode()) != self.component:
+                return None
+
+        # Without escapes the raw line contains the message verbatim, so a
+        # miss on the raw bytes rules the line out before decoding
+        if self._raw_literal is not None and b'\\' not in line:
+            if self._raw_literal not in line:
+                return None
+
+        try:
+            data = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        record = {
+            'time': data.get('time', ''),
+            'timestamp': timestamp,
+            'level': data.get('level', ''),
+            'component': component_of(data.get('function', '')),
+            'msg': data.get('msg', ''),
+        }
+        if self.pattern is not None and not self.pattern.search(record['msg']):
+            return None
+        return record
+
+
+class SparseTimeIndex:
+    """
+    Persistent sparse map from log time to byte offset.
+
+    One entry is kept for roughly every INDEX_INTERVAL bytes. The index is
+    stored outside the node's data dir, keyed by the log path, and is
+    extended incrementally while the file keeps the same inode and grows.
+    """
+
+    def __init__(self, path: Path, index_dir: Path = DEFAULT_INDEX_DIR):
+        self.path = Path(path)
+        key = hashlib.sha1(str(self.path.resolve()).encode()).hexdigest()
+        self.index_file = Path(index_dir) / f"{key}.json"
+        self.times: List[float] = []
+        self.offsets: List[int] = []
+
+    def update(self) -> None:
+        """Bring the index up to date with the log file."""
+        stat = os.stat(self.path)
+        saved = self._load()
+        if saved and saved['inode'] == stat.st_ino and saved['size'] <= stat.st_size:
+            self.times, self.offsets = saved['times'], saved['offsets']
+            start = saved['size']
+        else:
+            self.times, self.offsets = [], []
+            start = 0
+        if start == stat.st_size:
+            return
+
+        next_mark = (self.offsets[-1] + INDEX_INTERVAL) if self.offsets else 0
+        scanned = start
+        for offset, line in iter_lines(self.path, start):
+            if offset >= next_mark:
+                timestamp = _record_time(line)
+                if timestamp is not None:
+                    self.times.append(timestamp)
+                    self.offsets.append(offset)
+                    next_mark = offset + INDEX_INTERVAL
+            scanned = offset + len(line) + 1
+        # Only complete lines are indexed; a partial last line is rescanned
+        self._save(stat.st_ino, scanned)
+
+    def seek_offset(self, since: float) -> int:
+        """Return an offset at or before the first record at `since`."""
+        position = bisect.bisect_left(self.times, since) - 1
+        return self.offsets[position] if position >= 0 else 0
+
+    def _load(self) -> Optional[Dict]:
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save(self, inode: int, size: int) -> None:
+        try:
+            self.index_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_file.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump({
+                    'inode': inode,
+                    'size': size,
+                    'times': self.times,
+                    'offsets': self.offsets,
+                }, f)
+            os.replace(tmp, self.index_file)
+        except OSError as e:
+            logger.warning(f"Could not save log index: {str(e)}")
+
+
+def iter_lines(path: Path, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (offset, line) pairs from a file, memory-mapping large files.
+
+    Stops at the last complete line, so a line still being written is
+    not returned.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if start >= size:
+            return
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                offset = start
+                while True:
+                    end = mapped.find(b'\n', offset)
+                    if end < 0:
+                        return
+                    yield offset, mapped[offset:end]
+                    offset = end + 1
+        else:
+            f.seek(start)
+            offset = start
+            for line in f:
+                if not line.endswith(b'\n'):
+                    return
+                yield offset, line[:-1]
+                offset += len(line)
+
+
+def log_files(data_dir: Path) -> List[Path]:
+    """List a node's log files, oldest first."""
+    data_dir = Path(data_dir)
+    archives = sorted(data_dir.glob('node.archive*.log'), key=lambda p: p.stat().st_mtime)
+    current = data_dir / 'node.log'
+    return archives + ([current] if current.exists() else [])
+
+
+def query(paths: List[Path],
+          log_filter: LogFilter,
+          use_index: bool = True,
+          index_dir: Path = DEFAULT_INDEX_DIR) -> Iterator[Dict]:
+    """
+    Stream matching records from log files in order.
+
+    With a start time, each file's sparse index is used to seek close to
+    it instead of scanning from the beginning. Scanning a file stops at
+    the first record past the end time.
+    """
+    for path in paths:
+        start = 0
+        if use_index and log_filter.since is not None:
+            index = SparseTimeIndex(path, index_dir)
+            index.update()
+            if index.times and log_filter.until is not None and index.times[0] > log_filter.until:
+                continue
+            start = index.seek_offset(log_filter.since)
+
+        for _, line in iter_lines(path, start):
+            if log_filter.until is not None:
+                timestamp = _record_time(line)
+                if timestamp is not None and timestamp > log_filter.until:
+                    break
+            record = log_filter.match(line)
+            if record is not None:
+                yield record
+
+
+def format_record(record: Dict) -> str:
+    """Format a record as a single human-readable line."""
+    return f"{record['time']} {record['level'].upper():7} [{record['component']}] {record['msg']}"
+
+
+def _record_time(line: bytes) -> Optional[float]:
+    match = _TIME_FIELD.search(line)
+    return parse_time(match.group(1).decode()) if match else None
+
+
+def _parse_cli_time(value: str) -> float:
+    timestamp = parse_time(value)
+    if timestamp is None:
+        try:
+            timestamp = datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid time: {value}")
+    return timestamp
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query algod node logs")
+    parser.add_argument('path', type=Path,
+                        help="Node data directory or a single log file")
+    parser.add_argument('--level', choices=LEVELS, help="Minimum level")
+    parser.add_argument('--since', type=_parse_cli_time, help="Start time (ISO 8601)")
+    parser.add_argument('--until', type=_parse_cli_time, help="End time (ISO 8601)")
+    parser.add_argument('--component', help="go-algorand package, e.g. catchup")
+    parser.add_argument('--grep', help="Regular expression matched against the message")
+    parser.add_argument('--limit', type=int, help="Maximum records to print")
+    parser.add_argument('--json', action='store_true', help="Print records as JSON lines")
+    args = parser.parse_args(argv)
+
+    paths = log_files(args.path) if args.path.is_dir() else [args.path]
+    log_filter = LogFilter(args.level, args.since, args.until, args.component, args.grep)
+
+    for count, record in enumerate(query(paths, log_filter)):
+        if args.limit is not None and count >= args.limit:
+            break
+        print(json.dumps(record) if args.json else format_record(record))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import os
+import logging
+from pathlib import Path
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INITIAL_BYTES = 256 * 1024
+DEFAULT_MAX_READ_BYTES = 4 * 1024 * 1024
+
+
+class LogTailer:
+    """
+    Incrementally follows a log file across rotation and truncation.
+
+    The tailer keeps the file open and remembers its inode and offset, so
+    each poll reads only the bytes appended since the previous one. When
+    algod rotates node.log to node.archive.log the old handle still points
+    at the archived file; it is drained before switching to the new
+    node.log, so no lines are lost. A shrinking file is treated as
+    truncated and read again from the start.
+    """
+
+    def __init__(self,
+                 path: Path,
+                 initial_bytes: Optional[int] = DEFAULT_INITIAL_BYTES,
+                 max_read_bytes: int = DEFAULT_MAX_READ_BYTES):
+        """
+        Args:
+            path: Log file to follow
+            initial_bytes: How much existing content to return on the first
+                poll; None returns the whole file
+            max_read_bytes: Upper bound on bytes read per poll
+        """
+        self.path = Path(path)
+        self.initial_bytes = initial_bytes
+        self.max_read_bytes = max_read_bytes
+        self._file: Optional[BinaryIO] = None
+        self._inode: Optional[int] = None
+        self._partial = b''
+
+    def poll(self) -> List[str]:
+        """Return complete lines appended since the last poll."""
+        lines: List[str] = []
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            # Between rotation and algod reopening node.log
+            if self._file is not None:
+                lines.extend(self._read_available())
+            return lines
+
+        if self._file is None:
+            self._open(stat, first=True)
+        elif stat.st_ino != self._inode:
+            lines.extend(self._read_available(drain=True))
+            self._flush_partial(lines)
+            self.close()
+            self._open(stat, first=False)
+        elif stat.st_size < self._file.tell():
+            logger.info(f"{self.path} was truncated, reading from the start")
+            self._file.seek(0)
+            self._partial = b''
+
+        lines.extend(self._read_available())
+        return lines
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._inode = None
+
+    def _open(self, stat: os.stat_result, first: bool) -> None:
+        self._file = open(self.path, 'rb')
+        self._inode = stat.st_ino
+        self._partial = b''
+        if first and self.initial_bytes is not None and stat.st_size > self.initial_bytes:
+            self._file.seek(stat.st_size - self.initial_bytes)
+            self._file.readline()  # Skip the partial first line
+
+    def _read_available(self, drain: bool = False) -> List[str]:
+        limit = None if drain else self.max_read_bytes
+        data = self._file.read() if limit is None else self._file.read(limit)
+        if not data:
+            return []
+        data = self._partial + data
+        *complete, self._partial = data.split(b'\n')
+        return [line.decode('utf-8', errors='replace') for line in complete]
+
+    def _flush_partial(self, lines: List[str]) -> None:
+        # The archived file will not grow again, so its last line is complete
+        if self._partial:
+            lines.append(self._partial.decode('utf-8', errors='replace'))
+            self._partial = b''
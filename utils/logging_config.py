@@ -5,10 +5,21 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional
 
+from .tracing import SpanLogFilter
+
+# Loggers of the installer's own modules, which log at DEBUG
+APP_LOGGERS = ('algorand_installer', 'main', '__main__', 'utils', 'gui', 'benchmarks')
+
 def setup_logging(install_dir: Path) -> logging.Logger:
     """
     Configure logging for the installation process.
     
+    Handlers are attached to the root logger so that every module's
+    records reach the log file, each tagged with the tracing span it was
+    logged from. The installer's own loggers log at DEBUG; third-party
+    libraries stay at INFO. Calling this again replaces the handlers it
+    added before.
+    
     Args:
         install_dir: Installation directory path
         
@@ -25,8 +36,9 @@ def setup_logging(install_dir: Path) -> logging.Logger:
     
     # Create formatter
     formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        '%(asctime)s - %(name)s - %(levelname)s - [%(span)s] %(message)s'
     )
+    span_filter = SpanLogFilter()
     
     # Setup file handler
     file_handler = logging.handlers.RotatingFileHandler(
@@ -36,19 +48,28 @@ def setup_logging(install_dir: Path) -> logging.Logger:
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(formatter)
+    file_handler.addFilter(span_filter)
     
     # Setup console handler
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(formatter)
+    console_handler.addFilter(span_filter)
     
-    # Setup logger
-    logger = logging.getLogger('algorand_installer')
-    logger.setLevel(logging.DEBUG)
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Setup root logger
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if getattr(handler, '_installer_handler', False):
+            root.removeHandler(handler)
+            handler.close()
+    for handler in (file_handler, console_handler):
+        handler._installer_handler = True
+        root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    for name in APP_LOGGERS:
+        logging.getLogger(name).setLevel(logging.DEBUG)
     
-    return logger
+    return get_logger()
 
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """Get a logger instance."""
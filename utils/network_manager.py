@@ -1,11 +1,18 @@
 # utils/network_manager.py
 import os
-import shutil
+import asyncio
 import logging
 import json
-import requests
 from pathlib import Path
-from typing import Literal, Optional
+from typing import List, Literal, Optional
+
+from .algod_client import AlgodClient, AlgodError
+from .config_store import (ALGOD_DEFAULTS, CONFIG_FILE, CONFIG_VERSION, GENESIS_FILE,
+                           PHONEBOOK_FILE, get_config_store)
+from .fast_catchup import CATCHPOINT_URL_TEMPLATE, FastCatchup, ProgressCallback
+from .genesis_provider import check_genesis_hash, get_genesis_provider
+from .tracing import traced
+from . import relay_discovery
 
 logger = logging.getLogger(__name__)
 
@@ -15,17 +22,23 @@ class NetworkManager:
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
         self.genesis_dir = data_dir / 'genesis'
-        self.config_file = data_dir / 'config.json'
+        self.config_file = data_dir / CONFIG_FILE
+        self.config_store = get_config_store(data_dir)
         
-        # Genesis file URLs
-        self.genesis_urls = {
-            'mainnet': 'https://github.com/algorand/go-algorand/blob/master/installer/genesis/mainnet/genesis.json',
-            'testnet': 'https://github.com/algorand/go-algorand/blob/master/installer/genesis/testnet/genesis.json',
-            'betanet': 'https://github.com/algorand/go-algorand/blob/master/installer/genesis/betanet/genesis.json'
-        }
+        # Shared so each network's genesis is fetched at most once
+        self.genesis_provider = get_genesis_provider()
+
+    @traced('network')
+    def setup_network(self, network: NetworkType, commit: bool = True) -> None:
+        """
+        Configure node for specified network.
 
-    def setup_network(self, network: NetworkType) -> None:
-        """Configure node for specified network."""
+        Args:
+            network: Network whose genesis and bootstrap the node uses
+            commit: Write config.json now rather than leaving it staged;
+                genesis.json is always written, and the restart either
+                needs is left to the config store's apply_restart
+        """
         logger.info(f"Setting up {network}...")
         
         try:
@@ -36,7 +49,7 @@ class NetworkManager:
             self._setup_genesis_files(network)
             
             # Configure network settings
-            self._configure_network(network)
+            self._configure_network(network, commit)
             
             logger.info(f"Successfully configured node for {network}")
             
@@ -44,49 +57,127 @@ class NetworkManager:
             logger.error(f"Failed to setup {network}: {str(e)}")
             raise Exception(f"Network setup failed: {str(e)}")
 
+    @traced('network')
     def _setup_genesis_files(self, network: NetworkType) -> None:
-        """Download and set up genesis files."""
+        """Set up genesis files from the package or a verified download."""
         try:
-            # Create network-specific directory
-            network_dir = self.genesis_dir / network
-            network_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Download genesis file
-            genesis_path = network_dir / 'genesis.json'
-            if not genesis_path.exists():
-                logger.info(f"Downloading {network} genesis file...")
-                response = requests.get(self.genesis_urls[network])
-                response.raise_for_status()
-                
-                with open(genesis_path, 'w') as f:
-                    f.write(response.text)
-            
-            # Copy to data directory
-            shutil.copy2(genesis_path, self.data_dir / 'genesis.json')
-            logger.info(f"Genesis file set up for {network}")
+            source = self.genesis_provider.get_genesis(network)
+            if self.config_store.replace(GENESIS_FILE, source.read_text()):
+                logger.info(f"Genesis file set up for {network}")
+            else:
+                logger.info(f"Genesis file for {network} already in place")
             
         except Exception as e:
             raise Exception(f"Failed to setup genesis files: {str(e)}")
 
-    def _configure_network(self, network: NetworkType) -> None:
+    @traced('network')
+    def _configure_network(self, network: NetworkType, commit: bool = True) -> None:
         """Set network-specific configuration."""
+        # algod fills <network> into its default itself; other domains are
+        # spelled out. NetAddress is left to the node's role, which tuning sets
+        bootstrap = relay_discovery.BOOTSTRAP_DOMAINS[network]
+        if bootstrap == ALGOD_DEFAULTS['DNSBootstrapID'].replace('<network>', network):
+            bootstrap = ALGOD_DEFAULTS['DNSBootstrapID']
         config = {
-            "Version": 12,
+            "Version": CONFIG_VERSION,
             "GossipFanout": 4,
-            "NetAddress": "",  # Will be set if this is a relay node
-            "DNSBootstrapID": f"{network}.algorand.network"
+            "DNSBootstrapID": bootstrap
         }
         
-        # Special configuration for betanet
-        if network == 'betanet':
-            config["DNSBootstrapID"] = "betanet.algodev.network"
-        
-        # Write config file
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        # Merged into config.json; settings from other writers are kept
+        self.config_store.stage(CONFIG_FILE, config)
+        if commit:
+            self.config_store.commit()
         
         logger.info(f"Created network configuration for {network}")
 
+    @traced('network')
+    def verify_genesis(self, network: NetworkType) -> None:
+        """
+        Check that the running node loaded the network's pinned genesis.
+
+        Raises:
+            Exception: If the node's genesis ID or hash differs, or algod
+                cannot be asked
+        """
+        versions = AlgodClient.from_data_dir(self.data_dir).versions()
+        check_genesis_hash(network, versions.get('genesis_id'), versions.get('genesis_hash_b64'))
+        logger.info(f"Node genesis {versions.get('genesis_id')} matches {network}")
+
+    @traced('network')
+    def fast_catchup(self,
+                     network: NetworkType,
+                     label_url_template: str = CATCHPOINT_URL_TEMPLATE,
+                     progress_callback: Optional[ProgressCallback] = None) -> bool:
+        """
+        Catch the running node up to the network's latest catchpoint.
+        
+        Args:
+            network: Network the node is configured for
+            label_url_template: Catchpoint label source, formatted with the network
+            progress_callback: Called with (phase, fraction complete)
+            
+        Returns:
+            bool: True if fast catchup completed, False if the node fell back
+            to normal sync
+        """
+        # A catchpoint for another network would stall or corrupt the ledger
+        current = self.get_current_network()
+        if current != network:
+            logger.warning(f"Skipping fast catchup: node genesis is "
+                           f"{current or 'missing'}, not {network}")
+            return False
+        
+        try:
+            client = AlgodClient.from_data_dir(self.data_dir)
+        except AlgodError as e:
+            logger.warning(f"Skipping fast catchup: {str(e)}")
+            return False
+        
+        catchup = FastCatchup(client, network, label_url_template=label_url_template)
+        return catchup.run(progress_callback)
+
+    @traced('network')
+    def discover_relays(self,
+                        network: NetworkType,
+                        count: int = 8,
+                        resolver=None,
+                        connector: relay_discovery.Connector = relay_discovery.tcp_connect_time,
+                        commit: bool = True) -> List[str]:
+        """
+        Rank the network's relays by latency and prefer the closest.
+        
+        Args:
+            network: Network whose bootstrap relays are probed
+            count: Number of relays to keep
+            resolver: SRV resolver; the system nameserver by default
+            connector: Measures one connection to a relay
+            commit: Write phonebook.json now rather than leaving it staged
+            
+        Returns:
+            List of preferred relay addresses, best first
+        """
+        probes = asyncio.run(relay_discovery.discover_relays(
+            network, resolver=resolver, connector=connector
+        ))
+        peers = relay_discovery.preferred_peers(probes, count)
+        reachable = sum(1 for probe in probes if probe.reachable)
+        logger.info(f"{reachable} of {len(probes)} {network} relays reachable; "
+                    f"preferring {', '.join(peers) or 'none'}")
+        if peers:
+            self.stage_phonebook(peers)
+            if commit:
+                self.config_store.commit()
+        return peers
+
+    def stage_phonebook(self, peers: List[str]) -> None:
+        """Queue phonebook.json so algod dials these relays alongside DNS bootstrap."""
+        self.config_store.stage(PHONEBOOK_FILE, {"Include": list(peers)})
+
+    def write_phonebook(self, peers: List[str]) -> None:
+        self.stage_phonebook(peers)
+        self.config_store.commit()
+
     def get_current_network(self) -> Optional[NetworkType]:
         """Determine current network from genesis file."""
         genesis_file = self.data_dir / 'genesis.json'
@@ -1,15 +1,94 @@
 # utils/participation_manager.py
+import os
+import sys
+import math
+import time
+import argparse
 import subprocess
 import logging
 import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import tracing
+from .algod_client import AlgodClient, AlgodError
+from .partkey_registry import ParticipationKeyRegistry
+from .system_checks import _get_available_ram
 
 logger = logging.getLogger(__name__)
 
+PARTKEY_MEMORY_GB = 0.5  # Working set of one goal addpartkey process
+STATUS_CHECK_WORKERS = 16
+
+
+def default_key_dilution(first_round: int, last_round: int) -> int:
+    """Key dilution that balances batch and single key counts for a range."""
+    return max(1, math.ceil(math.sqrt(last_round - first_round + 1)))
+
+
+def default_worker_count() -> int:
+    """Concurrent key generations the host can sustain, by cores and free RAM."""
+    cores = os.cpu_count() or 1
+    by_memory = int(_get_available_ram() / PARTKEY_MEMORY_GB)
+    return max(1, min(cores, by_memory))
+
+
+class PartKeyRequest:
+    """A participation key to generate."""
+
+    def __init__(self,
+                 address: str,
+                 first_round: int,
+                 last_round: int,
+                 key_dilution: Optional[int] = None):
+        if last_round < first_round:
+            raise ValueError(f"Invalid round range {first_round}-{last_round} for {address}")
+        self.address = address
+        self.first_round = first_round
+        self.last_round = last_round
+        self.key_dilution = key_dilution or default_key_dilution(first_round, last_round)
+
+
+class PartKeyResult:
+    """Outcome of generating one participation key."""
+
+    def __init__(self, request: PartKeyRequest):
+        self.request = request
+        self.success = False
+        self.attempts = 0
+        self.duration = 0.0  # Seconds, summed over attempts
+        self.error = ''
+
+    def as_dict(self) -> Dict:
+        return {
+            'address': self.request.address,
+            'first_round': self.request.first_round,
+            'last_round': self.request.last_round,
+            'key_dilution': self.request.key_dilution,
+            'success': self.success,
+            'attempts': self.attempts,
+            'duration': round(self.duration, 3),
+            'error': self.error,
+        }
+
+
+ProgressCallback = Callable[[PartKeyResult, int, int], None]
+
+
 class ParticipationManager:
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, client: Optional[AlgodClient] = None):
         self.data_dir = data_dir
+        self._client = client
+        self.registry = ParticipationKeyRegistry()
+        self._status_cache: Dict[str, Tuple[int, Dict]] = {}
+        
+    @property
+    def client(self) -> AlgodClient:
+        """REST client for the node, created on first use."""
+        if self._client is None:
+            self._client = AlgodClient.from_data_dir(self.data_dir)
+        return self._client
         
     def generate_participation_key(self, 
                                  address: str,
@@ -29,63 +108,161 @@ class ParticipationManager:
             bool: True if successful, False otherwise
         """
         try:
-            cmd = [
-                'goal', 'account', 'addpartkey',
-                '-a', address,
-                '--roundFirstValid', str(first_round),
-                '--roundLastValid', str(last_round)
-            ]
-            
-            if key_dilution:
-                cmd.extend(['--keyDilution', str(key_dilution)])
-            
-            # Add data directory
-            cmd.extend(['-d', str(self.data_dir)])
-            
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True
-            )
+            self._run_addpartkey(address, first_round, last_round, key_dilution)
             
             logger.info(f"Generated participation key for {address}")
+            if self._client is not None:
+                self._client.invalidate('/v2/participation')
             return True
             
         except subprocess.CalledProcessError as e:
             logger.error(f"Failed to generate participation key: {e.stderr}")
             return False
 
+    def generate_participation_keys(self,
+                                    requests: List[PartKeyRequest],
+                                    max_workers: Optional[int] = None,
+                                    retries: int = 1,
+                                    progress_callback: Optional[ProgressCallback] = None
+                                    ) -> Dict:
+        """
+        Generate participation keys for many accounts concurrently.
+        
+        Each key is generated by its own goal process. Keys that fail are
+        retried up to `retries` more times after the rest of the batch has
+        finished, without regenerating keys that succeeded.
+        
+        Args:
+            requests: Keys to generate
+            max_workers: Concurrent generations; sized by cores and free RAM
+                if not given
+            retries: Extra attempts for each failed key
+            progress_callback: Called with (result, completed, total) as each
+                attempt finishes
+        
+        Returns:
+            Dict with succeeded and failed counts, wall time and per-key results
+        """
+        workers = max(1, min(max_workers or default_worker_count(), len(requests) or 1))
+        results = [PartKeyResult(request) for request in requests]
+        started = time.monotonic()
+        logger.info(f"Generating {len(requests)} participation keys with {workers} workers")
+        
+        pending = results
+        for attempt in range(retries + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.info(f"Retrying {len(pending)} failed participation keys")
+            completed = len(results) - len(pending)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._generate_one, result) for result in pending]
+                for future in as_completed(futures):
+                    result = future.result()
+                    if result.success:
+                        completed += 1
+                    if progress_callback:
+                        progress_callback(result, completed, len(results))
+            pending = [result for result in results if not result.success]
+        
+        if self._client is not None:
+            self._client.invalidate('/v2/participation')
+        
+        summary = {
+            'succeeded': len(results) - len(pending),
+            'failed': len(pending),
+            'workers': workers,
+            'wall_time': round(time.monotonic() - started, 3),
+            'keys': [result.as_dict() for result in results],
+        }
+        logger.info(f"Generated {summary['succeeded']} of {len(results)} participation keys "
+                    f"in {summary['wall_time']:.1f}s")
+        for result in pending:
+            logger.error(f"Failed to generate participation key for "
+                         f"{result.request.address}: {result.error}")
+        return summary
+
+    def _generate_one(self, result: PartKeyResult) -> PartKeyResult:
+        request = result.request
+        result.attempts += 1
+        started = time.monotonic()
+        try:
+            self._run_addpartkey(request.address, request.first_round,
+                                 request.last_round, request.key_dilution)
+            result.success = True
+            result.error = ''
+        except subprocess.CalledProcessError as e:
+            result.error = (e.stderr or str(e)).strip()
+        except OSError as e:
+            result.error = str(e)
+        result.duration += time.monotonic() - started
+        return result
+
+    def _run_addpartkey(self,
+                        address: str,
+                        first_round: int,
+                        last_round: int,
+                        key_dilution: Optional[int] = None) -> None:
+        cmd = [
+            'goal', 'account', 'addpartkey',
+            '-a', address,
+            '--roundFirstValid', str(first_round),
+            '--roundLastValid', str(last_round)
+        ]
+        
+        if key_dilution:
+            cmd.extend(['--keyDilution', str(key_dilution)])
+        
+        # Add data directory
+        cmd.extend(['-d', str(self.data_dir)])
+        
+        tracing.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            check=True
+        )
+
+    def refresh_keys(self) -> ParticipationKeyRegistry:
+        """Sync the key registry with the node and return it."""
+        self.registry.refresh(self.client)
+        return self.registry
+
     def list_participation_keys(self) -> Dict[str, Dict]:
-        """List all participation keys on the node."""
+        """
+        List all participation keys on the node.
+        
+        Returns:
+            Dict keyed by participation ID; an account may have several keys
+        """
         try:
-            cmd = ['goal', 'account', 'listpartkeys', '-d', str(self.data_dir)]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse the output
+            registry = self.refresh_keys()
             keys = {}
-            for line in result.stdout.strip().split('\n')[1:]:  # Skip header
-                if line:
-                    parts = line.split()
-                    keys[parts[1]] = {
-                        'registered': parts[0] == 'yes',
-                        'participation_id': parts[2],
-                        'first_round': int(parts[4]),
-                        'last_round': int(parts[5])
+            for address in registry.addresses():
+                account = self.client.account(address)
+                registered = account.get('participation', {}).get('vote-participation-key')
+                for record in registry.for_address(address):
+                    keys[record.id] = {
+                        'address': address,
+                        'registered': record.vote_key is not None and record.vote_key == registered,
+                        'first_round': record.first_valid,
+                        'last_round': record.last_valid
                     }
             
             return keys
             
-        except subprocess.CalledProcessError as e:
-            logger.error(f"Failed to list participation keys: {e.stderr}")
+        except (AlgodError, KeyError) as e:
+            logger.error(f"Failed to list participation keys: {str(e)}")
             return {}
 
-    def register_online(self, address: str) -> bool:
+    def register_online(self, address: str, transaction_file: Optional[Path] = None) -> bool:
         """
         Register an account online.
         
         Args:
             address: Account address to register online
+            transaction_file: Where to write the unsigned keyreg transaction;
+                defaults to online.txn in the data directory
             
         Returns:
             bool: True if successful, False otherwise
@@ -95,11 +272,11 @@ class ParticipationManager:
                 'goal', 'account', 'changeonlinestatus',
                 '--address', address,
                 '--online',
-                '--transaction-file', str(self.data_dir / 'online.txn'),
+                '--transaction-file', str(transaction_file or Path(self.data_dir) / 'online.txn'),
                 '-d', str(self.data_dir)
             ]
             
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            tracing.run(cmd, capture_output=True, text=True, check=True)
             logger.info(f"Created online registration transaction for {address}")
             return True
             
@@ -126,7 +303,7 @@ class ParticipationManager:
                 '-d', str(self.data_dir)
             ]
             
-            subprocess.run(cmd, capture_output=True, text=True, check=True)
+            tracing.run(cmd, capture_output=True, text=True, check=True)
             logger.info(f"Created offline registration transaction for {address}")
             return True
             
@@ -144,14 +321,125 @@ class ParticipationManager:
         Returns:
             Optional[bool]: True if online, False if offline, None if error
         """
-        try:
-            cmd = ['goal', 'account', 'dump', '-a', address, '-d', str(self.data_dir)]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse JSON output
-            data = json.loads(result.stdout)
-            return data.get('onl', False)
-            
-        except (subprocess.CalledProcessError, json.JSONDecodeError) as e:
-            logger.error(f"Failed to check participation status: {str(e)}")
+        status = self.check_participation_statuses([address])[address]
+        if status['error']:
+            logger.error(f"Failed to check participation status: {status['error']}")
             return None
+        return status['online']
+
+    def check_participation_statuses(self,
+                                     addresses: List[str],
+                                     max_workers: int = STATUS_CHECK_WORKERS) -> Dict[str, Dict]:
+        """
+        Check the participation state of many accounts concurrently.
+        
+        Results are cached per round, so checking an account again before
+        the node has advanced costs no request.
+        
+        Args:
+            addresses: Accounts to check
+            max_workers: Maximum concurrent account lookups
+            
+        Returns:
+            Dict keyed by address with online state, stake in microAlgos, vote
+            key validity, last proposed and last heartbeat rounds, and an
+            error message if the lookup failed
+        """
+        try:
+            current_round = int(self.client.status().get('last-round', 0))
+        except AlgodError as e:
+            return {address: _status_row(address, error=str(e)) for address in addresses}
+        
+        results: Dict[str, Dict] = {}
+        pending = []
+        for address in dict.fromkeys(addresses):
+            cached = self._status_cache.get(address)
+            if cached is not None and cached[0] == current_round:
+                results[address] = cached[1]
+            else:
+                pending.append(address)
+        
+        def check(address: str) -> Dict:
+            try:
+                account = self.client.account(address)
+            except AlgodError as e:
+                return _status_row(address, error=str(e))
+            row = _status_row(address, account, current_round)
+            self._status_cache[address] = (current_round, row)
+            return row
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+                for row in executor.map(check, pending):
+                    results[row['address']] = row
+        return results
+
+
+def _status_row(address: str,
+                account: Optional[Dict] = None,
+                current_round: int = 0,
+                error: str = '') -> Dict:
+    account = account or {}
+    participation = account.get('participation') or {}
+    first_valid = participation.get('vote-first-valid')
+    last_valid = participation.get('vote-last-valid')
+    return {
+        'address': address,
+        'round': account.get('round', current_round),
+        'online': account.get('status') == 'Online' if account else None,
+        'stake': account.get('amount'),
+        'vote_first_valid': first_valid,
+        'vote_last_valid': last_valid,
+        'vote_key_valid': (first_valid is not None and last_valid is not None
+                           and first_valid <= current_round <= last_valid),
+        'rounds_until_expiry': last_valid - current_round if last_valid is not None else None,
+        'last_proposed': account.get('last-proposed'),
+        'last_heartbeat': account.get('last-heartbeat'),
+        'error': error,
+    }
+
+
+def format_status_table(statuses: Dict[str, Dict]) -> str:
+    """Format participation statuses as a fixed-width table."""
+    header = f"{'ADDRESS':58}  {'STATE':7}  {'STAKE (ALGO)':>14}  {'VOTE KEY':>17}  " \
+             f"{'LAST PROPOSED':>13}  {'LAST HEARTBEAT':>14}"
+    lines = [header]
+    for row in statuses.values():
+        if row['error']:
+            lines.append(f"{row['address']:58}  error: {row['error']}")
+            continue
+        state = 'online' if row['online'] else 'offline'
+        stake = f"{row['stake'] / 1e6:,.6f}" if row['stake'] is not None else '-'
+        if row['vote_last_valid'] is None:
+            vote_key = '-'
+        elif row['vote_key_valid']:
+            vote_key = f"until {row['vote_last_valid']}"
+        else:
+            vote_key = 'expired'
+        lines.append(f"{row['address']:58}  {state:7}  {stake:>14}  {vote_key:>17}  "
+                     f"{row['last_proposed'] or '-':>13}  {row['last_heartbeat'] or '-':>14}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check account participation status")
+    parser.add_argument('addresses', nargs='*',
+                        help="Accounts to check; defaults to accounts with keys on the node")
+    parser.add_argument('-d', '--data-dir', type=Path, default=Path('/var/lib/algorand'))
+    parser.add_argument('--workers', type=int, default=STATUS_CHECK_WORKERS)
+    parser.add_argument('--json', action='store_true', help="Print statuses as JSON")
+    args = parser.parse_args(argv)
+
+    manager = ParticipationManager(args.data_dir)
+    try:
+        addresses = args.addresses or manager.refresh_keys().addresses()
+    except AlgodError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    statuses = manager.check_participation_statuses(addresses, args.workers)
+    print(json.dumps(statuses, indent=2) if args.json else format_status_table(statuses))
+    return 1 if any(row['error'] for row in statuses.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
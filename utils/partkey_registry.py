@@ -0,0 +1,157 @@
+import bisect
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ParticipationKeyRecord:
+    """A participation key installed on the node."""
+
+    __slots__ = (
+        'id', 'address', 'first_valid', 'last_valid', 'key_dilution',
+        'vote_key', 'selection_key', 'last_vote', 'last_block_proposal',
+    )
+
+    def __init__(self, data: Dict):
+        key = data['key']
+        self.id: str = data['id']
+        self.address: str = data['address']
+        self.first_valid: int = key['vote-first-valid']
+        self.last_valid: int = key['vote-last-valid']
+        self.key_dilution: int = key.get('vote-key-dilution', 0)
+        self.vote_key: Optional[str] = key.get('vote-participation-key')
+        self.selection_key: Optional[str] = key.get('selection-participation-key')
+        self.last_vote: Optional[int] = data.get('last-vote')
+        self.last_block_proposal: Optional[int] = data.get('last-block-proposal')
+
+    def is_valid_at(self, round_number: int) -> bool:
+        return self.first_valid <= round_number <= self.last_valid
+
+    def as_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return (f"ParticipationKeyRecord(id={self.id!r}, address={self.address!r}, "
+                f"rounds={self.first_valid}-{self.last_valid})")
+
+
+class ParticipationKeyRegistry:
+    """
+    In-memory index of every participation key on a node.
+
+    Keys are indexed by participation ID and address, and by validity
+    interval through two sorted arrays: one of first valid rounds for
+    "valid at round R" queries and one of last valid rounds for expiry
+    queries. Refreshing diffs the node's key list against the registry,
+    so unchanged keys are left in place and the interval arrays are only
+    updated for keys that were added or removed.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_id: Dict[str, ParticipationKeyRecord] = {}
+        self._by_address: Dict[str, Set[str]] = {}
+        self._by_first: List[Tuple[int, str]] = []
+        self._by_last: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, participation_id: str) -> bool:
+        return participation_id in self._by_id
+
+    def refresh(self, client) -> Dict[str, int]:
+        """
+        Bring the registry in line with the node's keys.
+
+        Args:
+            client: AlgodClient for the node
+
+        Returns:
+            Dict with the number of keys added, removed and updated
+        """
+        return self.apply(client.participation_keys(max_age=0))
+
+    def apply(self, keys: Iterable[Dict]) -> Dict[str, int]:
+        """Diff a full key listing from algod against the registry."""
+        added = removed = updated = 0
+        with self._lock:
+            seen = set()
+            for data in keys:
+                record = ParticipationKeyRecord(data)
+                seen.add(record.id)
+                existing = self._by_id.get(record.id)
+                if existing is None:
+                    self._add(record)
+                    added += 1
+                elif (existing.last_vote != record.last_vote
+                        or existing.last_block_proposal != record.last_block_proposal):
+                    # Only activity changes for an installed key; its
+                    # validity and address are immutable
+                    existing.last_vote = record.last_vote
+                    existing.last_block_proposal = record.last_block_proposal
+                    updated += 1
+            for participation_id in [i for i in self._by_id if i not in seen]:
+                self._remove(participation_id)
+                removed += 1
+
+        if added or removed:
+            logger.debug(f"Participation keys: {added} added, {removed} removed, "
+                         f"{len(self._by_id)} total")
+        return {'added': added, 'removed': removed, 'updated': updated}
+
+    def get(self, participation_id: str) -> Optional[ParticipationKeyRecord]:
+        return self._by_id.get(participation_id)
+
+    def for_address(self, address: str) -> List[ParticipationKeyRecord]:
+        """All keys for an account, ordered by first valid round."""
+        with self._lock:
+            records = [self._by_id[i] for i in self._by_address.get(address, ())]
+        return sorted(records, key=lambda r: r.first_valid)
+
+    def addresses(self) -> List[str]:
+        return list(self._by_address)
+
+    def newest_for_address(self, address: str) -> Optional[ParticipationKeyRecord]:
+        """The key for an account that stays valid the longest."""
+        records = self.for_address(address)
+        return max(records, key=lambda r: r.last_valid) if records else None
+
+    def valid_at(self, round_number: int) -> List[ParticipationKeyRecord]:
+        """Keys whose validity interval contains a round."""
+        with self._lock:
+            # Keys starting after the round are excluded by bisection; of the
+            # rest, only those that have not expired are kept
+            end = bisect.bisect_left(self._by_first, (round_number + 1,))
+            start = bisect.bisect_left(self._by_last, (round_number,))
+            if end <= len(self._by_last) - start:
+                candidates = (self._by_id[i] for _, i in self._by_first[:end])
+            else:
+                candidates = (self._by_id[i] for _, i in self._by_last[start:])
+            return [r for r in candidates if r.is_valid_at(round_number)]
+
+    def expiring_between(self, first_round: int, last_round: int) -> List[ParticipationKeyRecord]:
+        """Keys whose last valid round falls in a range, soonest first."""
+        with self._lock:
+            start = bisect.bisect_left(self._by_last, (first_round,))
+            end = bisect.bisect_left(self._by_last, (last_round + 1,))
+            return [self._by_id[i] for _, i in self._by_last[start:end]]
+
+    def _add(self, record: ParticipationKeyRecord) -> None:
+        self._by_id[record.id] = record
+        self._by_address.setdefault(record.address, set()).add(record.id)
+        bisect.insort(self._by_first, (record.first_valid, record.id))
+        bisect.insort(self._by_last, (record.last_valid, record.id))
+
+    def _remove(self, participation_id: str) -> None:
+        record = self._by_id.pop(participation_id)
+        ids = self._by_address[record.address]
+        ids.discard(participation_id)
+        if not ids:
+            del self._by_address[record.address]
+        for index, value in ((self._by_first, record.first_valid),
+                             (self._by_last, record.last_valid)):
+            position = bisect.bisect_left(index, (value, participation_id))
+            del index[position]
@@ -0,0 +1,193 @@
+import re
+import sys
+import hashlib
+import logging
+import subprocess
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from . import tracing
+
+logger = logging.getLogger(__name__)
+
+INSTALLER_DIR = Path(__file__).parent.parent
+DEFAULT_VENV_PATH = INSTALLER_DIR / 'venv'
+DEFAULT_WHEELHOUSE = INSTALLER_DIR / 'wheelhouse'
+FINGERPRINT_FILE = '.installer-fingerprint'
+
+_REQUIREMENT = re.compile(r'^([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:(==|>=|<=|~=|>|<)\s*([^\s;,]+))?')
+
+
+def read_requirements(path: Path) -> List[str]:
+    """Read requirement specifiers from a requirements file."""
+    requirements = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                requirements.append(line)
+    return requirements
+
+
+def venv_version(venv_path: Path) -> str:
+    """Read the Python version a venv was created with from its pyvenv.cfg."""
+    try:
+        with open(venv_path / 'pyvenv.cfg', 'r') as f:
+            for line in f:
+                key, _, value = line.partition('=')
+                if key.strip() in ('version', 'version_info'):
+                    return value.strip()
+    except OSError:
+        pass
+    return ''
+
+
+def requirements_fingerprint(requirements: List[str], venv_path: Path) -> str:
+    """Fingerprint a requirement set together with the venv's interpreter version."""
+    digest = hashlib.sha256()
+    digest.update(f"{venv_version(venv_path)}\n".encode())
+    for requirement in sorted(r.replace(' ', '').lower() for r in requirements):
+        digest.update(requirement.encode() + b'\n')
+    return digest.hexdigest()
+
+
+def venv_python(venv_path: Path) -> Path:
+    """Get the interpreter path inside a virtual environment."""
+    if sys.platform == "win32":
+        return venv_path / 'Scripts' / 'python.exe'
+    return venv_path / 'bin' / 'python3'
+
+
+def requirements_satisfied(venv_path: Path, requirements: List[str]) -> bool:
+    """
+    Check installed distributions in a venv against requirement pins.
+
+    Reads package metadata in-process rather than starting the venv's
+    interpreter or pip.
+    """
+    try:
+        from importlib import metadata
+    except ImportError:  # Python 3.7
+        return False
+
+    site_packages = list(venv_path.glob('lib/python*/site-packages'))
+    site_packages += list(venv_path.glob('Lib/site-packages'))
+    if not site_packages:
+        return False
+
+    installed = {}
+    for dist in metadata.distributions(path=[str(p) for p in site_packages]):
+        name = dist.metadata['Name']
+        if name:
+            installed[_normalize(name)] = dist.version
+
+    for requirement in requirements:
+        match = _REQUIREMENT.match(requirement)
+        if not match:
+            return False
+        name, op, wanted = match.groups()
+        have = installed.get(_normalize(name))
+        if have is None:
+            return False
+        if op and not _version_matches(have, op, wanted):
+            return False
+    return True
+
+
+def environment_is_current(venv_path: Path, requirements: List[str]) -> bool:
+    """Check whether a venv already satisfies a requirement set."""
+    stamp = venv_path / FINGERPRINT_FILE
+    if not venv_python(venv_path).exists() or not stamp.exists():
+        return False
+    if stamp.read_text().strip() != requirements_fingerprint(requirements, venv_path):
+        return False
+    return requirements_satisfied(venv_path, requirements)
+
+
+def ensure_python_environment(requirements: List[str],
+                              venv_path: Path = DEFAULT_VENV_PATH,
+                              wheelhouse: Optional[Path] = DEFAULT_WHEELHOUSE) -> bool:
+    """
+    Create or update a virtual environment only when needed.
+
+    When the venv's fingerprint matches and the installed distributions
+    satisfy the pins, nothing is run. Otherwise packages are installed from
+    the local wheelhouse, which is filled from the package index first if
+    it cannot satisfy the requirements on its own.
+
+    Args:
+        requirements: Requirement specifiers to install
+        venv_path: Virtual environment directory
+        wheelhouse: Local wheel cache directory, or None to install from the index
+
+    Returns:
+        bool: True if the environment was changed, False if it was already current
+    """
+    if environment_is_current(venv_path, requirements):
+        logger.info("Python environment is up to date")
+        return False
+
+    python = venv_python(venv_path)
+    if not python.exists():
+        logger.info("Creating virtual environment...")
+        _run([sys.executable, '-m', 'venv', str(venv_path)])
+
+    logger.info("Installing Python packages in virtual environment...")
+    if wheelhouse is None:
+        _run([str(python), '-m', 'pip', 'install'] + requirements)
+    else:
+        install_cmd = [
+            str(python), '-m', 'pip', 'install',
+            '--no-index', '--find-links', str(wheelhouse)
+        ] + requirements
+        try:
+            _run(install_cmd)
+        except subprocess.CalledProcessError:
+            logger.info("Filling wheelhouse from package index...")
+            wheelhouse.mkdir(parents=True, exist_ok=True)
+            _run([str(python), '-m', 'pip', 'wheel', '-w', str(wheelhouse)] + requirements)
+            _run(install_cmd)
+
+    fingerprint = requirements_fingerprint(requirements, venv_path)
+    (venv_path / FINGERPRINT_FILE).write_text(fingerprint + '\n')
+    return True
+
+
+def _run(cmd: List[str]) -> None:
+    tracing.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+
+def _normalize(name: str) -> str:
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def _version_matches(have: str, op: str, wanted: str) -> bool:
+    try:
+        from packaging.version import Version
+        have_v, wanted_v = Version(have), Version(wanted)
+    except Exception:
+        have_v, wanted_v = _version_tuple(have), _version_tuple(wanted)
+
+    if op == '==':
+        return have_v == wanted_v
+    if op == '>=':
+        return have_v >= wanted_v
+    if op == '<=':
+        return have_v <= wanted_v
+    if op == '>':
+        return have_v > wanted_v
+    if op == '<':
+        return have_v < wanted_v
+    # ~= X.Y means >= X.Y and == X.*
+    prefix = _version_tuple(wanted)[:-1]
+    return have_v >= wanted_v and _version_tuple(have)[:len(prefix)] == prefix
+
+
+def _version_tuple(version: str) -> Tuple[int, ...]:
+    parts = []
+    for part in version.split('.'):
+        digits = re.match(r'\d+', part)
+        if not digits:
+            break
+        parts.append(int(digits.group()))
+    return tuple(parts)
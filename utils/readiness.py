@@ -0,0 +1,140 @@
+import time
+import random
+import socket
+import logging
+from pathlib import Path
+
+from . import tracing
+from .algod_client import AlgodClient, AlgodError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEADLINE = 120.0
+INITIAL_BACKOFF = 0.1
+MAX_BACKOFF = 5.0
+WAIT_FOR_BLOCK_TIMEOUT = 15.0
+
+
+class ReadinessResult:
+    """Outcome of a readiness probe."""
+
+    def __init__(self, ready: bool, stage: str, time_to_ready: float, detail: str = ''):
+        self.ready = ready
+        self.stage = stage  # Last stage reached
+        self.time_to_ready = time_to_ready
+        self.detail = detail
+
+    def __bool__(self) -> bool:
+        return self.ready
+
+    def __repr__(self) -> str:
+        return (f"ReadinessResult(ready={self.ready}, stage={self.stage!r}, "
+                f"time_to_ready={self.time_to_ready:.2f})")
+
+
+def wait_for_node_ready(data_dir: Path,
+                        service: str = 'algorand',
+                        deadline: float = DEFAULT_DEADLINE,
+                        check_service: bool = True) -> ReadinessResult:
+    """
+    Wait until the node is serving, returning as soon as it is.
+
+    The probe advances through three stages, backing off exponentially
+    between attempts until the deadline:
+
+    1. `systemctl is-active` reports the unit as active
+    2. the endpoint in algod.net accepts TCP connections and /health answers
+    3. a long-poll on wait-for-block-after returns, showing the node is
+       serving ledger requests (skipped when the API token is unreadable)
+
+    Args:
+        data_dir: Node data directory containing algod.net and algod.token
+        service: systemd unit name
+        deadline: Maximum seconds to wait
+        check_service: Whether to check the systemd unit at all
+
+    Returns:
+        ReadinessResult with the last stage reached and time taken
+    """
+    data_dir = Path(data_dir)
+    started = time.monotonic()
+    stage = 'service' if check_service else 'socket'
+    detail = ''
+    backoff = INITIAL_BACKOFF
+
+    while True:
+        elapsed = time.monotonic() - started
+        remaining = deadline - elapsed
+        client = None
+        try:
+            if stage == 'service':
+                state = _service_state(service)
+                if state != 'active':
+                    raise _NotReady(f"{service} is {state}")
+                stage = 'socket'
+
+            if stage in ('socket', 'block'):
+                client = _client_for(data_dir)
+
+            if stage == 'socket':
+                host, port = _endpoint(data_dir)
+                with socket.create_connection((host, port), timeout=min(2.0, max(remaining, 0.1))):
+                    pass
+                client.health()
+                stage = 'block'
+
+            if stage == 'block':
+                if client.token:
+                    current = client.status(max_age=0).get('last-round', 0)
+                    client.wait_for_block_after(
+                        current,
+                        timeout=max(0.1, min(WAIT_FOR_BLOCK_TIMEOUT, remaining))
+                    )
+                else:
+                    detail = 'API token unreadable; block check skipped'
+
+            took = time.monotonic() - started
+            logger.info(f"Node ready after {took:.2f}s")
+            return ReadinessResult(True, 'ready', took, detail)
+
+        except (_NotReady, AlgodError, OSError) as e:
+            detail = str(e)
+
+        elapsed = time.monotonic() - started
+        if elapsed >= deadline:
+            logger.warning(f"Node not ready after {elapsed:.1f}s ({stage}): {detail}")
+            return ReadinessResult(False, stage, elapsed, detail)
+
+        # Full jitter keeps concurrent probes from synchronising
+        time.sleep(min(deadline - elapsed, random.uniform(0, backoff)))
+        backoff = min(MAX_BACKOFF, backoff * 2)
+
+
+class _NotReady(Exception):
+    pass
+
+
+def _service_state(service: str) -> str:
+    result = tracing.run(
+        ['systemctl', 'is-active', service],
+        capture_output=True,
+        text=True
+    )
+    return result.stdout.strip() or 'unknown'
+
+
+def _endpoint(data_dir: Path):
+    address = (data_dir / 'algod.net').read_text().strip()
+    address = address.split('://', 1)[-1]
+    host, _, port = address.rpartition(':')
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def _client_for(data_dir: Path) -> AlgodClient:
+    # algod rewrites algod.net on start, so it is re-read on every attempt
+    address = (data_dir / 'algod.net').read_text().strip()
+    try:
+        token = (data_dir / 'algod.token').read_text().strip()
+    except OSError:
+        token = ''
+    return AlgodClient(address, token, timeout=5)
@@ -0,0 +1,343 @@
+import sys
+import json
+import time
+import random
+import struct
+import asyncio
+import logging
+import argparse
+import statistics
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP_DOMAINS = {
+    'mainnet': 'mainnet.algorand.network',
+    'testnet': 'testnet.algorand.network',
+    'betanet': 'betanet.algodev.network',
+}
+SRV_SERVICE = '_algobootstrap._tcp'
+DNS_PORT = 53
+DNS_TIMEOUT = 3.0
+PROBE_TIMEOUT = 2.0
+DEFAULT_SAMPLES = 5
+DEFAULT_CONCURRENCY = 64
+JITTER_WEIGHT = 2.0  # A millisecond of jitter costs as much as two of latency
+
+_TYPE_SRV = 33
+_CLASS_IN = 1
+
+# (host, port) of a relay
+Endpoint = Tuple[str, int]
+# Measures one TCP connect to an endpoint, returning seconds
+Connector = Callable[[str, int, float], Awaitable[float]]
+
+
+class SrvRecord:
+    """A DNS SRV record."""
+
+    def __init__(self, target: str, port: int, priority: int = 0, weight: int = 0):
+        self.target = target
+        self.port = port
+        self.priority = priority
+        self.weight = weight
+
+    def __repr__(self) -> str:
+        return f"SrvRecord({self.target}:{self.port}, priority={self.priority}, weight={self.weight})"
+
+
+class DnsSrvResolver:
+    """
+    Minimal asynchronous DNS client for SRV lookups.
+
+    Queries go over UDP to one nameserver, falling back to TCP when the
+    answer is truncated, as relay lists are often too large for UDP.
+    """
+
+    def __init__(self, nameserver: Optional[Endpoint] = None, timeout: float = DNS_TIMEOUT):
+        self.nameserver = nameserver or (system_nameserver(), DNS_PORT)
+        self.timeout = timeout
+
+    async def resolve_srv(self, name: str) -> List[SrvRecord]:
+        query_id = random.randrange(1 << 16)
+        query = _build_query(query_id, name, _TYPE_SRV)
+        response = await self._query_udp(query)
+        if _is_truncated(response):
+            response = await self._query_tcp(query)
+        return _parse_srv_response(response, query_id)
+
+    async def _query_udp(self, query: bytes) -> bytes:
+        loop = asyncio.get_running_loop()
+        received: asyncio.Future = loop.create_future()
+
+        class _Protocol(asyncio.DatagramProtocol):
+            def datagram_received(self, data, addr):
+                if not received.done() and data[:2] == query[:2]:
+                    received.set_result(data)
+
+            def error_received(self, exc):
+                if not received.done():
+                    received.set_exception(exc)
+
+        transport, _ = await loop.create_datagram_endpoint(_Protocol, remote_addr=self.nameserver)
+        try:
+            transport.sendto(query)
+            return await asyncio.wait_for(received, self.timeout)
+        finally:
+            transport.close()
+
+    async def _query_tcp(self, query: bytes) -> bytes:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(*self.nameserver), self.timeout
+        )
+        try:
+            writer.write(struct.pack('!H', len(query)) + query)
+            await writer.drain()
+            length = struct.unpack('!H', await asyncio.wait_for(reader.readexactly(2), self.timeout))[0]
+            return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+        finally:
+            writer.close()
+
+
+class StaticResolver:
+    """Resolver that answers from a fixed table, for stand-in environments."""
+
+    def __init__(self, records: Dict[str, List[SrvRecord]]):
+        self.records = records
+
+    async def resolve_srv(self, name: str) -> List[SrvRecord]:
+        return list(self.records.get(name.rstrip('.'), []))
+
+
+class RelayProbe:
+    """Latency samples for one relay."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.samples: List[float] = []  # Milliseconds
+        self.failures = 0
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def reachable(self) -> bool:
+        return bool(self.samples)
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        return statistics.median(self.samples) if self.samples else None
+
+    @property
+    def jitter_ms(self) -> Optional[float]:
+        if len(self.samples) < 2:
+            return 0.0 if self.samples else None
+        return statistics.pstdev(self.samples)
+
+    @property
+    def score(self) -> float:
+        """Lower is better; every failed sample costs a full timeout."""
+        if not self.samples:
+            return float('inf')
+        loss = self.failures / (self.failures + len(self.samples))
+        return self.latency_ms + JITTER_WEIGHT * self.jitter_ms + loss * PROBE_TIMEOUT * 1000
+
+    def as_dict(self) -> Dict:
+        return {
+            'address': self.address,
+            'latency_ms': round(self.latency_ms, 3) if self.samples else None,
+            'jitter_ms': round(self.jitter_ms, 3) if self.samples else None,
+            'samples': len(self.samples),
+            'failures': self.failures,
+        }
+
+
+async def tcp_connect_time(host: str, port: int, timeout: float) -> float:
+    """Time a TCP handshake, roughly one round trip."""
+    started = time.perf_counter()
+    _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return elapsed
+
+
+async def probe_relays(endpoints: List[Endpoint],
+                       samples: int = DEFAULT_SAMPLES,
+                       timeout: float = PROBE_TIMEOUT,
+                       concurrency: int = DEFAULT_CONCURRENCY,
+                       connector: Connector = tcp_connect_time) -> List[RelayProbe]:
+    """
+    Probe relays concurrently and rank them by latency and jitter.
+
+    Samples for one relay are taken one after another so they measure its
+    round trip time rather than contention between them; different
+    relays are probed in parallel up to the concurrency limit.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(endpoint: Endpoint) -> RelayProbe:
+        result = RelayProbe(*endpoint)
+        async with semaphore:
+            for _ in range(samples):
+                try:
+                    result.samples.append(await connector(result.host, result.port, timeout) * 1000)
+                except (OSError, asyncio.TimeoutError):
+                    result.failures += 1
+                    if not result.samples and result.failures >= 2:
+                        break  # Unreachable; do not spend the full budget on it
+        return result
+
+    results = await asyncio.gather(*(probe(endpoint) for endpoint in dict.fromkeys(endpoints)))
+    return sorted(results, key=lambda r: r.score)
+
+
+async def discover_relays(network: str,
+                          resolver=None,
+                          samples: int = DEFAULT_SAMPLES,
+                          timeout: float = PROBE_TIMEOUT,
+                          concurrency: int = DEFAULT_CONCURRENCY,
+                          connector: Connector = tcp_connect_time,
+                          bootstrap_domain: Optional[str] = None) -> List[RelayProbe]:
+    """Resolve a network's bootstrap relays and probe them, best first."""
+    resolver = resolver or DnsSrvResolver()
+    domain = bootstrap_domain or BOOTSTRAP_DOMAINS[network]
+    name = f"{SRV_SERVICE}.{domain}"
+    records = await resolver.resolve_srv(name)
+    logger.info(f"Resolved {len(records)} relays from {name}")
+    endpoints = [(record.target.rstrip('.'), record.port) for record in records]
+    return await probe_relays(endpoints, samples, timeout, concurrency, connector)
+
+
+def preferred_peers(probes: List[RelayProbe], count: int = 8) -> List[str]:
+    """Addresses of the best reachable relays."""
+    return [probe.address for probe in probes if probe.reachable][:count]
+
+
+def system_nameserver(resolv_conf: str = '/etc/resolv.conf') -> str:
+    """First nameserver configured for the host."""
+    try:
+        with open(resolv_conf, 'r') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) >= 2 and fields[0] == 'nameserver':
+                    return fields[1]
+    except OSError:
+        pass
+    return '127.0.0.53'
+
+
+def _build_query(query_id: int, name: str, qtype: int) -> bytes:
+    header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)  # Recursion desired
+    question = b''.join(
+        bytes([len(label)]) + label.encode('ascii') for label in name.rstrip('.').split('.')
+    ) + b'\x00'
+    return header + question + struct.pack('!HH', qtype, _CLASS_IN)
+
+
+def _is_truncated(message: bytes) -> bool:
+    return len(message) >= 4 and bool(struct.unpack('!H', message[2:4])[0] & 0x0200)
+
+
+def _read_name(message: bytes, offset: int) -> Tuple[str, int]:
+    """Decode a possibly compressed name; returns (name, offset after it)."""
+    labels = []
+    end = None
+    for _ in range(128):  # Bounds pointer loops in malformed messages
+        length = message[offset]
+        if length & 0xC0 == 0xC0:
+            pointer = struct.unpack('!H', message[offset:offset + 2])[0] & 0x3FFF
+            if end is None:
+                end = offset + 2
+            offset = pointer
+            continue
+        offset += 1
+        if length == 0:
+            break
+        labels.append(message[offset:offset + length].decode('ascii'))
+        offset += length
+    else:
+        raise ValueError("DNS name too long or looping")
+    return '.'.join(labels), end if end is not None else offset
+
+
+def _parse_srv_response(message: bytes, query_id: int) -> List[SrvRecord]:
+    response_id, flags, questions, answers, _, _ = struct.unpack('!HHHHHH', message[:12])
+    if response_id != query_id:
+        raise ValueError("DNS response does not match the query")
+    rcode = flags & 0x000F
+    if rcode == 3:  # NXDOMAIN
+        return []
+    if rcode:
+        raise OSError(f"DNS query failed with rcode {rcode}")
+
+    offset = 12
+    for _ in range(questions):
+        _, offset = _read_name(message, offset)
+        offset += 4
+    records = []
+    for _ in range(answers):
+        _, offset = _read_name(message, offset)
+        rtype, _, _, length = struct.unpack('!HHIH', message[offset:offset + 10])
+        offset += 10
+        if rtype == _TYPE_SRV:
+            priority, weight, port = struct.unpack('!HHH', message[offset:offset + 6])
+            target, _ = _read_name(message, offset + 6)
+            records.append(SrvRecord(target, port, priority, weight))
+        offset += length
+    return records
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Discover and rank Algorand relays by latency")
+    parser.add_argument('--network', default='mainnet', choices=sorted(BOOTSTRAP_DOMAINS))
+    parser.add_argument('--bootstrap-domain', help="Override the network's DNS bootstrap domain")
+    parser.add_argument('--nameserver', help="DNS server as host[:port]")
+    parser.add_argument('--samples', type=int, default=DEFAULT_SAMPLES)
+    parser.add_argument('--timeout', type=float, default=PROBE_TIMEOUT)
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument('--top', type=int, default=8, help="Relays to keep as preferred peers")
+    parser.add_argument('--write', type=Path, metavar='DATA_DIR',
+                        help="Write the preferred peers to DATA_DIR/phonebook.json")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    nameserver = None
+    if args.nameserver:
+        host, _, port = args.nameserver.partition(':')
+        nameserver = (host, int(port or DNS_PORT))
+
+    try:
+        probes = asyncio.run(discover_relays(
+            args.network,
+            resolver=DnsSrvResolver(nameserver),
+            samples=args.samples,
+            timeout=args.timeout,
+            concurrency=args.concurrency,
+            bootstrap_domain=args.bootstrap_domain
+        ))
+    except (OSError, ValueError, asyncio.TimeoutError) as e:
+        print(f"Relay discovery failed: {str(e) or type(e).__name__}", file=sys.stderr)
+        return 1
+
+    peers = preferred_peers(probes, args.top)
+    if args.json:
+        print(json.dumps({'relays': [p.as_dict() for p in probes], 'preferred': peers}, indent=2))
+    else:
+        for probe in probes:
+            if probe.reachable:
+                print(f"{probe.address:45} {probe.latency_ms:8.2f}ms  jitter {probe.jitter_ms:6.2f}ms"
+                      f"  loss {probe.failures}/{probe.failures + len(probe.samples)}")
+            else:
+                print(f"{probe.address:45} unreachable")
+
+    if args.write:
+        from .network_manager import NetworkManager
+        NetworkManager(args.write).write_phonebook(peers)
+    return 0 if peers else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
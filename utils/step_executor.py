@@ -0,0 +1,331 @@
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .tracing import Span, get_tracer
+
+logger = logging.getLogger(__name__)
+
+PENDING = 'pending'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+UP_TO_DATE = 'up-to-date'  # Completed by an earlier run and verified by its probe
+
+
+class InstallStep:
+    """
+    A named unit of installation work with declared dependencies.
+
+    With a journal, a step may declare its inputs and a cheap probe that
+    fingerprints the state it leaves behind. The value its action returns
+    is journaled as its outcome and handed to restore when a later run
+    skips the step. A step whose effect is applied by a later step (such
+    as staged config) sets applied_later so that it is fingerprinted once
+    the run is over rather than when it succeeds.
+    """
+
+    def __init__(self,
+                 name: str,
+                 action: Callable[[], Any],
+                 depends_on: Iterable[str] = (),
+                 description: Optional[str] = None,
+                 inputs: Optional[Dict[str, Any]] = None,
+                 probe: Optional[Callable[[], Optional[str]]] = None,
+                 restore: Optional[Callable[[Any], None]] = None,
+                 applied_later: bool = False):
+        self.name = name
+        self.action = action
+        self.depends_on = tuple(depends_on)
+        self.description = description or name
+        self.inputs = inputs or {}
+        self.probe = probe
+        self.restore = restore
+        self.applied_later = applied_later
+        self.status = PENDING
+        self.error: Optional[BaseException] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Wall time spent in the step, in seconds."""
+        if self.started_at is None or self.finished_at is None:
+            return 0.0
+        return self.finished_at - self.started_at
+
+
+class StepExecutor:
+    """
+    Runs installation steps as a dependency graph on a bounded thread pool.
+
+    A step is submitted as soon as all of its dependencies have succeeded.
+    When a step fails no new steps are started, running steps are allowed
+    to finish and the original exception is re-raised from run().
+
+    Given an InstallJournal, a step whose dependencies are all up to date
+    is skipped when the journal shows it completed with the same inputs
+    and its probe still matches. Any step that runs makes its dependents
+    run too. Alternatively select() fixes up front which steps run.
+    """
+
+    def __init__(self, max_workers: int = 4, journal=None):
+        self.max_workers = max(1, max_workers)
+        self.journal = journal
+        self.steps: Dict[str, InstallStep] = {}
+        self.forced: Set[str] = set()
+        self.selected: Optional[Set[str]] = None
+        self._run_started: Optional[float] = None
+        self._run_finished: Optional[float] = None
+
+    def add_step(self,
+                 name: str,
+                 action: Callable[[], Any],
+                 depends_on: Iterable[str] = (),
+                 description: Optional[str] = None,
+                 inputs: Optional[Dict[str, Any]] = None,
+                 probe: Optional[Callable[[], Optional[str]]] = None,
+                 restore: Optional[Callable[[Any], None]] = None,
+                 applied_later: bool = False) -> InstallStep:
+        """Register a step. Dependencies may be registered later."""
+        if name in self.steps:
+            raise ValueError(f"Duplicate installation step: {name}")
+        step = InstallStep(name, action, depends_on, description, inputs, probe, restore,
+                           applied_later)
+        self.steps[name] = step
+        return step
+
+    def downstream(self, name: str) -> List[str]:
+        """Return a step and every step that depends on it, in dependency order."""
+        if name not in self.steps:
+            raise ValueError(f"Unknown installation step '{name}'; "
+                             f"steps are: {', '.join(self.topological_order())}")
+        dependents = self._dependents()
+        found: Set[str] = set()
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            if current not in found:
+                found.add(current)
+                pending.extend(dependents[current])
+        return [step for step in self.topological_order() if step in found]
+
+    def rerun_from(self, name: str) -> List[str]:
+        """
+        Force a step and everything that depends on it to run.
+
+        Returns:
+            The forced step names
+        """
+        forced = self.downstream(name)
+        self.forced.update(forced)
+        if self.journal is not None:
+            self.journal.invalidate(self.forced)
+        return forced
+
+    def select(self, names: Iterable[str]) -> None:
+        """
+        Run only the named steps, as decided by an install plan; every
+        other step counts as up to date.
+        """
+        unknown = sorted(set(names) - set(self.steps))
+        if unknown:
+            raise ValueError(f"Unknown installation steps: {', '.join(unknown)}")
+        self.selected = set(names)
+
+    def topological_order(self) -> List[str]:
+        """Return step names in dependency order, validating the graph."""
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+        indegree = {name: len(step.depends_on) for name, step in self.steps.items()}
+        dependents = self._dependents()
+        ready = [name for name in self.steps if indegree[name] == 0]
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in dependents[name]:
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+
+        if len(order) != len(self.steps):
+            cyclic = sorted(name for name, count in indegree.items() if count > 0)
+            raise ValueError(f"Dependency cycle between steps: {', '.join(cyclic)}")
+        return order
+
+    def run(self) -> None:
+        """Execute all steps, overlapping those that are independent."""
+        self.topological_order()
+        dependents = self._dependents()
+        remaining = {name: set(step.depends_on) for name, step in self.steps.items()}
+        first_error: Optional[BaseException] = None
+        # Step spans run on pool threads; nest them under the caller's span
+        parent = get_tracer().current()
+
+        self._run_started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers,
+                                    thread_name_prefix='install-step') as pool:
+                running = {}
+
+                def submit_ready() -> None:
+                    for name, deps in list(remaining.items()):
+                        if not deps:
+                            del remaining[name]
+                            step = self.steps[name]
+                            step.status = RUNNING
+                            running[pool.submit(self._run_step, step, parent)] = step
+
+                submit_ready()
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        step = running.pop(future)
+                        if step.status == FAILED:
+                            first_error = first_error or step.error
+                            continue
+                        for child in dependents[step.name]:
+                            if child in remaining:
+                                remaining[child].discard(step.name)
+                    if first_error is None:
+                        submit_ready()
+        finally:
+            # Also after an interrupt, so completed steps are not rerun
+            self._record_fingerprints()
+
+        self._run_finished = time.monotonic()
+        for name in remaining:
+            self.steps[name].status = SKIPPED
+
+        if first_error is not None:
+            raise first_error
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Return the chain of dependent steps with the largest total wall time.
+
+        Returns:
+            Tuple of (step names along the path, summed duration in seconds)
+        """
+        best: Dict[str, Tuple[float, Optional[str]]] = {}
+        for name in self.topological_order():
+            step = self.steps[name]
+            prev = None
+            prev_cost = 0.0
+            for dep in step.depends_on:
+                if best[dep][0] > prev_cost or prev is None:
+                    prev, prev_cost = dep, best[dep][0]
+            best[name] = (prev_cost + step.duration, prev)
+
+        if not best:
+            return [], 0.0
+
+        tail = max(best, key=lambda name: best[name][0])
+        total = best[tail][0]
+        path = []
+        node: Optional[str] = tail
+        while node is not None:
+            path.append(node)
+            node = best[node][1]
+        path.reverse()
+        return path, total
+
+    def timing_report(self) -> Dict[str, object]:
+        """Return per-step timings and the critical path for the last run."""
+        path, path_time = self.critical_path()
+        wall = 0.0
+        if self._run_started is not None and self._run_finished is not None:
+            wall = self._run_finished - self._run_started
+        return {
+            'wall_time': wall,
+            'critical_path': path,
+            'critical_path_time': path_time,
+            'steps': {
+                name: {
+                    'status': step.status,
+                    'duration': step.duration,
+                    'depends_on': list(step.depends_on),
+                }
+                for name, step in self.steps.items()
+            },
+        }
+
+    def log_timing_report(self) -> None:
+        """Log step timings and the critical path."""
+        report = self.timing_report()
+        logger.info(f"Installation steps finished in {report['wall_time']:.1f}s")
+        for name, info in report['steps'].items():
+            logger.info(f"  {name}: {info['status']} in {info['duration']:.2f}s")
+        logger.info(
+            f"Critical path ({report['critical_path_time']:.1f}s): "
+            f"{' -> '.join(report['critical_path'])}"
+        )
+
+    def _dependents(self) -> Dict[str, List[str]]:
+        dependents: Dict[str, List[str]] = {name: [] for name in self.steps}
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep in dependents:
+                    dependents[dep].append(step.name)
+        return dependents
+
+    def _is_up_to_date(self, step: InstallStep) -> bool:
+        if self.selected is not None:
+            return step.name not in self.selected
+        if self.journal is None or step.probe is None or step.name in self.forced:
+            return False
+        if any(self.steps[dep].status != UP_TO_DATE for dep in step.depends_on):
+            return False
+        return self.journal.is_complete(step.name, step.inputs, _probe(step))
+
+    def _record_fingerprints(self) -> None:
+        # Probed once the run is over, so a step whose effect is applied by
+        # a later step (such as staged config) is fingerprinted as applied
+        if self.journal is None:
+            return
+        for step in self.steps.values():
+            if step.status == SUCCEEDED and step.applied_later and step.probe is not None:
+                self.journal.record_fingerprint(step.name, _probe(step))
+
+    def _run_step(self, step: InstallStep, parent: Optional[Span] = None) -> None:
+        step.started_at = time.monotonic()
+        try:
+            with get_tracer().span(step.name, 'step', parent=parent) as span:
+                if self._is_up_to_date(step):
+                    logger.info(f"Step is up to date, skipping: {step.description}")
+                    span.attributes['up_to_date'] = True
+                    entry = self.journal.entry(step.name) if self.journal is not None else None
+                    if step.restore is not None and entry and entry.get('outcome') is not None:
+                        step.restore(entry['outcome'])
+                    step.status = UP_TO_DATE
+                    return
+                logger.info(f"Starting step: {step.description}")
+                if self.journal is not None:
+                    self.journal.record_start(step.name, step.inputs)
+                outcome = step.action()
+            if self.journal is not None:
+                self.journal.record_success(step.name, outcome)
+                if step.probe is not None and not step.applied_later:
+                    self.journal.record_fingerprint(step.name, _probe(step))
+            step.status = SUCCEEDED
+        except BaseException as e:
+            if self.journal is not None:
+                self.journal.record_failure(step.name, e)
+            step.error = e
+            step.status = FAILED
+        finally:
+            step.finished_at = time.monotonic()
+
+
+def _probe(step: InstallStep) -> Optional[str]:
+    try:
+        return step.probe()
+    except Exception as e:
+        logger.debug(f"Probe for step {step.name} failed: {str(e)}")
+        return None
@@ -0,0 +1,257 @@
+import os
+import sys
+import json
+import mmap
+import time
+import random
+import logging
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOCK_SIZE = 4096
+SEQUENTIAL_BLOCK_SIZE = 1024 * 1024
+DEFAULT_FILE_SIZE = 256 * 1024 * 1024
+DEFAULT_DURATION = 2.0  # Seconds per random I/O test
+FSYNC_SAMPLES = 200
+
+# Minimums for the data directory's disk, per node role. Latencies are in
+# milliseconds, throughput in MB/s.
+ROLE_THRESHOLDS: Dict[str, Dict[str, float]] = {
+    'participation': {
+        'min_free_gb': 100,
+        'random_read_iops': 3000,
+        'random_write_iops': 1500,
+        'fsync_p99_ms': 20,
+        'sequential_read_mbps': 100,
+        'sequential_write_mbps': 50,
+    },
+    'relay': {
+        'min_free_gb': 1000,
+        'random_read_iops': 10000,
+        'random_write_iops': 5000,
+        'fsync_p99_ms': 5,
+        'sequential_read_mbps': 300,
+        'sequential_write_mbps': 200,
+    },
+    'archival': {
+        'min_free_gb': 1000,
+        'random_read_iops': 5000,
+        'random_write_iops': 2500,
+        'fsync_p99_ms': 10,
+        'sequential_read_mbps': 200,
+        'sequential_write_mbps': 100,
+    },
+}
+
+_MAXIMUM_METRICS = {'fsync_p99_ms'}
+
+
+def existing_parent(path: Path) -> Path:
+    """The path itself or its nearest existing ancestor."""
+    path = Path(path)
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def _open_direct(path: str, flags: int) -> Tuple[int, bool]:
+    """Open with O_DIRECT if the filesystem allows it."""
+    direct = getattr(os, 'O_DIRECT', 0)
+    if direct:
+        try:
+            return os.open(path, flags | direct), True
+        except OSError:
+            pass
+    return os.open(path, flags), False
+
+
+def _aligned_buffer(size: int) -> mmap.mmap:
+    # Anonymous maps are page aligned, as O_DIRECT requires
+    buffer = mmap.mmap(-1, size)
+    buffer.write(os.urandom(size))
+    return buffer
+
+
+def _fill(path: str, size: int) -> None:
+    chunk = os.urandom(SEQUENTIAL_BLOCK_SIZE)
+    with open(path, 'wb') as f:
+        for _ in range(size // len(chunk)):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _drop_cache(fd: int) -> None:
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def measure_random_iops(path: str, file_size: int, duration: float, write: bool = False) -> float:
+    """4K random read or write operations per second on an existing test file."""
+    fd, direct = _open_direct(path, os.O_RDWR if write else os.O_RDONLY)
+    try:
+        _drop_cache(fd)
+        buffer = _aligned_buffer(BLOCK_SIZE)
+        blocks = file_size // BLOCK_SIZE
+        operations = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        while time.perf_counter() < deadline:
+            offset = random.randrange(blocks) * BLOCK_SIZE
+            if write:
+                os.pwritev(fd, [buffer], offset)
+            else:
+                os.preadv(fd, [buffer], offset)
+            operations += 1
+        if write and not direct:
+            # Buffered writes only count once they reach the disk
+            os.fsync(fd)
+        return operations / (time.perf_counter() - started)
+    finally:
+        os.close(fd)
+
+
+def measure_fsync_latency(path: str, file_size: int, samples: int = FSYNC_SAMPLES) -> List[float]:
+    """Latencies in milliseconds of a 4K write followed by fsync, as the ledger commits do."""
+    fd = os.open(path, os.O_RDWR)
+    try:
+        buffer = _aligned_buffer(BLOCK_SIZE)
+        blocks = file_size // BLOCK_SIZE
+        latencies = []
+        for _ in range(samples):
+            started = time.perf_counter()
+            os.pwritev(fd, [buffer], random.randrange(blocks) * BLOCK_SIZE)
+            os.fsync(fd)
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies
+    finally:
+        os.close(fd)
+
+
+def measure_sequential(path: str, file_size: int, write: bool = False) -> float:
+    """Sequential throughput in MB/s with 1MB blocks."""
+    fd, direct = _open_direct(path, os.O_RDWR if write else os.O_RDONLY)
+    try:
+        _drop_cache(fd)
+        buffer = _aligned_buffer(SEQUENTIAL_BLOCK_SIZE)
+        started = time.perf_counter()
+        for offset in range(0, file_size, SEQUENTIAL_BLOCK_SIZE):
+            if write:
+                os.pwritev(fd, [buffer], offset)
+            else:
+                os.preadv(fd, [buffer], offset)
+        if write:
+            os.fsync(fd)
+        return file_size / (1024 * 1024) / (time.perf_counter() - started)
+    finally:
+        os.close(fd)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_storage_benchmark(data_dir: Path,
+                          file_size: int = DEFAULT_FILE_SIZE,
+                          duration: float = DEFAULT_DURATION) -> Dict[str, object]:
+    """
+    Benchmark the filesystem that holds (or will hold) the node's data.
+
+    A single test file of file_size bytes is created next to the data and
+    removed afterwards, so the disk space used is bounded.
+
+    Returns:
+        Dict with random read/write IOPS, fsync latency percentiles,
+        sequential throughput and free space
+    """
+    target = existing_parent(data_dir)
+    stat = os.statvfs(str(target))
+    free_gb = stat.f_frsize * stat.f_bavail / (1024 ** 3)
+    file_size = min(file_size, int(stat.f_frsize * stat.f_bavail * 0.5))
+    file_size -= file_size % SEQUENTIAL_BLOCK_SIZE
+    if file_size < SEQUENTIAL_BLOCK_SIZE:
+        raise Exception(f"Not enough free space in {target} to benchmark storage")
+
+    logger.info(f"Benchmarking storage at {target} with a {file_size // (1024 * 1024)}MB file...")
+    fd, test_file = tempfile.mkstemp(dir=str(target), prefix='.storage-benchmark-')
+    os.close(fd)
+    try:
+        _fill(test_file, file_size)
+
+        probe_fd, direct = _open_direct(test_file, os.O_RDONLY)
+        os.close(probe_fd)
+
+        fsync = measure_fsync_latency(test_file, file_size)
+        results = {
+            'path': str(target),
+            'direct_io': direct,
+            'file_size_mb': file_size // (1024 * 1024),
+            'free_gb': round(free_gb, 1),
+            'random_read_iops': round(measure_random_iops(test_file, file_size, duration)),
+            'random_write_iops': round(measure_random_iops(test_file, file_size, duration,
+                                                           write=True)),
+            'fsync_p50_ms': round(percentile(fsync, 0.50), 3),
+            'fsync_p95_ms': round(percentile(fsync, 0.95), 3),
+            'fsync_p99_ms': round(percentile(fsync, 0.99), 3),
+            'sequential_read_mbps': round(measure_sequential(test_file, file_size), 1),
+            'sequential_write_mbps': round(measure_sequential(test_file, file_size,
+                                                              write=True), 1),
+        }
+    finally:
+        os.unlink(test_file)
+
+    logger.info(f"Storage benchmark: {results}")
+    return results
+
+
+def evaluate(results: Dict[str, object], role: str) -> List[str]:
+    """
+    Compare benchmark results with a role's thresholds.
+
+    Returns:
+        List of shortfalls; empty if the storage is adequate
+    """
+    shortfalls = []
+    for metric, threshold in ROLE_THRESHOLDS[role].items():
+        value = results.get('free_gb' if metric == 'min_free_gb' else metric)
+        if value is None:
+            continue
+        if metric in _MAXIMUM_METRICS:
+            if value > threshold:
+                shortfalls.append(f"{metric} is {value} (maximum {threshold} for a {role} node)")
+        elif value < threshold:
+            shortfalls.append(f"{metric} is {value} (minimum {threshold} for a {role} node)")
+    return shortfalls
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark storage for an Algorand node")
+    parser.add_argument('-d', '--data-dir', type=Path, default=Path('/var/lib/algorand'))
+    parser.add_argument('--role', choices=sorted(ROLE_THRESHOLDS), default='participation')
+    parser.add_argument('--size-mb', type=int, default=DEFAULT_FILE_SIZE // (1024 * 1024))
+    parser.add_argument('--duration', type=float, default=DEFAULT_DURATION,
+                        help="Seconds per random I/O test")
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    results = run_storage_benchmark(args.data_dir, args.size_mb * 1024 * 1024, args.duration)
+    shortfalls = evaluate(results, args.role)
+    if args.json:
+        print(json.dumps({'results': results, 'role': args.role, 'shortfalls': shortfalls},
+                         indent=2))
+    else:
+        for key, value in results.items():
+            print(f"{key:24} {value}")
+        for shortfall in shortfalls:
+            print(f"WARNING: {shortfall}")
+    return 1 if shortfalls else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
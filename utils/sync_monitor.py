@@ -0,0 +1,218 @@
+import sys
+import json
+import time
+import logging
+import argparse
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .algod_client import AlgodClient, AlgodError
+
+logger = logging.getLogger(__name__)
+
+# Public endpoints used as the reference for the network's current round
+NETWORK_STATUS_URLS = {
+    'mainnet': 'https://mainnet-api.algonode.cloud/v2/status',
+    'testnet': 'https://testnet-api.algonode.cloud/v2/status',
+    'betanet': 'https://betanet-api.algonode.cloud/v2/status',
+}
+DEFAULT_ROUND_TIME = 2.8  # Seconds per round on MainNet
+NETWORK_ROUND_TTL = 30.0
+SYNCED_THRESHOLD = 2  # Rounds behind the network still counted as synced
+
+
+class RoundSampleBuffer:
+    """Fixed-size ring buffer of (timestamp, round) samples in flat arrays."""
+
+    def __init__(self, capacity: int = 360):
+        self.capacity = capacity
+        self._times = array('d', [0.0] * capacity)
+        self._rounds = array('q', [0] * capacity)
+        self._next = 0
+        self._count = 0
+
+    def append(self, timestamp: float, round_number: int) -> None:
+        self._times[self._next] = timestamp
+        self._rounds[self._next] = round_number
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def oldest(self) -> Tuple[float, int]:
+        index = (self._next - self._count) % self.capacity
+        return self._times[index], self._rounds[index]
+
+    def newest(self) -> Tuple[float, int]:
+        index = (self._next - 1) % self.capacity
+        return self._times[index], self._rounds[index]
+
+    def samples(self) -> List[Tuple[float, int]]:
+        start = self._next - self._count
+        return [(self._times[i % self.capacity], self._rounds[i % self.capacity])
+                for i in range(start, self._next)]
+
+
+class SyncSampler:
+    """
+    Samples a node's round to estimate sync throughput and time to sync.
+
+    Rounds per second is an exponentially weighted average of the rate
+    between consecutive samples. The ETA compares that rate with the pace
+    of the network, whose current round comes from a reference endpoint.
+    """
+
+    def __init__(self,
+                 client: AlgodClient,
+                 network: str = 'mainnet',
+                 network_status_url: Optional[str] = None,
+                 capacity: int = 360,
+                 smoothing: float = 0.3,
+                 session=None):
+        self.client = client
+        self.network = network
+        self.network_status_url = network_status_url or NETWORK_STATUS_URLS.get(network)
+        self.smoothing = smoothing
+        self.samples = RoundSampleBuffer(capacity)
+        self.rounds_per_second: Optional[float] = None
+        self.catchup_time = 0.0
+        self.catchpoint = ''
+        self._session = session
+        self._network_round: Optional[int] = None
+        self._network_round_at = 0.0
+
+    def sample(self) -> Dict[str, object]:
+        """Take one sample and return the current estimate."""
+        status = self.client.status(max_age=0)
+        now = time.time()
+        round_number = int(status.get('last-round', 0))
+        self.catchup_time = status.get('catchup-time', 0) / 1e9
+        self.catchpoint = status.get('catchpoint', '') or ''
+
+        if len(self.samples):
+            last_time, last_round = self.samples.newest()
+            elapsed = now - last_time
+            if elapsed > 0 and round_number >= last_round:
+                rate = (round_number - last_round) / elapsed
+                if self.rounds_per_second is None:
+                    self.rounds_per_second = rate
+                else:
+                    self.rounds_per_second += self.smoothing * (rate - self.rounds_per_second)
+        self.samples.append(now, round_number)
+        return self.estimate()
+
+    def network_round(self) -> Optional[int]:
+        """Get the network's current round, extrapolated between fetches."""
+        now = time.time()
+        if self.network_status_url and now - self._network_round_at > NETWORK_ROUND_TTL:
+            try:
+                if self._session is None:
+                    import requests
+                    self._session = requests.Session()
+                response = self._session.get(self.network_status_url, timeout=10)
+                response.raise_for_status()
+                self._network_round = int(response.json()['last-round'])
+                self._network_round_at = now
+            except Exception as e:
+                logger.warning(f"Could not fetch {self.network} round: {str(e)}")
+        if self._network_round is None:
+            return None
+        return self._network_round + int((now - self._network_round_at) / DEFAULT_ROUND_TIME)
+
+    def estimate(self) -> Dict[str, object]:
+        """Summarise sync progress from the samples taken so far."""
+        last_round = self.samples.newest()[1] if len(self.samples) else 0
+        network_round = self.network_round()
+        estimate: Dict[str, object] = {
+            'network': self.network,
+            'last_round': last_round,
+            'network_round': network_round,
+            'rounds_per_second': self.rounds_per_second,
+            'catchup_time_seconds': self.catchup_time,
+            'catchpoint': self.catchpoint,
+            'progress': None,
+            'eta_seconds': None,
+            'synced': False,
+        }
+        if not network_round:
+            return estimate
+
+        remaining = network_round - last_round
+        estimate['progress'] = min(1.0, last_round / network_round)
+        estimate['synced'] = remaining <= SYNCED_THRESHOLD and not self.catchpoint
+        if estimate['synced']:
+            estimate['eta_seconds'] = 0.0
+        elif self.rounds_per_second:
+            # The network keeps producing rounds while the node catches up
+            closing_rate = self.rounds_per_second - 1 / DEFAULT_ROUND_TIME
+            if closing_rate > 0:
+                estimate['eta_seconds'] = remaining / closing_rate
+        return estimate
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    """Format a duration for display, e.g. '2d 3h' or '4m 10s'."""
+    if seconds is None:
+        return 'unknown'
+    seconds = int(seconds)
+    days, rest = divmod(seconds, 86400)
+    hours, rest = divmod(rest, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if days:
+        return f"{days}d {hours}h"
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {seconds}s"
+    return f"{seconds}s"
+
+
+def describe(estimate: Dict[str, object]) -> str:
+    """Describe an estimate in one line."""
+    if estimate['synced']:
+        return f"Synced at round {estimate['last_round']}"
+    if estimate['catchpoint']:
+        return f"Fast catchup in progress ({estimate['catchpoint']})"
+    rate = estimate['rounds_per_second']
+    rate_text = f"{rate:.1f} rounds/s" if rate is not None else "measuring rate"
+    target = estimate['network_round'] or '?'
+    return (f"Round {estimate['last_round']} of {target}, {rate_text}, "
+            f"ETA {format_duration(estimate['eta_seconds'])}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Report node sync progress and ETA")
+    parser.add_argument('-d', '--data-dir', type=Path, default=Path('/var/lib/algorand'))
+    parser.add_argument('--network', default='mainnet', choices=sorted(NETWORK_STATUS_URLS))
+    parser.add_argument('--network-status-url', help="Reference endpoint for the network round")
+    parser.add_argument('--interval', type=float, default=5.0, help="Seconds between samples")
+    parser.add_argument('--samples', type=int, default=0,
+                        help="Stop after this many samples (0 runs until synced)")
+    parser.add_argument('--json', action='store_true', help="Print estimates as JSON lines")
+    args = parser.parse_args(argv)
+
+    try:
+        client = AlgodClient.from_data_dir(args.data_dir)
+    except AlgodError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    sampler = SyncSampler(client, args.network, args.network_status_url)
+
+    taken = 0
+    while True:
+        try:
+            estimate = sampler.sample()
+        except AlgodError as e:
+            print(str(e), file=sys.stderr)
+            return 1
+        print(json.dumps(estimate) if args.json else describe(estimate), flush=True)
+        taken += 1
+        if estimate['synced'] or (args.samples and taken >= args.samples):
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
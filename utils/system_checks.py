@@ -1,17 +1,37 @@
 # utils/system_checks.py
 import os
+import resource
 import platform
+import tempfile
 import subprocess
 import logging
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from . import storage_benchmark, tracing
+from .tracing import traced
 
 logger = logging.getLogger(__name__)
 
-def check_system_requirements() -> None:
+OS_RELEASE_FILE = '/etc/os-release'
+MEMINFO_FILE = '/proc/meminfo'
+
+@traced('system_checks')
+def check_system_requirements(data_dir: Path = Path('/var/lib/algorand'),
+                              role: str = 'participation',
+                              benchmark: bool = False) -> List[str]:
     """
     Check if the system meets the minimum requirements for running an Algorand node.
     Raises Exception if requirements are not met.
+    
+    Args:
+        data_dir: Node data directory; free space and storage speed are
+            checked on the filesystem that holds it
+        role: 'participation', 'relay' or 'archival'
+        benchmark: Also benchmark storage against the role's thresholds
+    
+    Returns:
+        List of storage benchmark shortfalls, which are warnings only
     """
     logger.info("Checking system requirements...")
     
@@ -36,19 +56,82 @@ def check_system_requirements() -> None:
     if total_ram < 4:
         raise Exception(f"Your system has {total_ram:.1f}GB RAM. Minimum requirement is 4GB.")
     
-    # Check available disk space
-    available_space = _get_available_space()
-    if available_space < 10:
-        raise Exception(f"You have {available_space:.1f}GB available disk space. Minimum requirement is 100GB.")
+    # Check available disk space where the node will store its data
+    min_space = storage_benchmark.ROLE_THRESHOLDS[role]['min_free_gb']
+    available_space = _get_available_space(data_dir)
+    if available_space < min_space:
+        raise Exception(f"You have {available_space:.1f}GB available disk space. "
+                        f"Minimum requirement for a {role} node is {min_space:.0f}GB.")
+    
+    shortfalls = []
+    if benchmark:
+        results = storage_benchmark.run_storage_benchmark(data_dir)
+        shortfalls = storage_benchmark.evaluate(results, role)
+        for shortfall in shortfalls:
+            logger.warning(f"Storage below recommended level: {shortfall}")
     
     logger.info("System requirements check passed")
+    return shortfalls
+
+@traced('system_checks')
+def collect_system_facts(data_dir: Path = Path('/var/lib/algorand')) -> Dict[str, object]:
+    """
+    Collect host facts without enforcing requirements.
+
+    Args:
+        data_dir: Node data directory; free space is reported for the
+            filesystem that holds it
+
+    Returns:
+        Dict with OS, CPU, RAM and disk information; unknown values are None
+    """
+    facts: Dict[str, object] = {
+        'is_ubuntu': _is_ubuntu(),
+        'ubuntu_version': None,
+        'cpu_count': os.cpu_count() or 0,
+        'total_ram_gb': _get_total_ram(),
+        'available_space_gb': _get_available_space(data_dir),
+    }
+    if facts['is_ubuntu']:
+        try:
+            facts['ubuntu_version'] = _get_ubuntu_version()
+        except Exception:
+            pass
+    return facts
+
+@traced('system_checks')
+def collect_host_facts(data_dir: Path, measure_iops: bool = True) -> Dict[str, object]:
+    """
+    Collect the host facts that node tuning depends on.
+    
+    Args:
+        data_dir: Node data directory; its disk is the one probed
+        measure_iops: Run a short random read probe on the data disk
+    
+    Returns:
+        Dict with CPU, RAM, disk type and IOPS, file descriptor limit and
+        NIC speed; unknown values are None
+    """
+    probe_dir = storage_benchmark.existing_parent(data_dir)
+    
+    facts: Dict[str, object] = {
+        'cpu_count': os.cpu_count() or 0,
+        'total_ram_gb': _get_total_ram(),
+        'is_ssd': _is_ssd(str(probe_dir)),
+        'disk_iops': None,
+        'fd_limit': _get_fd_limit(),
+        'nic_speed_mbps': _get_nic_speed(),
+    }
+    if measure_iops:
+        facts['disk_iops'] = _measure_random_read_iops(probe_dir)
+    return facts
 
 def _is_ubuntu() -> bool:
     """Check if the system is running Ubuntu."""
     try:
         # Try multiple methods to detect Ubuntu
-        if os.path.exists('/etc/os-release'):
-            with open('/etc/os-release', 'r') as f:
+        if os.path.exists(OS_RELEASE_FILE):
+            with open(OS_RELEASE_FILE, 'r') as f:
                 content = f.read().lower()
                 return 'ubuntu' in content
         return False
@@ -56,12 +139,12 @@ def _is_ubuntu() -> bool:
         logger.error(f"Error checking Ubuntu: {str(e)}")
         return False
 
-def _get_ubuntu_version() -> Tuple[int, int]:
+def _get_ubuntu_version(os_release: str = OS_RELEASE_FILE) -> Tuple[int, int]:
     """Get Ubuntu version as tuple (major, minor)."""
     try:
         version = ""
-        if os.path.exists('/etc/os-release'):
-            with open('/etc/os-release', 'r') as f:
+        if os.path.exists(os_release):
+            with open(os_release, 'r') as f:
                 for line in f:
                     if line.startswith('VERSION_ID'):
                         # Remove quotes and clean the version string
@@ -71,7 +154,7 @@ def _get_ubuntu_version() -> Tuple[int, int]:
         if not version:
             # Fallback to lsb_release command
             try:
-                result = subprocess.run(
+                result = tracing.run(
                     ['lsb_release', '-r'],
                     capture_output=True,
                     text=True,
@@ -95,10 +178,10 @@ def _get_ubuntu_version() -> Tuple[int, int]:
         logger.error(f"Error getting Ubuntu version: {str(e)}")
         raise Exception("Could not determine Ubuntu version.")
 
-def _get_total_ram() -> float:
+def _get_total_ram(meminfo: str = MEMINFO_FILE) -> float:
     """Get total RAM in GB."""
     try:
-        with open('/proc/meminfo', 'r') as f:
+        with open(meminfo, 'r') as f:
             for line in f:
                 if line.startswith('MemTotal'):
                     # Convert KB to GB
@@ -107,10 +190,23 @@ def _get_total_ram() -> float:
         logger.error(f"Error checking RAM: {str(e)}")
         return 0
 
-def _get_available_space() -> float:
-    """Get available disk space in GB."""
+def _get_available_ram(meminfo: str = MEMINFO_FILE) -> float:
+    """Get RAM available for new processes in GB."""
     try:
-        stat = os.statvfs(str(Path.home()))
+        with open(meminfo, 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable'):
+                    # Convert KB to GB
+                    return int(line.split()[1]) / (1024 * 1024)
+    except Exception as e:
+        logger.error(f"Error checking available RAM: {str(e)}")
+    return 0
+
+def _get_available_space(path: Optional[Path] = None) -> float:
+    """Get available disk space in GB on the filesystem holding path (home by default)."""
+    try:
+        target = storage_benchmark.existing_parent(path) if path else Path.home()
+        stat = os.statvfs(str(target))
         return (stat.f_frsize * stat.f_bavail) / (1024**3)
     except Exception as e:
         logger.error(f"Error checking disk space: {str(e)}")
@@ -120,17 +216,19 @@ def _is_ssd(path: str = '/') -> bool:
     """Check if the path is on an SSD."""
     try:
         # Get device name
-        df = subprocess.run(
+        df = tracing.run(
             ['df', path],
             capture_output=True,
             text=True,
             check=True
         )
         device = df.stdout.split('\n')[1].split()[0]
+        device_name = os.path.basename(device)
         
-        # Get the base device (remove partition numbers)
-        base_device = ''.join(c for c in device if not c.isdigit())
-        device_name = os.path.basename(base_device)
+        # Partitions (sda1, nvme0n1p1) report through their parent device
+        sys_path = Path('/sys/class/block') / device_name
+        if (sys_path / 'partition').exists():
+            device_name = sys_path.resolve().parent.name
         
         # Check rotational flag
         with open(f"/sys/block/{device_name}/queue/rotational", 'r') as f:
@@ -138,3 +236,63 @@ def _is_ssd(path: str = '/') -> bool:
     except Exception:
         logger.warning("Could not determine storage type")
         return False
+
+def _get_fd_limit(service: str = 'algorand') -> Optional[int]:
+    """
+    Get the open file limit algod runs with.
+
+    None if the service unit is not installed yet; systemd would report
+    its defaults rather than the unit's own limit.
+    """
+    try:
+        result = tracing.run(
+            ['systemctl', 'show', service, '-p', 'LoadState', '-p', 'LimitNOFILE'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        properties = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+        if properties.get('LoadState') != 'loaded':
+            return None
+        value = properties.get('LimitNOFILE', '')
+        if value.isdigit():
+            return int(value)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    # Fall back to the limit this process would pass on
+    try:
+        return resource.getrlimit(resource.RLIMIT_NOFILE)[1]
+    except (OSError, ValueError):
+        return None
+
+def _get_nic_speed() -> Optional[int]:
+    """Get the link speed in Mbps of the interface carrying the default route."""
+    try:
+        with open('/proc/net/route', 'r') as f:
+            next(f)
+            for line in f:
+                fields = line.split()
+                if fields[1] == '00000000':  # Default route
+                    with open(f"/sys/class/net/{fields[0]}/speed", 'r') as speed:
+                        value = int(speed.read().strip())
+                    return value if value > 0 else None
+    except (OSError, ValueError, StopIteration):
+        pass
+    return None
+
+@traced('system_checks')
+def _measure_random_read_iops(path: Path,
+                              duration: float = 1.0,
+                              file_size: int = 64 * 1024 * 1024) -> Optional[float]:
+    """Measure 4K random read IOPS on the disk holding path, bypassing the page cache where possible."""
+    try:
+        with tempfile.NamedTemporaryFile(dir=str(path), prefix='.iops-probe-') as f:
+            chunk = os.urandom(1024 * 1024)
+            for _ in range(file_size // len(chunk)):
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+            return storage_benchmark.measure_random_iops(f.name, file_size, duration)
+    except OSError as e:
+        logger.warning(f"Could not measure disk IOPS: {str(e)}")
+        return None
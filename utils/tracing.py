@@ -0,0 +1,267 @@
+import os
+import re
+import json
+import time
+import logging
+import functools
+import itertools
+import threading
+import subprocess
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .command_backend import get_backend
+
+logger = logging.getLogger(__name__)
+
+# apt-get's summary line, e.g. "Fetched 45.3 MB in 3s (15.1 MB/s)"
+_APT_FETCHED = re.compile(r'^Fetched ([\d.,]+) ([kMG]?)B in', re.MULTILINE)
+_UNITS = {'': 1, 'k': 1000, 'M': 1000 ** 2, 'G': 1000 ** 3}
+
+
+class Span:
+    """A timed region of installer work."""
+
+    def __init__(self,
+                 span_id: int,
+                 name: str,
+                 category: str,
+                 parent: Optional['Span'] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        thread = threading.current_thread()
+        self.id = span_id
+        self.name = name
+        self.category = category
+        self.parent_id = parent.id if parent is not None else None
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.attributes = dict(attributes or {})
+        self.start = time.perf_counter()
+        self.wall = 0.0
+        self.cpu = 0.0  # This thread's CPU time in the span
+        self.child_cpu = 0.0  # User and system time of child processes
+        self.bytes = 0  # Bytes downloaded
+        self.exit_status: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def as_dict(self, origin: float) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'parent': self.parent_id,
+            'name': self.name,
+            'category': self.category,
+            'thread': self.thread_name,
+            'start': round(self.start - origin, 6),
+            'wall': round(self.wall, 6),
+            'cpu': round(self.cpu, 6),
+            'child_cpu': round(self.child_cpu, 6),
+            'bytes': self.bytes,
+            'exit_status': self.exit_status,
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class Tracer:
+    """
+    Records spans for installer steps, checks and subprocesses.
+
+    Spans nest per thread; work handed to another thread can name its
+    parent explicitly. Finished spans are kept in memory and exported as a
+    JSON report or as a Chrome trace that chrome://tracing and Perfetto
+    open directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+
+    def current(self) -> Optional[Span]:
+        stack = getattr(self._local, 'stack', None)
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self,
+             name: str,
+             category: str = 'step',
+             parent: Optional[Span] = None,
+             **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a span."""
+        stack = self._local.__dict__.setdefault('stack', [])
+        span = Span(next(self._ids), name, category, parent or self.current(), attributes)
+        cpu_started = time.thread_time()
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = span.error or type(e).__name__
+            raise
+        finally:
+            stack.pop()
+            span.cpu = time.thread_time() - cpu_started
+            span.wall = time.perf_counter() - span.start
+            with self._lock:
+                self._spans.append(span)
+
+    def add_bytes(self, count: int) -> None:
+        """Attribute downloaded bytes to the innermost open span."""
+        span = self.current()
+        if span is not None:
+            span.bytes += count
+
+    def run(self, cmd: List[str], check: bool = False, **kwargs) -> subprocess.CompletedProcess:
+        """
+        subprocess.run in a span recording the exit status and child CPU.
+
+        Commands go through the current command backend. apt-get's
+        "Fetched" summary, when its output is captured, is counted as bytes
+        downloaded.
+        """
+        with self.span(_command_name(cmd), 'subprocess', command=' '.join(map(str, cmd))) as span:
+            result = get_backend().run(cmd, **kwargs)
+            span.exit_status = result.returncode
+            span.child_cpu = getattr(result, 'child_cpu', 0.0)
+            stdout = result.stdout
+            if isinstance(stdout, bytes):
+                stdout = stdout.decode(errors='replace')
+            if stdout:
+                span.bytes += _apt_fetched_bytes(stdout)
+            if check:
+                result.check_returncode()
+            return result
+
+    def spans(self) -> List[Span]:
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s.start)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans = []
+        self.origin = time.perf_counter()
+        self.started_at = time.time()
+
+    def report(self) -> Dict[str, Any]:
+        """Spans and per-category totals, with times in seconds since the tracer started."""
+        spans = self.spans()
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            total = totals.setdefault(span.category, {
+                'count': 0, 'wall': 0.0, 'cpu': 0.0, 'child_cpu': 0.0, 'bytes': 0, 'failed': 0
+            })
+            total['count'] += 1
+            total['wall'] += span.wall
+            total['cpu'] += span.cpu
+            total['child_cpu'] += span.child_cpu
+            total['bytes'] += span.bytes
+            total['failed'] += 1 if span.error or span.exit_status not in (None, 0) else 0
+        return {
+            'started_at': self.started_at,
+            'wall_time': max((s.start + s.wall for s in spans), default=self.origin) - self.origin,
+            'totals': totals,
+            'spans': [span.as_dict(self.origin) for span in spans],
+        }
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace complete events, with one track per thread."""
+        pid = os.getpid()
+        events = []
+        threads = {}
+        for span in self.spans():
+            threads.setdefault(span.thread_id, span.thread_name)
+            args = {key: value for key, value in span.as_dict(self.origin).items()
+                    if key not in ('name', 'category', 'thread', 'start', 'wall')}
+            events.append({
+                'name': span.name,
+                'cat': span.category,
+                'ph': 'X',
+                'ts': (span.start - self.origin) * 1e6,
+                'dur': span.wall * 1e6,
+                'pid': pid,
+                'tid': span.thread_id,
+                'args': args,
+            })
+        for tid, thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f, default=str)
+
+    def log_summary(self) -> None:
+        """Log time and downloads per category."""
+        for category, total in sorted(self.report()['totals'].items()):
+            logger.info(
+                f"{category}: {total['count']} spans, {total['wall']:.1f}s wall, "
+                f"{total['cpu']:.1f}s CPU, {total['child_cpu']:.1f}s child CPU, "
+                f"{total['bytes'] / (1024 * 1024):.1f}MB downloaded, {total['failed']} failed"
+            )
+
+
+class SpanLogFilter(logging.Filter):
+    """Adds the innermost span's name to log records as %(span)s."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = get_tracer().current()
+        record.span = span.name if span is not None else '-'
+        return True
+
+
+def _command_name(cmd: List[str]) -> str:
+    """Short span name: the program, and for sudo the program it runs."""
+    args = [str(arg) for arg in cmd]
+    name = os.path.basename(args[0])
+    if name != 'sudo':
+        return name
+    rest = args[1:]
+    while rest and rest[0].startswith('-'):
+        rest = rest[2:] if rest[0] in ('-u', '-g') else rest[1:]
+    return f"sudo {os.path.basename(rest[0])}" if rest else name
+
+
+def _apt_fetched_bytes(output: str) -> int:
+    total = 0
+    for amount, unit in _APT_FETCHED.findall(output):
+        total += int(float(amount.replace(',', '')) * _UNITS[unit])
+    return total
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Get the process-wide tracer."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
+
+
+def run(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """Traced drop-in for subprocess.run."""
+    return get_tracer().run(cmd, **kwargs)
+
+
+def add_bytes(count: int) -> None:
+    get_tracer().add_bytes(count)
+
+
+def traced(category: str, name: Optional[str] = None) -> Callable:
+    """Decorator that runs a function in a span named after it."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator